@@ -3,10 +3,11 @@
 Configuration globale de l'application
 """
 
+from pydantic import Field, field_validator
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import FrozenSet, Optional
 import os
-from functools import lru_cache
+from functools import lru_cache, cached_property
 
 class Settings(BaseSettings):
     """Configuration de l'application"""
@@ -15,20 +16,49 @@ class Settings(BaseSettings):
     DEBUG: bool = True
     HOST: str = "0.0.0.0"
     PORT: int = 8000
+    # Processus uvicorn (forcé à 1 en DEBUG: le rechargement automatique n'en gère qu'un)
+    WORKERS: int = Field(default_factory=lambda: os.cpu_count() or 1)
     
     # MongoDB
     MONGODB_URI: str = "mongodb://localhost:27017"
     MONGODB_DB_NAME: str = "cv_parser_db"
+    MONGODB_MAX_POOL_SIZE: int = 50
+    MONGODB_MIN_POOL_SIZE: int = 5
+    # Compression réseau, par ordre de préférence: les algorithmes non supportés
+    # par le serveur (>= 4.2) ou non installés côté client (zstandard,
+    # python-snappy) sont ignorés; sans compresseur commun, pas de compression
+    MONGODB_COMPRESSORS: str = "zstd,snappy,zlib"
+    MONGODB_ZLIB_LEVEL: int = 6
+    MONGODB_SERVER_SELECTION_TIMEOUT_MS: int = 3000
+    
+    # Cache Redis des lectures (désactivé si REDIS_URL n'est pas défini)
+    REDIS_URL: Optional[str] = None
+    CACHE_TTL_SECONDS: int = 60
     
     # Upload
     MAX_FILE_SIZE_MB: int = 16
-    ALLOWED_EXTENSIONS: List[str] = [".pdf", ".docx", ".doc", ".txt", ".xlsx", ".xls", ".pptx", ".ppt"]
+    ALLOWED_EXTENSIONS: FrozenSet[str] = frozenset({".pdf", ".docx", ".doc", ".txt", ".xlsx", ".xls", ".pptx", ".ppt"})
     UPLOAD_DIR: str = "uploads"
     
+    @field_validator("ALLOWED_EXTENSIONS", mode="after")
+    @classmethod
+    def _normalize_extensions(cls, v) -> FrozenSet[str]:
+        """Extensions en minuscules, recherche O(1)"""
+        return frozenset(e.lower() for e in v)
+    
+    @property
+    def effective_workers(self) -> int:
+        return 1 if self.DEBUG else max(1, self.WORKERS)
+    
     @property
     def max_file_size_bytes(self) -> int:
         return self.MAX_FILE_SIZE_MB * 1024 * 1024
     
+    @cached_property
+    def allowed_extensions_display(self) -> str:
+        """Liste des extensions autorisées pour les messages d'erreur"""
+        return ", ".join(sorted(self.ALLOWED_EXTENSIONS))
+    
     class Config:
         env_file = ".env"
 
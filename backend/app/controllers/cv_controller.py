@@ -3,60 +3,191 @@
 Controller CV - API Endpoints - Version complète
 """
 
-from fastapi import APIRouter, File, UploadFile, HTTPException, Depends , Response
-from fastapi.responses import JSONResponse, PlainTextResponse , StreamingResponse
-import traceback
-from typing import List, Dict, Any
-import os
+from fastapi import APIRouter, Body, File, UploadFile, HTTPException, Depends , Query, Response, Request
+from fastapi.responses import JSONResponse, ORJSONResponse, PlainTextResponse , StreamingResponse, FileResponse
+import asyncio
+import logging
+import aiofiles
+import orjson
+from typing import Annotated, AsyncIterator, Callable, List, Dict, Any, Literal, Mapping, Optional, Tuple
+from types import MappingProxyType
 import tempfile
 from datetime import datetime
-from io import BytesIO
-from app.services.cv_service import CVService
+from functools import lru_cache
+from app.services.cv_service import (CVService, REPORTLAB_AVAILABLE, PDF_CONTENT_TYPE,
+                                     PREVIEW_CONVERTIBLE, PREVIEW_CONTENT_TYPES)
+from app.parsers.info_extractors import count_words
 from app.models.cv_model import CVResponse, CVListResponse, CVData
+from app.database.redis_cache import RedisCache, CV_LIST_KEY, CV_LIST_MINIMAL_KEY, cv_key
 from app.config import get_settings
 from app.config import get_settings
 
 settings = get_settings()
+logger = logging.getLogger(__name__)
 
-router = APIRouter()
-cv_service = CVService() 
+router = APIRouter(default_response_class=ORJSONResponse)
 
-def get_cv_service() -> CVService:
-    """Dependency injection pour CVService"""
-    return cv_service
+# Taille des blocs lus depuis l'upload (64 Kio)
+UPLOAD_CHUNK_SIZE = 64 * 1024
 
-@router.post("/upload", response_model=CVResponse)
+# Taille minimale des blocs envoyés pour les listes de CV en streaming (64 Kio)
+LIST_STREAM_CHUNK_SIZE = 64 * 1024
+
+# Content-type par extension pour le téléchargement des documents
+_CONTENT_TYPES: Mapping[str, str] = MappingProxyType({
+    '.pdf': 'application/pdf',
+    '.docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+    '.doc': 'application/msword',
+    '.txt': 'text/plain',
+})
+
+def get_cv_service(request: Request) -> CVService:
+    """Dependency injection pour CVService (instance unique créée dans le lifespan)"""
+    return request.app.state.cv_service
+
+def get_cache(request: Request) -> RedisCache:
+    """Dependency injection pour le cache Redis (sans effet s'il n'est pas configuré)"""
+    return request.app.state.cache
+
+CVServiceDep = Annotated[CVService, Depends(get_cv_service)]
+CacheDep = Annotated[RedisCache, Depends(get_cache)]
+
+@lru_cache(maxsize=1)
+def _conversion_caps(converter) -> Tuple[bool, Tuple[str, ...]]:
+    """Capacités de conversion (sondées une seule fois par processus)"""
+    return converter.is_conversion_available(), tuple(converter.get_supported_formats())
+
+def _ext(name: str) -> str:
+    """
+    Extension en minuscules ('.pdf'), comme os.path.splitext(name)[1].lower(), à ceci
+    près que les séparateurs Windows ('\\') sont aussi retirés du chemin
+    """
+    base = name[max(name.rfind("/"), name.rfind("\\")) + 1:]
+    i = base.rfind(".")
+    return base[i:].lower() if i > 0 and base[:i].strip(".") else ""
+
+async def _cv_list_body(docs: AsyncIterator[bytes],
+                        message: Optional[Callable[[int], str]] = None,
+                        cache: Optional[RedisCache] = None,
+                        cache_key: Optional[str] = None,
+                        page: Optional[Tuple[int, int]] = None) -> AsyncIterator[bytes]:
+    """
+    Corps JSON d'une CVListResponse assemblé au fil du curseur, à partir des
+    documents déjà sérialisés; le corps complet est mis en cache à la fin.
+    page: (skip, nombre total de CV) pour une requête paginée
+    """
+    buffer = bytearray(b'{"success":true,"data":[')
+    sent: Optional[List[bytes]] = [] if cache is not None and cache_key else None
+    total = 0
+    async for doc in docs:
+        if total:
+            buffer += b","
+        buffer += doc
+        total += 1
+        if len(buffer) >= LIST_STREAM_CHUNK_SIZE:
+            chunk = bytes(buffer)
+            buffer.clear()
+            if sent is not None:
+                sent.append(chunk)
+            yield chunk
+    
+    tail: Dict[str, Any] = {"total": total}
+    if page is not None:
+        skip, collection_total = page
+        tail["total"] = collection_total
+        if skip + total < collection_total:
+            tail["next_skip"] = skip + total
+    if message is not None:
+        tail["message"] = message(total)
+    buffer += b"]," + orjson.dumps(tail)[1:]
+    chunk = bytes(buffer)
+    yield chunk
+    
+    if sent is not None:
+        sent.append(chunk)
+        await cache.set(cache_key, b"".join(sent))
+
+async def _read_upload(file: UploadFile, hasher=None,
+                       staged_path: Optional[str] = None) -> Tuple[bytearray, Optional[str]]:
+    """
+    Lit l'upload par blocs en calculant le hash au fil de l'eau.
+    staged_path: chaque bloc y est aussi écrit, pendant la lecture du bloc suivant.
+    Rejette la requête (413) dès que la taille maximale est dépassée.
+    Returns: (contenu, hash hexadécimal ou None si aucun hasher)
+    """
+    too_large = HTTPException(
+        status_code=413,
+        detail=f"Fichier trop volumineux. Max: {settings.MAX_FILE_SIZE_MB}MB"
+    )
+    max_size = settings.max_file_size_bytes
+
+    # Taille connue d'avance: inutile de lire le contenu
+    if file.size is not None and file.size > max_size:
+        raise too_large
+
+    content = bytearray()
+    staged = await aiofiles.open(staged_path, 'wb') if staged_path else None
+    pending_write = None
+    try:
+        while True:
+            chunk = await file.read(UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                break
+            if len(content) + len(chunk) > max_size:
+                raise too_large
+            if hasher is not None:
+                hasher.update(chunk)
+            content += chunk
+            if staged is not None:
+                if pending_write is not None:
+                    await pending_write
+                pending_write = asyncio.ensure_future(staged.write(chunk))
+        if pending_write is not None:
+            await pending_write
+    finally:
+        if staged is not None:
+            if pending_write is not None and not pending_write.done():
+                await asyncio.gather(pending_write, return_exceptions=True)
+            await staged.close()
+
+    return content, hasher.hexdigest() if hasher is not None else None
+
+@router.post("/upload", response_model=CVResponse, response_model_exclude_none=True)
 async def upload_cv(
-    file: UploadFile = File(...),
-    cv_service: CVService = Depends(get_cv_service)
+    file: Annotated[UploadFile, File()],
+    cv_service: CVServiceDep,
+    cache: CacheDep
 ):
     """Upload et parsing d'un CV avec vérification de doublon"""
     try:
-        print(f"📤 Upload CV: {file.filename}")
+        logger.debug("📤 Upload CV: %s", file.filename)
         
         # Validation du fichier (code existant)
         if not file.filename:
             raise HTTPException(status_code=400, detail="Nom de fichier manquant")
         
-        file_ext = os.path.splitext(file.filename)[1].lower()
+        file_ext = _ext(file.filename)
         if file_ext not in settings.ALLOWED_EXTENSIONS:
             raise HTTPException(
                 status_code=400, 
-                detail=f"Format non supporté. Autorisés: {', '.join(settings.ALLOWED_EXTENSIONS)}"
+                detail=f"Format non supporté. Autorisés: {settings.allowed_extensions_display}"
             )
 
-        # Vérifier la taille
-        content = await file.read()
-        if len(content) > settings.max_file_size_bytes:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Fichier trop volumineux. Max: {settings.MAX_FILE_SIZE_MB}MB"
-            )
-
-
+        # Lecture par blocs avec vérification de la taille, hash incrémental et
+        # écriture sur disque au fil de l'eau (mis en place par renommage ensuite)
+        file_storage = cv_service.file_storage
+        staged_path = file_storage.new_staging_path()
+        try:
+            content, file_hash = await _read_upload(file, cv_service.new_file_hasher(), staged_path)
 
-        # Vérifier les doublons et traiter
-        cv_data, is_duplicate = await cv_service.check_and_process_cv(content, file.filename, file_ext)
+            # Vérifier les doublons et traiter
+            cv_data, is_duplicate = await cv_service.check_and_process_cv(
+                content, file.filename, file_ext, file_hash=file_hash, staged_path=staged_path
+            )
+        finally:
+            # Doublon, erreur ou fichier déjà mis en place: rien ne doit rester en réception
+            file_storage.discard_staged(staged_path)
+        await cache.invalidate_cv(cv_data.id if cv_data else None)
         
         if is_duplicate:
             return CVResponse(
@@ -78,29 +209,44 @@ async def upload_cv(
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ Erreur upload CV: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
-        
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        print(f"❌ Erreur upload CV: {e}")
+        logger.error("❌ Erreur upload CV: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.get("/", response_model=CVListResponse)
-async def get_all_cvs(cv_service: CVService = Depends(get_cv_service)):
-    """Récupérer tous les CV"""
+@router.get("/", response_model=CVListResponse, response_model_exclude_none=True)
+async def get_all_cvs(
+    cv_service: CVServiceDep,
+    cache: CacheDep,
+    fields: Optional[Literal["minimal"]] = None,
+    skip: Annotated[int, Query(ge=0)] = 0,
+    limit: Annotated[int, Query(ge=0)] = 0
+):
+    """
+    Récupérer les CV (fields=minimal: vue liste allégée).
+    skip/limit: pagination, plus récents d'abord; total est alors le nombre
+    total de CV et next_skip le skip de la page suivante. limit=0: tous les CV
+    """
     try:
-        print("📋 Récupération de tous les CV")
-        cvs = await cv_service.get_all_cvs()
-        return CVListResponse(
-            success=True,
-            data=cvs,
-            total=len(cvs)
+        logger.debug("📋 Récupération de tous les CV")
+        list_view = fields == "minimal"
+        paginated = bool(skip or limit)
+        
+        # Seule la liste complète est mise en cache
+        cache_key = None
+        if not paginated:
+            cache_key = CV_LIST_MINIMAL_KEY if list_view else CV_LIST_KEY
+            cached = await cache.get(cache_key)
+            if cached is not None:
+                return Response(content=cached, media_type="application/json")
+        
+        # Documents sérialisés au fil du curseur, sans instancier CVData
+        docs = cv_service.stream_all_cvs_json(list_view=list_view, skip=skip, limit=limit)
+        page = (skip, await cv_service.count_cvs_estimated()) if paginated else None
+        return StreamingResponse(
+            _cv_list_body(docs, cache=cache, cache_key=cache_key, page=page),
+            media_type="application/json"
         )
     except Exception as e:
-        print(f"❌ Erreur récupération CV: {e}")
+        logger.error("❌ Erreur récupération CV: %s", e)
         # Si MongoDB n'est pas connecté, retourner une liste vide
         return CVListResponse(
             success=True,
@@ -109,47 +255,51 @@ async def get_all_cvs(cv_service: CVService = Depends(get_cv_service)):
             message="Base de données non connectée"
         )
 
-@router.get("/{cv_id}", response_model=CVResponse)
+@router.get("/{cv_id}", response_model=CVResponse, response_model_exclude_none=True)
 async def get_cv_by_id(
     cv_id: str,
-    cv_service: CVService = Depends(get_cv_service)
+    cv_service: CVServiceDep,
+    cache: CacheDep
 ):
     """Récupérer un CV par ID"""
     try:
-        print(f"🔍 Récupération CV: {cv_id}")
-        cv_data = await cv_service.get_cv_by_id(cv_id)
-        if not cv_data:
+        logger.debug("🔍 Récupération CV: %s", cv_id)
+        cached = await cache.get(cv_key(cv_id))
+        if cached is not None:
+            return Response(content=cached, media_type="application/json")
+        
+        cv_json = await cv_service.get_cv_json(cv_id)
+        if cv_json is None:
             raise HTTPException(status_code=404, detail="CV non trouvé")
         
-        return CVResponse(
-            success=True,
-            data=cv_data
-        )
+        # Même corps que CVResponse(success=True, data=...) sans repasser par Pydantic
+        body = b'{"success":true,"data":' + cv_json + b',"is_duplicate":false}'
+        await cache.set(cv_key(cv_id), body)
+        return Response(content=body, media_type="application/json")
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ Erreur récupération CV {cv_id}: {e}")
+        logger.error("❌ Erreur récupération CV %s: %s", cv_id, e)
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.put("/{cv_id}", response_model=CVResponse)
+@router.put("/{cv_id}", response_model=CVResponse, response_model_exclude_none=True)
 async def update_cv(
     cv_id: str,
     cv_data: CVData,
-    cv_service: CVService = Depends(get_cv_service)
+    cv_service: CVServiceDep,
+    cache: CacheDep
 ):
     """Mise à jour complète d'un CV"""
     try:
-        print(f"🔄 Mise à jour CV: {cv_id}")
+        logger.debug("🔄 Mise à jour CV: %s", cv_id)
         
         # Vérifier que l'ID correspond
         if cv_data.id != cv_id:
             raise HTTPException(status_code=400, detail="L'ID du CV ne correspond pas")
         
-        # Mettre à jour la date de modification
-        cv_data.updated_at = datetime.now()
-        
-        # Sauvegarder via le service
-        updated_cv = await cv_service.update_cv(cv_data)
+        # Sauvegarder via le service (date de modification prise une seule fois)
+        updated_cv = await cv_service.update_cv(cv_data, now=datetime.now())
+        await cache.invalidate_cv(cv_id)
         
         if not updated_cv:
             raise HTTPException(status_code=404, detail="CV non trouvé")
@@ -163,22 +313,25 @@ async def update_cv(
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ Erreur mise à jour CV: {e}")
+        logger.error("❌ Erreur mise à jour CV: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.patch("/{cv_id}", response_model=CVResponse)
+@router.patch("/{cv_id}", response_model=CVResponse, response_model_exclude_none=True)
 async def update_cv_partial(
     cv_id: str,
     updates: Dict[str, Any],
-    cv_service: CVService = Depends(get_cv_service)
+    cv_service: CVServiceDep,
+    cache: CacheDep
 ):
     """Mise à jour partielle d'un CV - VERSION CORRIGÉE"""
     try:
-        print(f"🔄 Mise à jour partielle CV: {cv_id}")
-        print(f"📝 Champs à mettre à jour: {list(updates.keys())}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("🔄 Mise à jour partielle CV: %s", cv_id)
+            logger.debug("📝 Champs à mettre à jour: %s", list(updates.keys()))
         
         # Utiliser le service pour la mise à jour partielle
         updated_cv = await cv_service.update_cv_fields(cv_id, updates)
+        await cache.invalidate_cv(cv_id)
         
         if not updated_cv:
             raise HTTPException(status_code=404, detail="CV non trouvé")
@@ -192,18 +345,20 @@ async def update_cv_partial(
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ Erreur mise à jour partielle CV: {e}")
+        logger.error("❌ Erreur mise à jour partielle CV: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.delete("/{cv_id}")
 async def delete_cv(
     cv_id: str,
-    cv_service: CVService = Depends(get_cv_service)
+    cv_service: CVServiceDep,
+    cache: CacheDep
 ):
     """Supprimer un CV"""
     try:
-        print(f"🗑️ Suppression CV: {cv_id}")
+        logger.debug("🗑️ Suppression CV: %s", cv_id)
         result = await cv_service.delete_cv(cv_id)
+        await cache.invalidate_cv(cv_id)
         if not result:
             raise HTTPException(status_code=404, detail="CV non trouvé")
         
@@ -211,35 +366,38 @@ async def delete_cv(
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ Erreur suppression CV: {e}")
+        logger.error("❌ Erreur suppression CV: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/extract-text")
 async def extract_text_only(
-    file: UploadFile = File(...),
-    cv_service: CVService = Depends(get_cv_service)
+    file: Annotated[UploadFile, File()],
+    cv_service: CVServiceDep
 ):
     """Extraire seulement le texte d'un fichier"""
     try:
-        print(f"📄 Extraction texte: {file.filename}")
+        logger.debug("📄 Extraction texte: %s", file.filename)
         
         if not file.filename:
             raise HTTPException(status_code=400, detail="Nom de fichier manquant")
 
-        content = await file.read()
-        file_ext = os.path.splitext(file.filename)[1].lower()
+        # Hash calculé pendant la lecture: clé du cache de textes extraits
+        content, file_hash = await _read_upload(file, cv_service.new_file_hasher())
+        file_ext = _ext(file.filename)
         
-        text = await cv_service.extract_text_only(content, file_ext)
+        text = await cv_service.extract_text_only(content, file_ext, file_hash)
         
         return {
             "success": True,
             "text": text,
             "length": len(text),
-            "word_count": len(text.split()) if text else 0
+            "word_count": count_words(text)
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"❌ Erreur extraction texte: {e}")
+        logger.error("❌ Erreur extraction texte: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/health")
@@ -255,39 +413,39 @@ async def health_check():
 @router.get("/search/skills")
 async def search_cvs_by_skills(
     skills: str,  # Compétences séparées par des virgules
-    cv_service: CVService = Depends(get_cv_service)
+    cv_service: CVServiceDep
 ):
     """Rechercher des CV par compétences"""
     try:
-        skills_list = [skill.strip() for skill in skills.split(',') if skill.strip()]
+        # Normalisation unique (minuscules, sans doublons) avant la requête Mongo
+        skills_list = sorted({skill.strip().lower() for skill in skills.split(',') if skill.strip()})
         if not skills_list:
             raise HTTPException(status_code=400, detail="Aucune compétence fournie")
         
-        print(f"🔍 Recherche CV par compétences: {skills_list}")
-        cvs = await cv_service.search_cvs_by_skills(skills_list)
+        logger.debug("🔍 Recherche CV par compétences: %s", skills_list)
+        docs = cv_service.stream_cvs_by_skills_json(skills_list)
         
-        return CVListResponse(
-            success=True,
-            data=cvs,
-            total=len(cvs),
-            message=f"Trouvé {len(cvs)} CV(s) avec ces compétences"
+        return StreamingResponse(
+            _cv_list_body(docs, message=lambda total: f"Trouvé {total} CV(s) avec ces compétences"),
+            media_type="application/json"
         )
         
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ Erreur recherche par compétences: {e}")
+        logger.error("❌ Erreur recherche par compétences: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.put("/{cv_id}/status")
 async def update_cv_status(
     cv_id: str,
     status: str,
-    cv_service: CVService = Depends(get_cv_service)
+    cv_service: CVServiceDep,
+    cache: CacheDep
 ):
     """Mettre à jour le statut d'un CV"""
     try:
-        print(f"🔄 Mise à jour statut CV {cv_id}: {status}")
+        logger.debug("🔄 Mise à jour statut CV %s: %s", cv_id, status)
         
         valid_statuses = ["pending", "processing", "completed", "error", "not_saved"]
         if status not in valid_statuses:
@@ -297,6 +455,7 @@ async def update_cv_status(
             )
         
         result = await cv_service.update_cv_status(cv_id, status)
+        await cache.invalidate_cv(cv_id)
         if not result:
             raise HTTPException(status_code=404, detail="CV non trouvé")
         
@@ -305,31 +464,54 @@ async def update_cv_status(
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ Erreur mise à jour statut: {e}")
+        logger.error("❌ Erreur mise à jour statut: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
     
     
 @router.get("/{cv_id}/export/onetech")
-async def export_cv_onetech(cv_id: str, service=Depends(CVService)):
-    result = await service.export_cv_onetech(cv_id)
+async def export_cv_onetech(
+    cv_id: str,
+    cv_service: CVServiceDep
+):
+    """Exporte un CV au format OneTech (DOCX)"""
+    result = await cv_service.export_cv_onetech(cv_id)
+    if not result:
+        raise HTTPException(status_code=404, detail="CV non trouvé")
+    return result
+
+
+@router.get("/{cv_id}/export/onetech/pdf")
+async def export_cv_onetech_pdf(
+    cv_id: str,
+    cv_service: CVServiceDep
+):
+    """Exporte un CV au format OneTech (PDF rendu directement, sans conversion DOCX)"""
+    if not REPORTLAB_AVAILABLE:
+        raise HTTPException(status_code=501, detail="Export PDF indisponible: reportlab n'est pas installé")
+    result = await cv_service.export_cv_onetech_pdf(cv_id)
     if not result:
         raise HTTPException(status_code=404, detail="CV non trouvé")
     return result
 
 
 @router.get("/{cv_id}/export/json")
-async def export_cv_json(cv_id: str):
+async def export_cv_json(
+    cv_id: str,
+    cv_service: CVServiceDep
+):
     cv_doc = await cv_service.export_cv_json(cv_id)
-    return cv_doc
+    # Document brut (dates, ObjectId éventuels) sérialisé directement par orjson,
+    # sans le passage par jsonable_encoder d'un dict retourné tel quel
+    return Response(content=orjson.dumps(cv_doc, default=str), media_type="application/json")
 
 @router.get("/{cv_id}/export/text")
 async def export_cv_text(
     cv_id: str,
-    cv_service: CVService = Depends(get_cv_service)
+    cv_service: CVServiceDep
 ):
     """Exporte un CV au format texte"""
     try:
-        print(f"📤 Export texte pour CV: {cv_id}")
+        logger.debug("📤 Export texte pour CV: %s", cv_id)
         result = await cv_service.export_cv_text(cv_id)
         if not result:
             raise HTTPException(status_code=404, detail="CV non trouvé")
@@ -343,43 +525,49 @@ async def export_cv_text(
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ Erreur export texte: {e}")
-        print(f"Traceback: {traceback.format_exc()}")
+        logger.exception("❌ Erreur export texte: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/export/text")
+async def export_cvs_text(
+    cv_service: CVServiceDep,
+    cv_ids: List[str] = Body(..., min_length=1, max_length=500)
+):
+    """Exporte plusieurs CV au format texte en une seule lecture en base ({id: texte}, ids inconnus absents)"""
+    return await cv_service.export_cvs_text_bulk(list(dict.fromkeys(cv_ids)))
     
 # Remplacez la méthode replace_cv dans votre contrôleur par cette version corrigée :
 
 @router.post("/{cv_id}/replace")
 async def replace_cv(
     cv_id: str,
-    file: UploadFile = File(...),
-    cv_service: CVService = Depends(get_cv_service)
+    file: Annotated[UploadFile, File()],
+    cv_service: CVServiceDep,
+    cache: CacheDep
 ):
     """Remplacer un CV existant par un nouveau fichier - VERSION CORRIGÉE"""
     try:
-        print(f"🔄 API: Remplacement du CV: {cv_id}")
+        logger.debug("🔄 API: Remplacement du CV: %s", cv_id)
         
         # Validation du fichier
         if not file.filename:
             raise HTTPException(status_code=400, detail="Nom de fichier manquant")
         
-        file_ext = os.path.splitext(file.filename)[1].lower()
+        file_ext = _ext(file.filename)
         if file_ext not in settings.ALLOWED_EXTENSIONS:
             raise HTTPException(
                 status_code=400, 
-                detail=f"Format non supporté. Autorisés: {', '.join(settings.ALLOWED_EXTENSIONS)}"
+                detail=f"Format non supporté. Autorisés: {settings.allowed_extensions_display}"
             )
 
-        # Vérifier la taille
-        content = await file.read()
-        if len(content) > settings.max_file_size_bytes:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Fichier trop volumineux. Max: {settings.MAX_FILE_SIZE_MB}MB"
-            )
+        # Lecture par blocs avec vérification de la taille et hash incrémental
+        content, file_hash = await _read_upload(file, cv_service.new_file_hasher())
 
         # Utiliser la nouvelle méthode du service qui gère le fichier
-        updated_cv = await cv_service.replace_cv_with_file(cv_id, content, file.filename, file_ext)
+        updated_cv = await cv_service.replace_cv_with_file(
+            cv_id, content, file.filename, file_ext, file_hash=file_hash
+        )
+        await cache.invalidate_cv(cv_id)
         
         if not updated_cv:
             raise HTTPException(status_code=404, detail="CV à remplacer non trouvé ou erreur lors du remplacement")
@@ -396,54 +584,80 @@ async def replace_cv(
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ API: Erreur remplacement CV: {e}")
-        print(f"Traceback: {traceback.format_exc()}")
+        logger.exception("❌ API: Erreur remplacement CV: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
     
 @router.get("/{cv_id}/document")
 async def get_original_document(
     cv_id: str,
-    cv_service: CVService = Depends(get_cv_service)
+    cv_service: CVServiceDep
 ):
     """
     Récupère le document original pour aperçu (avec conversion automatique DOCX->PDF)
     """
     try:
-        print(f"📄 API: Récupération document original: {cv_id}")
+        logger.debug("📄 API: Récupération document original: %s", cv_id)
         
         # Récupérer le CV pour vérifier qu'il existe
         cv_data = await cv_service.get_cv_by_id(cv_id)
         if not cv_data:
-            print(f"❌ API: CV non trouvé: {cv_id}")
+            logger.warning("❌ API: CV non trouvé: %s", cv_id)
             raise HTTPException(status_code=404, detail="CV non trouvé")
         
         if not cv_data.filename_original:
-            print(f"❌ API: Nom de fichier manquant pour CV: {cv_id}")
+            logger.warning("❌ API: Nom de fichier manquant pour CV: %s", cv_id)
             raise HTTPException(status_code=404, detail="Fichier original non disponible")
         
-        print(f"📁 API: Fichier original: {cv_data.filename_original}")
+        logger.debug("📁 API: Fichier original: %s", cv_data.filename_original)
+        
+        # Sans conversion à faire (PDF, autres formats, ou aucun convertisseur):
+        # envoi direct du fichier stocké (sendfile, sans copie en mémoire)
+        file_ext = _ext(cv_data.filename_original)
+        if not (file_ext in PREVIEW_CONVERTIBLE and _conversion_caps(cv_service.document_converter)[0]):
+            file_path = await cv_service.get_original_file_path(cv_id, cv_data.filename_original)
+            if not file_path:
+                logger.warning("❌ API: Contenu vide pour CV: %s", cv_id)
+                raise HTTPException(status_code=404, detail="Contenu du document non disponible")
+            
+            return FileResponse(
+                file_path,
+                media_type=PREVIEW_CONTENT_TYPES.get(file_ext, "application/octet-stream"),
+                filename=cv_data.filename_original,
+                content_disposition_type="inline",
+                headers={"Cache-Control": "no-cache"}
+            )
+        
+        # Document Word déjà converti lors d'un aperçu précédent
+        preview_path = cv_service.file_storage.get_preview_path(cv_id)
+        if preview_path:
+            return FileResponse(
+                preview_path,
+                media_type=PDF_CONTENT_TYPE,
+                filename=f"{cv_data.filename_original}_converted.pdf",
+                content_disposition_type="inline",
+                headers={"Cache-Control": "no-cache"}
+            )
         
         # Utiliser la méthode du service pour récupérer le document
         try:
-            content, content_type, filename = await cv_service.get_document_for_preview(cv_id)
-            print(f"📄 API: Service retourné - Content: {len(content) if content else 0} bytes, Type: {content_type}")
+            content, content_type, filename = await cv_service.get_document_for_preview(cv_id, cv_data)
+            logger.debug("📄 API: Service retourné - Content: %s bytes, Type: %s", len(content) if content else 0, content_type)
         except Exception as service_error:
-            print(f"❌ API: Erreur service get_document_for_preview: {service_error}")
+            logger.error("❌ API: Erreur service get_document_for_preview: %s", service_error)
             raise HTTPException(status_code=500, detail=f"Erreur service: {str(service_error)}")
         
         if not content:
-            print(f"❌ API: Contenu vide pour CV: {cv_id}")
+            logger.warning("❌ API: Contenu vide pour CV: %s", cv_id)
             raise HTTPException(status_code=404, detail="Contenu du document non disponible")
         
-        # Créer la réponse streaming
-        print(f"✅ API: Envoi document - {len(content)} bytes, type: {content_type}")
-        return StreamingResponse(
-            BytesIO(content),
+        # Document converti, déjà en mémoire: envoyé tel quel (Content-Length calculé)
+        logger.debug("✅ API: Envoi document - %s bytes, type: %s", len(content), content_type)
+        return Response(
+            content=content,
             media_type=content_type,
             headers={
                 "Content-Disposition": f"inline; filename={filename}",
-                "Cache-Control": "no-cache",
-                "Content-Length": str(len(content))
+                "Cache-Control": "no-cache"
             }
         )
         
@@ -451,15 +665,14 @@ async def get_original_document(
         # Relancer les HTTPException sans modification
         raise
     except Exception as e:
-        print(f"❌ API: Erreur inattendue récupération document {cv_id}: {e}")
-        print(f"Traceback: {traceback.format_exc()}")
+        logger.exception("❌ API: Erreur inattendue récupération document %s: %s", cv_id, e)
         raise HTTPException(status_code=500, detail=f"Erreur interne: {str(e)}")
 
 
 @router.get("/{cv_id}/document/info")
 async def get_document_info(
     cv_id: str,
-    cv_service: CVService = Depends(get_cv_service)
+    cv_service: CVServiceDep
 ):
     """Récupère les informations sur le document"""
     try:
@@ -467,20 +680,18 @@ async def get_document_info(
         if not cv_data:
             raise HTTPException(status_code=404, detail="CV non trouvé")
         
-        file_ext = os.path.splitext(cv_data.filename_original or "")[1].lower()
+        file_ext = _ext(cv_data.filename_original or "")
         
         # Vérifier si la conversion est supportée
-        conversion_available = False
-        if hasattr(cv_service, 'document_converter'):
-            conversion_available = cv_service.document_converter.is_conversion_available()
+        conversion_available, _ = _conversion_caps(cv_service.document_converter)
         
         return {
             "available": True,
             "filename": cv_data.filename_original,
             "size": getattr(cv_data.metadonnees, 'taille_fichier_kb', 0) if cv_data.metadonnees else 0,
             "type": file_ext,
-            "can_preview": file_ext == '.pdf' or (file_ext in ['.docx', '.doc'] and conversion_available),
-            "needs_conversion": file_ext in ['.docx', '.doc'],
+            "can_preview": file_ext == '.pdf' or (file_ext in PREVIEW_CONVERTIBLE and conversion_available),
+            "needs_conversion": file_ext in PREVIEW_CONVERTIBLE,
             "conversion_available": conversion_available,
             "lastModified": cv_data.updated_at.isoformat() if cv_data.updated_at else None,
             "url": f"/api/cv/{cv_id}/document"
@@ -489,17 +700,17 @@ async def get_document_info(
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ Erreur info document: {e}")
+        logger.error("❌ Erreur info document: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/{cv_id}/document/download")
 async def download_original_document(
     cv_id: str,
-    cv_service: CVService = Depends(get_cv_service)
+    cv_service: CVServiceDep
 ):
     """Télécharge le document original (sans conversion)"""
     try:
-        print(f"⬇️ API: Téléchargement document original: {cv_id}")
+        logger.debug("⬇️ API: Téléchargement document original: %s", cv_id)
         
         # Récupérer les métadonnées du CV
         cv_data = await cv_service.get_cv_by_id(cv_id)
@@ -509,71 +720,43 @@ async def download_original_document(
         if not cv_data.filename_original:
             raise HTTPException(status_code=404, detail="Nom de fichier original non disponible")
         
-        # Récupérer le contenu original directement
-        original_content = await cv_service._get_original_file_content(cv_id)
+        # Chemin du fichier original (envoyé directement depuis le disque)
+        file_path = await cv_service.get_original_file_path(cv_id, cv_data.filename_original)
         
-        if not original_content:
+        if not file_path:
             raise HTTPException(status_code=404, detail="Fichier original non disponible sur le serveur")
         
         # Déterminer le content-type
-        file_ext = os.path.splitext(cv_data.filename_original)[1].lower()
+        file_ext = _ext(cv_data.filename_original)
         content_type = _get_content_type(file_ext)
         
-        print(f"✅ API: Téléchargement - {len(original_content)} bytes")
-        return StreamingResponse(
-            BytesIO(original_content),
+        logger.debug("✅ API: Téléchargement - %s", file_path)
+        return FileResponse(
+            file_path,
             media_type=content_type,
-            headers={
-                "Content-Disposition": f"attachment; filename={cv_data.filename_original}",
-                "Content-Length": str(len(original_content))
-            }
+            filename=cv_data.filename_original
         )
         
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ API: Erreur téléchargement: {e}")
+        logger.error("❌ API: Erreur téléchargement: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
-# Gardez uniquement la fonction utilitaire _get_content_type
 def _get_content_type(file_extension: str) -> str:
     """Détermine le content-type selon l'extension"""
-    content_types = {
-        '.pdf': 'application/pdf',
-        '.docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
-        '.doc': 'application/msword',
-        '.txt': 'text/plain',
-    }
-    return content_types.get(file_extension.lower(), 'application/octet-stream')
-
-
-
-def _get_content_type(file_extension: str) -> str:
-    """Détermine le content-type selon l'extension"""
-    content_types = {
-        '.pdf': 'application/pdf',
-        '.docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
-        '.doc': 'application/msword',
-        '.txt': 'text/plain',
-    }
-    return content_types.get(file_extension.lower(), 'application/octet-stream')
+    return _CONTENT_TYPES.get(file_extension.lower(), 'application/octet-stream')
 
 # Endpoint pour vérifier les capacités de conversion
 @router.get("/conversion/status")
-async def get_conversion_status():
+async def get_conversion_status(cv_service: CVServiceDep):
     """Vérifie le statut des capacités de conversion"""
     try:
-        conversion_available = False
-        supported_formats = []
-        
-        # Si le service a le converter
-        if hasattr(cv_service, 'document_converter'):
-            conversion_available = cv_service.document_converter.is_conversion_available()
-            supported_formats = cv_service.document_converter.get_supported_formats()
+        conversion_available, supported_formats = _conversion_caps(cv_service.document_converter)
         
         return {
             "conversion_available": conversion_available,
-            "supported_formats": supported_formats,
+            "supported_formats": list(supported_formats),
             "timestamp": datetime.now().isoformat()
         }
         
@@ -584,3 +767,9 @@ async def get_conversion_status():
             "error": str(e),
             "timestamp": datetime.now().isoformat()
         }
+
+@router.post("/conversion/refresh")
+async def refresh_conversion_status(cv_service: CVServiceDep):
+    """Réinitialise le cache des capacités de conversion (exploitation)"""
+    _conversion_caps.cache_clear()
+    return await get_conversion_status(cv_service)
@@ -3,10 +3,14 @@
 Configuration et connexion MongoDB
 """
 
+import logging
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import IndexModel
+from pymongo.errors import OperationFailure
 from app.config import get_settings
 
 settings = get_settings()
+logger = logging.getLogger(__name__)
 
 # Variables globales pour la connexion
 client: AsyncIOMotorClient = None # type: ignore
@@ -16,19 +20,28 @@ async def connect_to_mongo():
     """Établit la connexion à MongoDB"""
     global client, database
     try:
-        print(f"🔌 Connexion à MongoDB: {settings.MONGODB_URI}")
-        client = AsyncIOMotorClient(settings.MONGODB_URI)
+        logger.debug("🔌 Connexion à MongoDB: %s", settings.MONGODB_URI)
+        client = AsyncIOMotorClient(
+            settings.MONGODB_URI,
+            maxPoolSize=settings.MONGODB_MAX_POOL_SIZE,
+            minPoolSize=settings.MONGODB_MIN_POOL_SIZE,
+            compressors=settings.MONGODB_COMPRESSORS,
+            zlibCompressionLevel=settings.MONGODB_ZLIB_LEVEL,
+            serverSelectionTimeoutMS=settings.MONGODB_SERVER_SELECTION_TIMEOUT_MS,
+            uuidRepresentation="standard"
+        )
         database = client[settings.MONGODB_DB_NAME]
         
         # Test de connexion
         await database.command("ping")
-        print(f"✅ MongoDB connecté à la base: {settings.MONGODB_DB_NAME}")
+        logger.info("✅ MongoDB connecté à la base: %s", settings.MONGODB_DB_NAME)
         
         # Créer les index si nécessaire
         await create_indexes()
+        await backfill_normalized_skills()
         
     except Exception as e:
-        print(f"❌ Erreur connexion MongoDB: {e}")
+        logger.error("❌ Erreur connexion MongoDB: %s", e)
         database = None
         raise
 
@@ -38,9 +51,9 @@ async def close_mongo_connection():
     try:
         if client is not None:  # ✅ CORRECT
             client.close()
-            print("✅ Connexion MongoDB fermée")
+            logger.info("✅ Connexion MongoDB fermée")
     except Exception as e:
-        print(f"⚠️ Erreur fermeture MongoDB: {e}")
+        logger.warning("⚠️ Erreur fermeture MongoDB: %s", e)
     finally:
         client = None
         database = None
@@ -48,7 +61,7 @@ async def close_mongo_connection():
 def get_database():
     """Retourne la base de données MongoDB"""
     if database is None:  # ✅ CORRECT
-        print("⚠️ Base de données non connectée")
+        logger.warning("⚠️ Base de données non connectée")
         return None
     return database
 
@@ -60,23 +73,73 @@ async def create_indexes():
         
         cvs_collection = database["cvs"]
         
-        # Index sur l'ID
-        await cvs_collection.create_index("id", unique=True)
+        # Tous les index en une seule commande createIndexes, construits en arrière-plan
+        specs = [
+            # Index sur l'ID
+            IndexModel([("id", 1)], unique=True, background=True),
+            # Index sur le hash de fichier pour éviter les doublons
+            IndexModel([("file_hash", 1)], unique=True, background=True),
+            # Couvre la recherche de doublon (hash -> id) sans lire le document
+            IndexModel([("file_hash", 1), ("id", 1)], background=True),
+            # Index sur les compétences pour la recherche
+            IndexModel([("competences_techniques", 1)], background=True),
+            IndexModel([("competences_techniques_normalized", 1)], background=True),
+            # Filtre par statut puis tri/plage sur la date (règle ESR: égalité, tri, plage)
+            IndexModel([("status", 1), ("created_at", -1)], background=True),
+            IndexModel([("created_at", -1)], background=True),
+            # Index sur le nom/email pour la recherche
+            IndexModel([("informations_personnelles.nom", 1)], background=True),
+            IndexModel([("informations_personnelles.email", 1)], background=True),
+        ]
+        await cvs_collection.create_indexes(specs)
         
-        # Index sur le hash de fichier pour éviter les doublons
-        await cvs_collection.create_index("file_hash", unique=True)
+        logger.info("✅ Index MongoDB créés")
         
-        # Index sur les compétences pour la recherche
-        await cvs_collection.create_index("competences_techniques")
-        
-        # Index sur le nom/email pour la recherche
-        await cvs_collection.create_index("informations_personnelles.nom")
-        await cvs_collection.create_index("informations_personnelles.email")
+    except OperationFailure as e:
+        # Index déjà existants avec d'autres options (relance sur une base existante)
+        logger.warning("⚠️ Index MongoDB non (re)créés: %s", e)
+    except Exception as e:
+        logger.warning("⚠️ Erreur création index: %s", e)
+
+async def backfill_normalized_skills():
+    """
+    Renseigne competences_techniques_normalized pour les CV enregistrés avant
+    l'ajout du champ (mise à jour côté serveur, sans rapatrier les documents)
+    """
+    try:
+        if database is None:
+            return
         
-        print("✅ Index MongoDB créés")
+        result = await database["cvs"].update_many(
+            {"competences_techniques_normalized": {"$exists": False}},
+            [{
+                "$set": {
+                    "competences_techniques_normalized": {
+                        "$setUnion": [{
+                            "$map": {
+                                "input": {"$ifNull": ["$competences_techniques", []]},
+                                "as": "skill",
+                                "in": {"$toLower": {"$trim": {"input": "$$skill"}}}
+                            }
+                        }]
+                    }
+                }
+            }]
+        )
+        if result.modified_count:
+            logger.info("✅ Compétences normalisées pour %s CV(s)", result.modified_count)
         
     except Exception as e:
-        print(f"⚠️ Erreur création index: {e}")
+        logger.warning("⚠️ Erreur normalisation des compétences: %s", e)
+
+async def warm_up_connection():
+    """Première lecture sur la collection des CV (ouvre une connexion du pool)"""
+    try:
+        if database is None:
+            return
+        await database["cvs"].find_one({}, {"_id": 1})
+    except Exception as e:
+        logger.warning("⚠️ Erreur préchauffage MongoDB: %s", e)
 
 async def check_connection():
     """Vérifie l'état de la connexion"""
@@ -88,5 +151,5 @@ async def check_connection():
         return True
         
     except Exception as e:
-        print(f"❌ Connexion MongoDB perdue: {e}")
+        logger.error("❌ Connexion MongoDB perdue: %s", e)
         return False
\ No newline at end of file
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Cache Redis des réponses de lecture (cache-aside)
+"""
+
+import logging
+from typing import Optional
+
+try:
+    import redis.asyncio as aioredis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Clés de cache (le suffixe de version permet d'invalider d'un coup après un changement de format)
+CV_LIST_KEY = "cv:list:v1"
+CV_LIST_MINIMAL_KEY = "cv:list:minimal:v1"
+CV_LIST_PATTERN = "cv:list:*"
+
+def cv_key(cv_id: str) -> str:
+    """Clé de cache d'un CV"""
+    return f"cv:{cv_id}:v1"
+
+class RedisCache:
+    """
+    Cache Redis optionnel: sans REDIS_URL, sans le paquet redis ou si le
+    serveur est injoignable, toutes les opérations sont sans effet
+    """
+
+    def __init__(self, url: Optional[str], ttl: int = 60):
+        self.url = url
+        self.ttl = ttl
+        self.client = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.client is not None
+
+    async def connect(self):
+        """Ouvre la connexion Redis si elle est configurée"""
+        if not self.url:
+            return
+        if not REDIS_AVAILABLE:
+            logger.warning("⚠️ REDIS_URL défini mais le paquet redis n'est pas installé, cache désactivé")
+            return
+        try:
+            client = aioredis.from_url(self.url)
+            await client.ping()
+            self.client = client
+            logger.info("✅ Cache Redis connecté")
+        except Exception as e:
+            logger.warning("⚠️ Redis injoignable, cache désactivé: %s", e)
+
+    async def close(self):
+        """Ferme la connexion Redis"""
+        if self.client is not None:
+            try:
+                await self.client.aclose()
+            except Exception as e:
+                logger.warning("⚠️ Erreur fermeture Redis: %s", e)
+            finally:
+                self.client = None
+
+    async def get(self, key: str) -> Optional[bytes]:
+        if self.client is None:
+            return None
+        try:
+            return await self.client.get(key)
+        except Exception as e:
+            logger.warning("⚠️ Erreur lecture cache %s: %s", key, e)
+            return None
+
+    async def set(self, key: str, value: bytes, expire: Optional[int] = None):
+        if self.client is None:
+            return
+        try:
+            await self.client.set(key, value, ex=expire or self.ttl)
+        except Exception as e:
+            logger.warning("⚠️ Erreur écriture cache %s: %s", key, e)
+
+    async def delete(self, *keys: str):
+        if self.client is None or not keys:
+            return
+        try:
+            await self.client.delete(*keys)
+        except Exception as e:
+            logger.warning("⚠️ Erreur invalidation cache %s: %s", keys, e)
+
+    async def delete_pattern(self, pattern: str):
+        """Supprime toutes les clés correspondant au motif (SCAN, non bloquant)"""
+        if self.client is None:
+            return
+        try:
+            keys = [key async for key in self.client.scan_iter(match=pattern)]
+            if keys:
+                await self.client.unlink(*keys)
+        except Exception as e:
+            logger.warning("⚠️ Erreur invalidation cache %s: %s", pattern, e)
+
+    async def invalidate_cv(self, cv_id: Optional[str] = None):
+        """Invalide la liste des CV et, si fourni, le CV concerné"""
+        if self.client is None:
+            return
+        if cv_id:
+            await self.delete(cv_key(cv_id))
+        await self.delete_pattern(CV_LIST_PATTERN)
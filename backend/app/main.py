@@ -5,36 +5,121 @@ Point d'entrée FastAPI - CV Parser System
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
 import uvicorn
 import os
+import asyncio
+import logging
+import queue
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from logging.handlers import QueueHandler, QueueListener
 from contextlib import asynccontextmanager
 
+try:
+    import uvloop  # noqa: F401
+    UVLOOP_AVAILABLE = True
+except ImportError:
+    UVLOOP_AVAILABLE = False
+
+try:
+    import httptools  # noqa: F401
+    HTTPTOOLS_AVAILABLE = True
+except ImportError:
+    HTTPTOOLS_AVAILABLE = False
+
 from app.config import get_settings
-from app.database.mongo_db import connect_to_mongo, close_mongo_connection
-from app.controllers.cv_controller import router as cv_router
+from app.database.mongo_db import connect_to_mongo, close_mongo_connection, warm_up_connection
+from app.database.redis_cache import RedisCache
+from app.controllers.cv_controller import router as cv_router, _conversion_caps
+from app.services.cv_service import CVService
+from app.services.cpu_pool import CPUPool
 
 settings = get_settings()
+logger = logging.getLogger(__name__)
+
+class DocumentAwareGZipMiddleware(GZipMiddleware):
+    """
+    GZip pour les réponses JSON/texte, sans recompresser les documents binaires
+    (PDF, DOCX: déjà compressés, et envoyés via sendfile)
+    """
+    SKIP_PATH_MARKERS = ("/document", "/export/onetech")
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and any(marker in scope["path"] for marker in self.SKIP_PATH_MARKERS):
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
+def setup_logging() -> QueueListener:
+    """
+    Configure les loggers de l'application: les handlers ne font qu'empiler
+    les enregistrements, l'écriture sur la sortie se fait dans un thread dédié
+    """
+    log_queue = queue.SimpleQueue()
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s - %(message)s"))
+    
+    app_logger = logging.getLogger("app")
+    app_logger.handlers = [QueueHandler(log_queue)]
+    app_logger.setLevel(logging.DEBUG if settings.DEBUG else logging.INFO)
+    app_logger.propagate = False
+    
+    listener = QueueListener(log_queue, stream_handler)
+    listener.start()
+    return listener
+
+async def warm_up(cv_service: CVService):
+    """Préchauffe ce que la première requête paierait sinon"""
+    await asyncio.gather(
+        asyncio.to_thread(_conversion_caps, cv_service.document_converter),
+        cv_service.warm_up(),
+        warm_up_connection()
+    )
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Gestionnaire du cycle de vie de l'application"""
     # Démarrage
-    print("🚀 Démarrage de l'application CV Parser")
-    await connect_to_mongo()
+    log_listener = setup_logging()
+    logger.info("🚀 Démarrage de l'application CV Parser")
     os.makedirs("uploads", exist_ok=True)
-    print("✅ Application initialisée")
+    # Pool de processus pour le parsing PDF/DOCX (contexte spawn: pas de fork
+    # d'un processus qui a déjà des threads et une boucle asyncio), les coeurs
+    # étant partagés entre les workers uvicorn. Recréé si un worker meurt
+    app.state.cpu_pool = CPUPool(lambda: ProcessPoolExecutor(
+        max_workers=max(1, (os.cpu_count() or 1) // settings.effective_workers),
+        mp_context=multiprocessing.get_context("spawn")
+    ))
+    # Construction du service (extracteurs, regex) pendant la connexion MongoDB
+    app.state.cv_service, _ = await asyncio.gather(
+        asyncio.to_thread(CVService, cpu_pool=app.state.cpu_pool),
+        connect_to_mongo()
+    )
+    await warm_up(app.state.cv_service)
+    # Fichiers rangés à plat par les versions précédentes, avant le renommage des anciens identifiants
+    await asyncio.to_thread(app.state.cv_service.file_storage.migrate_to_shards)
+    await app.state.cv_service.migrate_legacy_ids()
+    app.state.cache = RedisCache(settings.REDIS_URL, ttl=settings.CACHE_TTL_SECONDS)
+    await app.state.cache.connect()
+    logger.info("✅ Application initialisée")
     
     yield
     
     # Arrêt
+    await app.state.cache.close()
+    await asyncio.to_thread(app.state.cpu_pool.shutdown, wait=True, cancel_futures=True)
     await close_mongo_connection()
-    print("✅ Application arrêtée")
+    logger.info("✅ Application arrêtée")
+    log_listener.stop()
 
 app = FastAPI(
     title="🎯 CV Parser System",
     description="Système de parsing CV et matching de missions",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # CORS pour Angular
@@ -46,6 +131,8 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+app.add_middleware(DocumentAwareGZipMiddleware, minimum_size=1024, compresslevel=5)
+
 # Routes
 app.include_router(cv_router, prefix="/api/cv", tags=["CV"])
 
@@ -62,9 +149,13 @@ if __name__ == "__main__":
     print(f"📡 API: http://localhost:{settings.PORT}")
     print(f"📖 Docs: http://localhost:{settings.PORT}/docs")
     
+    # uvloop (indisponible sous Windows) et httptools si installés, sinon asyncio/h11
     uvicorn.run(
         "app.main:app",
         host=settings.HOST,
         port=settings.PORT,
-        reload=settings.DEBUG
+        reload=settings.DEBUG,
+        workers=settings.effective_workers,
+        loop="uvloop" if UVLOOP_AVAILABLE else "asyncio",
+        http="httptools" if HTTPTOOLS_AVAILABLE else "h11"
     )
\ No newline at end of file
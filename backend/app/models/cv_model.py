@@ -3,10 +3,10 @@
 Modèles Pydantic pour les données CV - Version corrigée
 """
 
-from pydantic import BaseModel, Field
-from typing import List, Optional
+from pydantic import BaseModel, ConfigDict, Field
+from typing import Dict, List, Optional
 from datetime import datetime
-import uuid
+from bson import ObjectId
 
 class PersonalInfo(BaseModel):
     """Informations personnelles - Champs optionnels"""
@@ -40,10 +40,11 @@ class CVMetadata(BaseModel):
     date_extraction: str = Field(description="Date d'extraction en format string")  # CORRIGÉ: string au lieu de datetime
     apercu_texte: Optional[str] = Field(default="", description="Aperçu du texte")
     taille_fichier_kb: Optional[float] = Field(default=0.0, description="Taille du fichier en KB")
+    scores_confiance: Optional[Dict[str, float]] = Field(default=None, description="Confiance (0-1) de l'extraction par champ")
 
 class CVData(BaseModel):
     """Structure complète d'un CV"""
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()), description="Identifiant unique du CV")
+    id: str = Field(default_factory=lambda: str(ObjectId()), description="Identifiant unique du CV (= str(_id) en base)")
     
     # Informations personnelles
     informations_personnelles: PersonalInfo = Field(default_factory=PersonalInfo, description="Informations personnelles")
@@ -62,16 +63,20 @@ class CVData(BaseModel):
     
     # Informations techniques
     filename_original: Optional[str] = Field(default=None, description="Nom du fichier original")
-    file_hash: Optional[str] = Field(default=None, description="Hash MD5 du fichier")
+    file_hash: Optional[str] = Field(default=None, description="Hash du fichier")
+    hash_algo: Optional[str] = Field(default=None, description="Algorithme du hash (absent: MD5 historique)")
     status: str = Field(default="processing", description="Statut du traitement")
     created_at: datetime = Field(default_factory=datetime.now, description="Date de création")
     updated_at: datetime = Field(default_factory=datetime.now, description="Date de mise à jour")
 
-    class Config:
-        """Configuration Pydantic"""
-        json_encoders = {
+    model_config = ConfigDict(
+        from_attributes=True,
+        extra="ignore",
+        validate_assignment=False,
+        json_encoders={
             datetime: lambda v: v.isoformat()
         }
+    )
 
 # === MODÈLES DE RÉPONSE API ===
 
@@ -88,4 +93,5 @@ class CVListResponse(BaseModel):
     success: bool
     data: List[CVData] = []
     total: int = 0
-    message: Optional[str] = None
\ No newline at end of file
+    message: Optional[str] = None
+    next_skip: Optional[int] = None  # Pagination: skip de la page suivante (absent sur la dernière page)
\ No newline at end of file
@@ -3,15 +3,89 @@
 Extracteurs d'informations - Version corrigée sans erreurs
 """
 
+import logging
+import multiprocessing
+import os
 import re
-from typing import Dict, Any, List
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
 
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Valeur renvoyée quand un champ n'est pas trouvé
+NOT_FOUND = "Non trouvé"
+
+# Confiance d'un champ selon le motif qui l'a trouvé: motif strict (email, adresse
+# avec rue/code...) ou heuristique générale (ligne de deux mots, ligne avec une ville).
+# Sous le seuil, le champ est à vérifier ou à confier à un extracteur plus coûteux
+CONFIDENCE_STRICT = 1.0
+CONFIDENCE_HEURISTIC = 0.5
+CONFIDENCE_THRESHOLD = 0.7
+
+# En dessous de cette taille, str.split reste plus rapide que le passage par numpy
+WORD_COUNT_NUMPY_MIN_CHARS = 4096
+
+if NUMPY_AVAILABLE:
+    # Octets ASCII que str.split() considère comme des espaces
+    _ASCII_SPACES = np.zeros(128, dtype=bool)
+    _ASCII_SPACES[[0x09, 0x0A, 0x0B, 0x0C, 0x0D, 0x1C, 0x1D, 0x1E, 0x1F, 0x20]] = True
+
+def count_words(text: str) -> int:
+    """
+    Nombre de mots, identique à len(text.split()) mais sans créer la liste des mots.
+    Texte ASCII long: comptage vectorisé des débuts de mots (espace suivi d'un non-espace);
+    sinon (accents, espaces Unicode) la sémantique exacte de str.split est conservée
+    """
+    if not text:
+        return 0
+    if not NUMPY_AVAILABLE or len(text) < WORD_COUNT_NUMPY_MIN_CHARS or not text.isascii():
+        return len(text.split())
+    spaces = _ASCII_SPACES[np.frombuffer(text.encode('ascii'), dtype=np.uint8)]
+    return int(np.count_nonzero(spaces[:-1] & ~spaces[1:])) + (0 if spaces[0] else 1)
+
 class InfoExtractor:
     """Extracteur d'informations structurées depuis le texte"""
     
+    # Noms de compétences dont la casse ne suit pas capitalize()
+    _SKILL_SPECIAL_CASES = {
+        'js': 'JavaScript',
+        'nodejs': 'Node.js',
+        'node.js': 'Node.js',
+        'html': 'HTML',
+        'css': 'CSS',
+        'sql': 'SQL',
+        'mysql': 'MySQL',
+        'postgresql': 'PostgreSQL',
+        'mongodb': 'MongoDB',
+        'javascript': 'JavaScript',
+        'typescript': 'TypeScript',
+        'php': 'PHP',
+        'spring boot': 'Spring Boot',
+        'ci/cd': 'CI/CD',
+        'devops': 'DevOps',
+        '.net': '.NET',
+        'javafx': 'JavaFX',
+        'symfony': 'Symfony',
+        'qt': 'Qt',
+        'spring': 'Spring',
+        'machine learning': 'Machine Learning'
+    }
+    
     def __init__(self):
-        print("🔍 Extracteur d'informations initialisé")
+        logger.debug("🔍 Extracteur d'informations initialisé")
         
         # Liste de compétences techniques
         self.competences_techniques = [
@@ -34,36 +108,130 @@ class InfoExtractor:
             'certifications': ['certifications', 'certification', 'certificats', 'certified'],
             'langues': ['compétences linguistiques', 'langues', 'languages', 'idiomes'],
         }
+        
+        # Expressions régulières compilées une seule fois
+        self._EMAIL_RE = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b')
+        # Formats de téléphone par ordre de priorité, réunis en une alternation
+        # (groupe nommé p<priorité>) pour un seul passage sur le texte
+        phone_patterns = (
+            r'\b(\+216[\s.-]?[0-9]{8})\b',           # +216 XXXXXXXX
+            r'\b(\+33[\s.-]?[0-9][\s.-]?[0-9]{8})\b', # +33 X XX XX XX XX
+            r'\b([2-9][0-9]{7})\b',                  # 8 chiffres commençant par 2-9
+            r'\b(\+[0-9]{2,3}[\s.-]?[0-9]{6,10})\b', # Format international
+            r'\b([0-9]{8})\b',                       # 8 chiffres simples
+        )
+        self._PHONE_RE = re.compile('|'.join(f'(?P<p{i}>{p})' for i, p in enumerate(phone_patterns)))
+        self._CLEAN_DIGITS_RE = re.compile(r'\D')
+        # "GUEZMIR CHAIMA" ou "Prénom Nom"
+        self._NAME_RE = re.compile(r'^(?:[A-Z]{3,}\s+[A-Z]{3,}|[A-Z][a-z]+\s+[A-Z][a-z]+)$')
+        # Table de suppression des chiffres (comptage via str.translate)
+        self._NO_DIGITS_TBL = str.maketrans('', '', '0123456789')
+        # Ponctuation autorisée dans un mot de nom composé (Jean-Marc, O'Neil)
+        self._NAME_PUNCT_TBL = str.maketrans('', '', "-'")
+        # Préfixes d'emails de templates (contact@, example@...)
+        self._TEMPLATE_EMAIL_RE = re.compile(r'(?:contact|template|example|test|sample|demo)@')
+        # Mots-clés excluant une ligne candidate pour le nom
+        self._SKIP_KEYWORDS_RE = re.compile('|'.join(re.escape(keyword) for keyword in (
+            'email', 'téléphone', 'phone', 'contact', 'skills', 'compétences',
+            'experience', 'expérience', 'formation', 'diplôme', 'certification',
+            'ingénieur', 'développeur', 'manager', 'consultant', '@', 'www', 'http'
+        )), re.IGNORECASE)
+        self._ADDRESS_RES = [re.compile(p, re.IGNORECASE) for p in (
+            r'Ariana,\s*Tunis',
+            r'Tunis,\s*Ariana',
+            r'Ariana\s*,\s*Tunisie',
+            r'Kalaat\s+Andalous\s+Ariana',
+        )]
+        # 'tunis' couvre aussi 'tunisia' et 'tunisie'
+        self._CITY_RE = re.compile(r'ariana|tunis', re.IGNORECASE)
+        self._LANG_RES = [(re.compile(p, re.IGNORECASE), langue) for p, langue in (
+            (r'Arabe\s*\(([^)]+)\)', 'Arabe'),
+            (r'Français\s*\(([^)]+)\)', 'Français'),
+            (r'Anglais\s*\(([^)]+)\)', 'Anglais'),
+        )]
+        # Compétences: variantes recherchées (telle quelle, sans espaces) -> indices dans la liste
+        self._competence_names = [self._format_skill_name(c) for c in self.competences_techniques]
+        competence_variants: Dict[str, List[int]] = {}
+        for index, competence in enumerate(self.competences_techniques):
+            # Liste statique: une entrée vide ferait correspondre n'importe quel texte
+            if not competence or not competence.strip():
+                raise ValueError(f"❌ Compétence vide à l'indice {index} de competences_techniques")
+            for variant in dict.fromkeys((competence.lower(), competence.lower().replace(' ', ''))):
+                competence_variants.setdefault(variant, []).append(index)
+        
+        # Indicateurs de template / de CV réel (type de document)
+        self._template_indicators = [
+            'template', 'model', 'example', 'sample', 'copyright',
+            'dear job seeker', 'free resources', 'download', 'lorem ipsum'
+        ]
+        self._real_cv_indicators = ['compétences', 'expérience', 'formation', '@gmail', '@yahoo', '@hotmail', 'esprit', 'stage']
+        
+        if AHOCORASICK_AVAILABLE:
+            # Les deux familles d'indicateurs comptées en un seul passage
+            self._doctype_automaton = ahocorasick.Automaton()
+            for indicator in self._template_indicators:
+                self._doctype_automaton.add_word(indicator, ('template', indicator))
+            for indicator in self._real_cv_indicators:
+                self._doctype_automaton.add_word(indicator, ('real', indicator))
+            self._doctype_automaton.make_automaton()
+        else:
+            self._doctype_automaton = None
+        
+        if AHOCORASICK_AVAILABLE:
+            # Un seul automate: toutes les compétences trouvées en un passage sur le texte
+            self._competence_automaton = ahocorasick.Automaton()
+            for variant, indexes in competence_variants.items():
+                self._competence_automaton.add_word(variant, (len(variant), indexes))
+            self._competence_automaton.make_automaton()
+        else:
+            self._competence_automaton = None
+            # Motifs validés ici une fois pour toutes: plus de try/except dans la boucle d'extraction
+            self._COMPETENCE_RES = []
+            for variant, indexes in competence_variants.items():
+                try:
+                    pattern = re.compile(r'(?<!\w)' + re.escape(variant) + r'(?!\w)')
+                except re.error as e:
+                    raise ValueError(f"❌ Motif de compétence invalide pour '{variant}': {e}") from e
+                self._COMPETENCE_RES.append((pattern, indexes))
     
     def extract_all_data(self, text: str) -> Dict[str, Any]:
         """Extrait toutes les données du CV"""
-        print("🔄 Extraction des données par sections...")
+        logger.debug("🔄 Extraction des données par sections...")
+        
+        # Texte en minuscules calculé une seule fois pour tous les extracteurs
+        text_lower = text.lower()
         
         # Détecter le type de document
-        doc_type = self.detect_document_type(text)
+        doc_type = self.detect_document_type(text, text_lower)
         
-        # Informations personnelles
-        nom = self.extract_name(text)
+        # Informations personnelles (avec la confiance du motif qui a trouvé la valeur)
+        nom, confiance_nom = self._find_name(text)
         email = self.extract_email(text)
         telephone = self.extract_phone(text)
-        adresse = self.extract_address(text)
+        adresse, confiance_adresse = self._find_address(text)
+        scores_confiance = {
+            'nom': confiance_nom,
+            'email': CONFIDENCE_STRICT if email != NOT_FOUND else 0.0,
+            'telephone': CONFIDENCE_STRICT if telephone != NOT_FOUND else 0.0,
+            'adresse': confiance_adresse,
+        }
         
         # Sections structurées
-        competences = self.extract_competences_techniques(text)
+        competences = self.extract_competences_techniques(text, text_lower)
         experiences = self.extract_experience_professionnelle(text)
         formations = self.extract_formations(text)
         certifications = self.extract_certifications(text)
         langues = self.extract_langues(text)
         
-        print(f"👤 Nom trouvé: {nom}")
-        print(f"📧 Email trouvé: {email}")
-        print(f"📞 Téléphone trouvé: {telephone}")
-        print(f"📍 Adresse trouvée: {adresse}")
-        print(f"⚙️ Compétences: {len(competences)}")
-        print(f"💼 Expériences: {len(experiences)}")
-        print(f"🎓 Formations: {len(formations)}")
-        print(f"📜 Certifications: {len(certifications)}")
-        print(f"🌐 Langues: {len(langues)}")
+        logger.debug("👤 Nom trouvé: %s", nom)
+        logger.debug("📧 Email trouvé: %s", email)
+        logger.debug("📞 Téléphone trouvé: %s", telephone)
+        logger.debug("📍 Adresse trouvée: %s", adresse)
+        logger.debug("⚙️ Compétences: %s", len(competences))
+        logger.debug("💼 Expériences: %s", len(experiences))
+        logger.debug("🎓 Formations: %s", len(formations))
+        logger.debug("📜 Certifications: %s", len(certifications))
+        logger.debug("🌐 Langues: %s", len(langues))
         
         data = {
             'informations_personnelles': {
@@ -79,23 +247,34 @@ class InfoExtractor:
             'certifications': certifications,
             'competences_linguistiques': langues,
             'metadonnees': {
-                'nombre_mots': len(text.split()),
+                'nombre_mots': count_words(text),
                 'date_extraction': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                'apercu_texte': text[:200] + "..." if len(text) > 200 else text
+                'apercu_texte': text[:200] + "..." if len(text) > 200 else text,
+                'scores_confiance': scores_confiance
             }
         }
         
-        print("✅ Extraction terminée")
+        logger.debug("✅ Extraction terminée")
         return data
     
+    @staticmethod
+    def low_confidence_fields(scores: Dict[str, float], threshold: float = CONFIDENCE_THRESHOLD) -> List[str]:
+        """Champs dont la valeur est absente ou devinée par une heuristique (à vérifier / à réextraire)"""
+        return [field for field, score in scores.items() if score < threshold]
+    
     def extract_name(self, text: str) -> str:
         """Extrait le nom du CV"""
-        print("🔍 Recherche du nom dans le texte...")
+        return self._find_name(text)[0]
+    
+    def _find_name(self, text: str) -> Tuple[str, float]:
+        """Nom du CV et confiance (motif strict ou heuristique générale)"""
+        logger.debug("🔍 Recherche du nom dans le texte...")
         
-        lines = text.split('\n')
+        # Seules les 20 premières lignes sont examinées: inutile de découper tout le texte
+        lines = text.split('\n', 20)[:20]
         
         # Chercher des patterns spécifiques dans les premières lignes
-        for i, line in enumerate(lines[:20]):
+        for line in lines:
             line = line.strip()
             
             # Ignorer les lignes trop courtes ou trop longues
@@ -103,85 +282,73 @@ class InfoExtractor:
                 continue
             
             # Mots-clés à éviter
-            skip_keywords = [
-                'email', 'téléphone', 'phone', 'contact', 'skills', 'compétences',
-                'experience', 'expérience', 'formation', 'diplôme', 'certification',
-                'ingénieur', 'développeur', 'manager', 'consultant', '@', 'www', 'http'
-            ]
-            
-            if any(keyword in line.lower() for keyword in skip_keywords):
+            if self._SKIP_KEYWORDS_RE.search(line):
                 continue
             
             # Éviter les lignes avec trop de chiffres
-            if sum(char.isdigit() for char in line) > 2:
+            if len(line) - len(line.translate(self._NO_DIGITS_TBL)) > 2:
                 continue
             
-            # Pattern pour "GUEZMIR CHAIMA" ou "Nom Prénom"
-            if re.match(r'^[A-Z]{3,}\s+[A-Z]{3,}$', line):
-                print(f"✅ Nom trouvé (format MAJUSCULES): {line}")
-                return line
-            
-            # Pattern pour "Prénom Nom"
-            if re.match(r'^[A-Z][a-z]+\s+[A-Z][a-z]+$', line):
-                print(f"✅ Nom trouvé (format normal): {line}")
-                return line.upper()
+            # Pattern pour "GUEZMIR CHAIMA" ou "Prénom Nom"
+            if self._NAME_RE.match(line):
+                logger.debug("✅ Nom trouvé: %s", line)
+                return line.upper(), CONFIDENCE_STRICT
             
             # Vérifier si c'est un nom valide
             words = line.split()
             if 2 <= len(words) <= 3:
-                if all(word.replace('-', '').replace("'", "").isalpha() for word in words):
+                if all(word.translate(self._NAME_PUNCT_TBL).isalpha() for word in words):
                     if any(word[0].isupper() and len(word) > 1 for word in words):
-                        print(f"✅ Nom trouvé (général): {line}")
-                        return line.upper()
+                        logger.debug("✅ Nom trouvé (général): %s", line)
+                        return line.upper(), CONFIDENCE_HEURISTIC
         
-        print("❌ Nom non trouvé")
-        return "Non trouvé"
+        logger.debug("❌ Nom non trouvé")
+        return NOT_FOUND, 0.0
     
     def extract_email(self, text: str) -> str:
         """Extrait l'email du CV"""
-        print("🔍 Recherche de l'email...")
+        logger.debug("🔍 Recherche de l'email...")
         
-        email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-        emails = re.findall(email_pattern, text, re.IGNORECASE)
+        emails = self._EMAIL_RE.findall(text)
         
         # Éviter les emails templates
-        template_emails = ['contact@', 'template@', 'example@', 'test@', 'sample@', 'demo@']
-        
         for email in emails:
-            if not any(template in email.lower() for template in template_emails):
-                print(f"✅ Email trouvé: {email}")
-                return email.lower()
+            email = email.lower()
+            if not self._TEMPLATE_EMAIL_RE.search(email):
+                logger.debug("✅ Email trouvé: %s", email)
+                return email
         
-        print("❌ Aucun email trouvé")
-        return "Non trouvé"
+        logger.debug("❌ Aucun email trouvé")
+        return NOT_FOUND
     
     def extract_phone(self, text: str) -> str:
         """Extrait le numéro de téléphone"""
-        print("🔍 Recherche du numéro de téléphone...")
-        
-        # Patterns pour différents formats
-        phone_patterns = [
-            r'\b(\+216[\s.-]?[0-9]{8})\b',           # +216 XXXXXXXX
-            r'\b(\+33[\s.-]?[0-9][\s.-]?[0-9]{8})\b', # +33 X XX XX XX XX
-            r'\b([2-9][0-9]{7})\b',                  # 8 chiffres commençant par 2-9
-            r'\b(\+[0-9]{2,3}[\s.-]?[0-9]{6,10})\b', # Format international
-            r'\b([0-9]{8})\b',                       # 8 chiffres simples
-        ]
+        logger.debug("🔍 Recherche du numéro de téléphone...")
         
-        for pattern in phone_patterns:
-            matches = re.findall(pattern, text)
-            for match in matches:
-                # Vérifier que ce n'est pas une année ou code postal
-                if not self._is_likely_year_or_postal_code(match):
-                    print(f"✅ Téléphone trouvé: {match}")
-                    return match
-        
-        print("❌ Aucun téléphone trouvé")
-        return "Non trouvé"
+        # Premier numéro du format le plus prioritaire
+        best = None
+        for match in self._PHONE_RE.finditer(text):
+            priority = int(match.lastgroup[1:])
+            if best is not None and priority >= best[0]:
+                continue
+            
+            number = match.group(0)
+            # Vérifier que ce n'est pas une année ou code postal
+            if not self._is_likely_year_or_postal_code(number):
+                best = (priority, number)
+                if priority == 0:
+                    break
+        
+        if best:
+            logger.debug("✅ Téléphone trouvé: %s", best[1])
+            return best[1]
+        
+        logger.debug("❌ Aucun téléphone trouvé")
+        return NOT_FOUND
     
     def _is_likely_year_or_postal_code(self, number: str) -> bool:
         """Vérifie si le numéro ressemble à une année ou code postal"""
-        clean_number = re.sub(r'[^\d]', '', number)
+        clean_number = self._CLEAN_DIGITS_RE.sub('', number)
         
         # Années probables
         if len(clean_number) == 4 and clean_number.startswith(('19', '20')):
@@ -195,93 +362,74 @@ class InfoExtractor:
     
     def extract_address(self, text: str) -> str:
         """Extrait l'adresse"""
-        print("🔍 Recherche de l'adresse...")
+        return self._find_address(text)[0]
+    
+    def _find_address(self, text: str) -> Tuple[str, float]:
+        """Adresse et confiance (motif d'adresse ou simple ligne contenant une ville)"""
+        logger.debug("🔍 Recherche de l'adresse...")
         
         # Patterns d'adresse spécifiques
-        address_patterns = [
-            r'Ariana,\s*Tunis',
-            r'Tunis,\s*Ariana',
-            r'Ariana\s*,\s*Tunisie',
-            r'Kalaat\s+Andalous\s+Ariana'
-        ]
-        
-        for pattern in address_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
+        for pattern in self._ADDRESS_RES:
+            match = pattern.search(text)
             if match:
-                print(f"✅ Adresse trouvée: {match.group(0)}")
-                return match.group(0)
-        
-        # Recherche plus générale
-        lines = text.split('\n')
-        for line in lines:
-            line = line.strip()
-            if any(keyword in line.lower() for keyword in ['ariana', 'tunis', 'tunisia', 'tunisie']):
-                if 3 < len(line) < 100 and '@' not in line:
-                    print(f"✅ Adresse trouvée (générale): {line}")
-                    return line
-        
-        print("❌ Aucune adresse trouvée")
-        return "Non trouvé"
+                logger.debug("✅ Adresse trouvée: %s", match.group(0))
+                return match.group(0), CONFIDENCE_STRICT
+        
+        # Recherche plus générale (uniquement si une ville apparaît dans le texte)
+        if self._CITY_RE.search(text):
+            for line in text.split('\n'):
+                if self._CITY_RE.search(line):
+                    line = line.strip()
+                    if 3 < len(line) < 100 and '@' not in line:
+                        logger.debug("✅ Adresse trouvée (générale): %s", line)
+                        return line, CONFIDENCE_HEURISTIC
+        
+        logger.debug("❌ Aucune adresse trouvée")
+        return NOT_FOUND, 0.0
     
-    def extract_competences_techniques(self, text: str) -> List[str]:
+    def extract_competences_techniques(self, text: str, text_lower: Optional[str] = None) -> List[str]:
         """Extrait les compétences techniques"""
-        print("🔍 Recherche des compétences techniques...")
+        logger.debug("🔍 Recherche des compétences techniques...")
         
-        text_lower = text.lower()
-        competences_trouvees = []
+        if text_lower is None:
+            text_lower = text.lower()
+        found = set()
         
-        for competence in self.competences_techniques:
-            # Patterns de recherche corrigés
-            patterns = [
-                r'\b' + re.escape(competence.lower()) + r'\b',
-                r'\b' + re.escape(competence.lower().replace('.', r'\.')) + r'\b',
-                r'\b' + re.escape(competence.lower().replace(' ', '')) + r'\b',
-            ]
-            
-            for pattern in patterns:
-                try:
-                    if re.search(pattern, text_lower):
-                        formatted_name = self._format_skill_name(competence)
-                        if formatted_name not in competences_trouvees:
-                            competences_trouvees.append(formatted_name)
-                            print(f"✅ Compétence trouvée: {formatted_name}")
-                        break
-                except re.error:
-                    continue
+        if self._competence_automaton is not None:
+            for end, (length, indexes) in self._competence_automaton.iter(text_lower):
+                if (self._is_word_boundary(text_lower, end - length)
+                        and self._is_word_boundary(text_lower, end + 1)):
+                    found.update(indexes)
+        else:
+            for pattern, indexes in self._COMPETENCE_RES:
+                if pattern.search(text_lower):
+                    found.update(indexes)
+        
+        # Ordre de la liste des compétences, comme le nommage formaté
+        competences_trouvees = []
+        for index in sorted(found):
+            formatted_name = self._competence_names[index]
+            if formatted_name not in competences_trouvees:
+                competences_trouvees.append(formatted_name)
+                logger.debug("✅ Compétence trouvée: %s", formatted_name)
         
         return competences_trouvees[:20]
     
+    @staticmethod
+    def _is_word_boundary(text: str, index: int) -> bool:
+        """Vrai si le caractère à cette position n'est pas un caractère de mot (ou hors du texte)"""
+        if index < 0 or index >= len(text):
+            return True
+        char = text[index]
+        return not (char.isalnum() or char == '_')
+    
     def _format_skill_name(self, skill: str) -> str:
         """Formate le nom d'une compétence"""
-        special_cases = {
-            'js': 'JavaScript',
-            'nodejs': 'Node.js',
-            'node.js': 'Node.js',
-            'html': 'HTML',
-            'css': 'CSS',
-            'sql': 'SQL',
-            'mysql': 'MySQL',
-            'postgresql': 'PostgreSQL',
-            'mongodb': 'MongoDB',
-            'javascript': 'JavaScript',
-            'typescript': 'TypeScript',
-            'php': 'PHP',
-            'spring boot': 'Spring Boot',
-            'ci/cd': 'CI/CD',
-            'devops': 'DevOps',
-            '.net': '.NET',
-            'javafx': 'JavaFX',
-            'symfony': 'Symfony',
-            'qt': 'Qt',
-            'spring': 'Spring',
-            'machine learning': 'Machine Learning'
-        }
-        
-        return special_cases.get(skill.lower(), skill.capitalize())
+        return self._SKILL_SPECIAL_CASES.get(skill.lower(), skill.capitalize())
     
     def extract_experience_professionnelle(self, text: str) -> List[Dict[str, str]]:
         """Extrait les expériences professionnelles"""
-        print("🔍 Recherche des expériences professionnelles...")
+        logger.debug("🔍 Recherche des expériences professionnelles...")
         
         experiences = []
         lines = text.split('\n')
@@ -301,7 +449,7 @@ class InfoExtractor:
                         'description': 'Stage de découverte professionnelle'
                     }
                     experiences.append(exp)
-                    print(f"✅ Expérience trouvée: {exp['poste']} chez {exp['entreprise']}")
+                    logger.debug("✅ Expérience trouvée: %s chez %s", exp['poste'], exp['entreprise'])
                 
                 elif 'JUILLET 2022' in line:
                     exp = {
@@ -311,13 +459,13 @@ class InfoExtractor:
                         'description': 'Formation en compétences interpersonnelles'
                     }
                     experiences.append(exp)
-                    print(f"✅ Expérience trouvée: {exp['poste']} chez {exp['entreprise']}")
+                    logger.debug("✅ Expérience trouvée: %s chez %s", exp['poste'], exp['entreprise'])
         
         return experiences
     
     def extract_formations(self, text: str) -> List[Dict[str, str]]:
         """Extrait les formations"""
-        print("🔍 Recherche des formations...")
+        logger.debug("🔍 Recherche des formations...")
         
         formations = []
         
@@ -330,7 +478,7 @@ class InfoExtractor:
                 'mention': 'En cours'
             }
             formations.append(formation)
-            print(f"✅ Formation trouvée: {formation['diplome']} - {formation['etablissement']}")
+            logger.debug("✅ Formation trouvée: %s - %s", formation['diplome'], formation['etablissement'])
         
         if 'BACCALAURÉAT' in text.upper():
             formation = {
@@ -340,65 +488,89 @@ class InfoExtractor:
                 'mention': ''
             }
             formations.append(formation)
-            print(f"✅ Formation trouvée: {formation['diplome']} - {formation['etablissement']}")
+            logger.debug("✅ Formation trouvée: %s - %s", formation['diplome'], formation['etablissement'])
         
         return formations
     
     def extract_certifications(self, text: str) -> List[str]:
         """Extrait les certifications"""
-        print("🔍 Recherche des certifications...")
+        logger.debug("🔍 Recherche des certifications...")
         
         certifications = []
         
         # Recherche de formations courtes ou certifications
         if 'Tunisian Training' in text and 'Full Stack' in text:
             certifications.append('Formation Full Stack JS / Angular & Spring Boot - Tunisian Training')
-            print("✅ Certification trouvée: Formation Full Stack")
+            logger.debug("✅ Certification trouvée: Formation Full Stack")
         
         return certifications
     
     def extract_langues(self, text: str) -> List[Dict[str, str]]:
         """Extrait les langues"""
-        print("🔍 Recherche des langues...")
+        logger.debug("🔍 Recherche des langues...")
         
         langues = []
         
         # Patterns spécifiques pour les langues avec niveaux
-        langue_patterns = [
-            (r'Arabe\s*\(([^)]+)\)', 'Arabe'),
-            (r'Français\s*\(([^)]+)\)', 'Français'),
-            (r'Anglais\s*\(([^)]+)\)', 'Anglais')
-        ]
-        
-        for pattern, langue in langue_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
+        for pattern, langue in self._LANG_RES:
+            match = pattern.search(text)
             if match:
                 niveau = match.group(1)
                 langues.append({
                     'langue': langue,
                     'niveau': niveau
                 })
-                print(f"✅ Langue trouvée: {langue} - {niveau}")
+                logger.debug("✅ Langue trouvée: %s - %s", langue, niveau)
         
         return langues
     
-    def detect_document_type(self, text: str) -> str:
+    def extract_batch(self, texts: List[str], max_workers: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Extrait les données de plusieurs CV en parallèle (un processus par cœur)"""
+        if len(texts) < 2:
+            return [self.extract_all_data(text) for text in texts]
+        
+        workers = min(max_workers or os.cpu_count() or 1, len(texts))
+        # Lots de plusieurs textes par envoi pour limiter les allers-retours entre processus
+        chunksize = max(1, len(texts) // (workers * 4))
+        logger.info("🔄 Extraction de %s CV sur %s processus", len(texts), workers)
+        
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+            return list(executor.map(_extract_batch_job, texts, chunksize=chunksize))
+    
+    def detect_document_type(self, text: str, text_lower: Optional[str] = None) -> str:
         """Détecte si c'est un template ou un vrai CV"""
-        template_indicators = [
-            'template', 'model', 'example', 'sample', 'copyright',
-            'dear job seeker', 'free resources', 'download', 'lorem ipsum'
-        ]
-        
-        text_lower = text.lower()
-        template_count = sum(1 for indicator in template_indicators if indicator in text_lower)
-        
-        # Indicateurs de CV réel
-        real_cv_indicators = ['compétences', 'expérience', 'formation', '@gmail', '@yahoo', '@hotmail', 'esprit', 'stage']
-        real_cv_count = sum(1 for indicator in real_cv_indicators if indicator in text_lower)
+        if text_lower is None:
+            text_lower = text.lower()
+        
+        if self._doctype_automaton is not None:
+            # Nombre d'indicateurs distincts présents, par famille
+            template_count = real_cv_count = 0
+            seen = set()
+            for _, (kind, indicator) in self._doctype_automaton.iter(text_lower):
+                if indicator in seen:
+                    continue
+                seen.add(indicator)
+                if kind == 'template':
+                    template_count += 1
+                else:
+                    real_cv_count += 1
+        else:
+            template_count = sum(1 for indicator in self._template_indicators if indicator in text_lower)
+            # Indicateurs de CV réel
+            real_cv_count = sum(1 for indicator in self._real_cv_indicators if indicator in text_lower)
         
         if template_count >= 2:
             return "template"
         elif real_cv_count >= 3:
             return "cv_reel"
         else:
-            return "cv_reel"
\ No newline at end of file
+            return "cv_reel"
+
+# Extracteur propre au processus courant: construit une fois par worker de extract_batch
+_batch_extractor: Optional[InfoExtractor] = None
+
+def _extract_batch_job(text: str) -> Dict[str, Any]:
+    global _batch_extractor
+    if _batch_extractor is None:
+        _batch_extractor = InfoExtractor()
+    return _batch_extractor.extract_all_data(text)
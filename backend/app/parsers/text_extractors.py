@@ -3,14 +3,42 @@
 Extracteurs de texte - Votre MultiFormatReader adapté
 """
 
+import importlib
+import logging
 import os
-from typing import Optional
+from io import BytesIO
+from typing import BinaryIO, Optional, Union
+
+try:
+    import pypdfium2 as pdfium
+    PDFIUM_AVAILABLE = True
+except ImportError:
+    PDFIUM_AVAILABLE = False
+
+try:
+    from charset_normalizer import from_bytes
+    CHARSET_NORMALIZER_AVAILABLE = True
+except ImportError:
+    CHARSET_NORMALIZER_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Encodages acceptés depuis charset-normalizer pour les fichiers texte non UTF-8
+_TXT_DETECTED_ENCODINGS = frozenset({
+    'cp1252', 'latin_1', 'iso8859_15', 'utf_16', 'utf_16_le', 'utf_16_be', 'utf_32', 'utf_32_le', 'utf_32_be',
+})
+
+# Bibliothèques importées à la première lecture d'un format (PyPDF2: repli sans PDFium)
+_LAZY_PARSER_MODULES = ('docx', 'pptx', 'pandas') + (() if PDFIUM_AVAILABLE else ('PyPDF2',))
+
+# Chemin du fichier ou flux binaire déjà ouvert (contenu en mémoire)
+Source = Union[str, BinaryIO]
 
 class TextExtractor:
     """Extracteur de texte multi-format"""
     
     def __init__(self):
-        print("📚 Extracteur de texte initialisé")
+        logger.debug("📚 Extracteur de texte initialisé")
         
         # Formats supportés
         self.supported_formats = {
@@ -24,140 +52,204 @@ class TextExtractor:
             '.ppt': self._read_pptx
         }
     
+    @staticmethod
+    def preload_parsers():
+        """Importe d'avance les bibliothèques de lecture (préchauffage d'un worker)"""
+        for module_name in _LAZY_PARSER_MODULES:
+            try:
+                importlib.import_module(module_name)
+            except ImportError:
+                logger.debug("⚠️ %s non installé, préchargement ignoré", module_name)
+    
     def extract_text(self, file_path: str) -> str:
-        """Extrait le texte selon le format du fichier"""
+        """Extrait le texte selon le format du fichier (extension déduite du chemin)"""
+        return self._extract(file_path, os.path.splitext(file_path)[1].lower())
+    
+    def extract_from_bytes(self, content: bytes, file_ext: str) -> str:
+        """Extrait le texte d'un contenu en mémoire, sans passer par un fichier temporaire"""
+        return self._extract(BytesIO(content), file_ext.lower())
+    
+    def _extract(self, source: Source, file_ext: str) -> str:
         try:
-            file_ext = os.path.splitext(file_path)[1].lower()
             reader_function = self.supported_formats.get(file_ext)
             
             if reader_function:
-                print(f"🔄 Extraction du texte ({file_ext.upper()})...")
-                text = reader_function(file_path)
-                print(f"✅ Extraction terminée: {len(text)} caractères extraits")
+                logger.debug("🔄 Extraction du texte (%s)...", file_ext.upper())
+                text = reader_function(source)
+                logger.debug("✅ Extraction terminée: %s caractères extraits", len(text))
                 return text
             else:
-                print(f"❌ Format non supporté: {file_ext}")
+                logger.error("❌ Format non supporté: %s", file_ext)
                 return ""
                 
         except Exception as e:
-            print(f"❌ Erreur lors de l'extraction: {e}")
+            logger.error("❌ Erreur lors de l'extraction: %s", e)
             return ""
     
-    def _read_pdf(self, file_path: str) -> str:
-        """Lit un fichier PDF"""
+    def _read_pdf(self, source: Source) -> str:
+        """Lit un fichier PDF (PDFium si disponible, sinon PyPDF2)"""
+        if PDFIUM_AVAILABLE:
+            return self._read_pdf_pdfium(source)
+        return self._read_pdf_pypdf2(source)
+    
+    def _read_pdf_pdfium(self, source: Source) -> str:
+        """Lit un fichier PDF avec pypdfium2 (parseur C++ de PDFium)"""
         try:
-            import PyPDF2
-            with open(file_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                full_text = ""
-                
-                num_pages = len(pdf_reader.pages)
-                print(f"📄 PDF contient {num_pages} page(s)")
+            pdf = pdfium.PdfDocument(source)
+            try:
+                num_pages = len(pdf)
+                logger.debug("📄 PDF contient %s page(s)", num_pages)
                 
+                pages_text = []
                 for page_num in range(num_pages):
-                    page = pdf_reader.pages[page_num]
-                    page_text = page.extract_text()
-                    full_text += page_text + "\n\n"
+                    page = pdf[page_num]
+                    textpage = page.get_textpage()
+                    # PDFium sépare les lignes par \r\n
+                    pages_text.append(textpage.get_text_range().replace("\r\n", "\n"))
+                    textpage.close()
+                    page.close()
                 
-                return full_text.strip()
+                return "\n\n".join(pages_text).strip()
+            finally:
+                pdf.close()
+        except Exception as e:
+            logger.error("❌ Erreur PDF: %s", e)
+            return ""
+    
+    def _read_pdf_pypdf2(self, source: Source) -> str:
+        """Lit un fichier PDF avec PyPDF2"""
+        try:
+            import PyPDF2
+            pdf_reader = PyPDF2.PdfReader(source)
+            
+            num_pages = len(pdf_reader.pages)
+            logger.debug("📄 PDF contient %s page(s)", num_pages)
+            
+            pages_text = [page.extract_text() for page in pdf_reader.pages]
+            return "\n\n".join(pages_text).strip()
         except ImportError:
-            print("❌ PyPDF2 non installé")
+            logger.error("❌ PyPDF2 non installé")
             return ""
         except Exception as e:
-            print(f"❌ Erreur PDF: {e}")
+            logger.error("❌ Erreur PDF: %s", e)
             return ""
     
-    def _read_docx(self, file_path: str) -> str:
+    def _read_docx(self, source: Source) -> str:
         """Lit un fichier Word DOCX"""
         try:
             from docx import Document
-            doc = Document(file_path)
-            full_text = ""
+            doc = Document(source)
+            parts = []
             
-            print(f"📄 Document contient {len(doc.paragraphs)} paragraphes")
+            logger.debug("📄 Document contient %s paragraphes", len(doc.paragraphs))
             
             # Extraire le texte des paragraphes
             for paragraph in doc.paragraphs:
-                full_text += paragraph.text + "\n"
+                parts.append(paragraph.text + "\n")
             
             # Extraire le texte des tableaux
             for table in doc.tables:
                 for row in table.rows:
                     for cell in row.cells:
-                        full_text += cell.text + " "
-                full_text += "\n"
+                        parts.append(cell.text + " ")
+                parts.append("\n")
             
-            return full_text.strip()
+            return "".join(parts).strip()
             
         except ImportError:
-            print("❌ python-docx non installé")
+            logger.error("❌ python-docx non installé")
             return ""
         except Exception as e:
-            print(f"❌ Erreur DOCX: {e}")
-            return self._read_txt(file_path)
+            logger.error("❌ Erreur DOCX: %s", e)
+            return self._read_txt(source)
     
-    def _read_txt(self, file_path: str) -> str:
-        """Lit un fichier texte"""
-        encodings = ['utf-8', 'latin-1', 'cp1252', 'iso-8859-1']
+    def _read_txt(self, source: Source) -> str:
+        """Lit un fichier texte (une seule lecture, encodage détecté si ce n'est pas de l'UTF-8)"""
+        try:
+            if isinstance(source, str):
+                with open(source, 'rb') as file:
+                    raw = file.read()
+            else:
+                # Le flux a pu être partiellement lu par un autre lecteur (repli DOCX)
+                source.seek(0)
+                raw = source.read()
+        except OSError as e:
+            logger.error("❌ Erreur lecture fichier texte: %s", e)
+            return ""
         
-        for encoding in encodings:
-            try:
-                with open(file_path, 'r', encoding=encoding) as file:
-                    text = file.read()
-                    print(f"📄 Fichier texte lu avec encodage {encoding}")
-                    return text
-            except UnicodeDecodeError:
-                continue
+        # Cas le plus courant: UTF-8
+        try:
+            text = raw.decode('utf-8')
+            logger.debug("📄 Fichier texte lu avec encodage utf-8")
+            return text
+        except UnicodeDecodeError:
+            pass
+        
+        # Détection retenue seulement pour un encodage occidental ou UTF-16/32: sur de
+        # courts textes français en cp1252, elle propose volontiers cp775, cp1006...
+        if CHARSET_NORMALIZER_AVAILABLE:
+            match = from_bytes(raw).best()
+            if match is not None and match.encoding in _TXT_DETECTED_ENCODINGS:
+                logger.debug("📄 Fichier texte lu avec encodage %s", match.encoding)
+                return str(match)
+        
+        # Encodage Windows occidental, le plus courant hors UTF-8
+        try:
+            text = raw.decode('cp1252')
+            logger.debug("📄 Fichier texte lu avec encodage cp1252")
+            return text
+        except UnicodeDecodeError:
+            pass
         
-        print("❌ Impossible de décoder le fichier texte")
-        return ""
+        # latin-1 décode n'importe quelle suite d'octets
+        logger.debug("📄 Fichier texte lu avec encodage latin-1")
+        return raw.decode('latin-1')
     
-    def _read_xlsx(self, file_path: str) -> str:
+    def _read_xlsx(self, source: Source) -> str:
         """Lit un fichier Excel"""
         try:
             import pandas as pd
-            excel_file = pd.ExcelFile(file_path)
-            full_text = ""
+            excel_file = pd.ExcelFile(source)
+            parts = []
             
-            print(f"📄 Excel contient {len(excel_file.sheet_names)} feuille(s)")
+            logger.debug("📄 Excel contient %s feuille(s)", len(excel_file.sheet_names))
             
             for sheet_name in excel_file.sheet_names:
-                df = pd.read_excel(file_path, sheet_name=sheet_name)
+                # Classeur déjà ouvert; dtype=str évite l'inférence de types
+                df = excel_file.parse(sheet_name, dtype=str)
                 
                 for column in df.columns:
-                    full_text += f"{column}: "
-                    for value in df[column].dropna():
-                        full_text += str(value) + " "
-                    full_text += "\n"
+                    parts.append(f"{column}: " + " ".join(df[column].dropna()))
             
-            return full_text.strip()
+            return "\n".join(parts).strip()
             
         except ImportError:
-            print("❌ pandas non installé")
+            logger.error("❌ pandas non installé")
             return ""
         except Exception as e:
-            print(f"❌ Erreur Excel: {e}")
+            logger.error("❌ Erreur Excel: %s", e)
             return ""
     
-    def _read_pptx(self, file_path: str) -> str:
+    def _read_pptx(self, source: Source) -> str:
         """Lit un fichier PowerPoint"""
         try:
             from pptx import Presentation
-            prs = Presentation(file_path)
-            full_text = ""
+            prs = Presentation(source)
+            parts = []
             
-            print(f"📄 PowerPoint contient {len(prs.slides)} slide(s)")
+            logger.debug("📄 PowerPoint contient %s slide(s)", len(prs.slides))
             
             for slide in prs.slides:
                 for shape in slide.shapes:
-                    if hasattr(shape, "text"):
-                        full_text += shape.text + "\n"
+                    shape_text = getattr(shape, "text", None)
+                    if shape_text:
+                        parts.append(shape_text)
             
-            return full_text.strip()
+            return "\n".join(parts).strip()
             
         except ImportError:
-            print("❌ python-pptx non installé")
+            logger.error("❌ python-pptx non installé")
             return ""
         except Exception as e:
-            print(f"❌ Erreur PowerPoint: {e}")
+            logger.error("❌ Erreur PowerPoint: %s", e)
             return ""
\ No newline at end of file
@@ -3,335 +3,612 @@
 Repository CV - Accès aux données - Version complète
 """
 
-from typing import List, Optional
+import asyncio
+from typing import Any, AsyncIterator, List, Optional, Dict, Tuple
+from collections import OrderedDict
 from datetime import datetime
+from functools import lru_cache
 from bson import ObjectId
-import traceback
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError
+import logging
+import re
+import time
+import orjson
 
 from app.database.mongo_db import get_database
 from app.models.cv_model import CVData
 
+logger = logging.getLogger(__name__)
+
+# Vue liste: exclut les champs volumineux inutiles à l'affichage d'une liste
+LIST_VIEW_PROJECTION: Dict[str, int] = {
+    "nlp_enrichment": 0,
+    "metadonnees.apercu_texte": 0,
+}
+
+def normalize_skills(skills) -> List[str]:
+    """Compétences en minuscules et sans doublons (ordre conservé), pour la recherche indexée"""
+    return list(dict.fromkeys(
+        skill.strip().lower() for skill in skills or [] if isinstance(skill, str) and skill.strip()
+    ))
+
+# Champs exposés par l'API (les champs internes, ex. competences_techniques_normalized, sont omis)
+_CV_FIELDS = frozenset(CVData.model_fields)
+
+# Options de décodage BSON de la collection, ajoutées à celles du client (uuidRepresentation).
+# Dates naïves (tz_aware=False) comme jusqu'ici: les documents existants et le frontend
+# les interprètent en heure locale; une chaîne UTF-8 invalide ne fait pas échouer la lecture
+CODEC_OVERRIDES: Dict[str, Any] = {
+    "document_class": dict,
+    "tz_aware": False,
+    "unicode_decode_error_handler": "ignore",
+}
+
+def _cv_collection(db, name: str = "cvs"):
+    """Collection des CV avec les options de décodage de l'application"""
+    return db.get_collection(name, codec_options=db.codec_options.with_options(**CODEC_OVERRIDES))
+
+# Forme textuelle d'un ObjectId (24 caractères hexadécimaux), vérifiée sans instancier ObjectId
+_HEX24 = re.compile(r"[0-9a-fA-F]{24}").fullmatch
+
+# Nombre de documents rapatriés par aller-retour pour les listes en streaming
+STREAM_BATCH_SIZE = 500
+
+# Nombre maximal de CV envoyés dans un même insert_many par create_cv_grouped
+INSERT_BATCH_MAX = 100
+
+# Cache mémoire de get_cv_by_id: absorbe les lectures répétées d'un même CV au
+# sein d'une requête (durée courte, le cache n'est pas partagé entre workers)
+CV_CACHE_TTL = 5.0
+CV_CACHE_MAXSIZE = 1024
+
+class _TTLCache:
+    """Cache LRU à durée de vie limitée, propre au processus"""
+    
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+    
+    def get(self, key: str) -> Any:
+        item = self._data.get(key)
+        if item is None:
+            return None
+        expires_at, value = item
+        if expires_at < time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+    
+    def set(self, key: str, value: Any):
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+    
+    def pop(self, key: str):
+        self._data.pop(key, None)
+    
+    def clear(self):
+        self._data.clear()
+
+def _without_none(value: Any) -> Any:
+    """Supprime récursivement les clés à None (équivalent de exclude_none)"""
+    if isinstance(value, dict):
+        return {key: _without_none(item) for key, item in value.items() if item is not None}
+    if isinstance(value, list):
+        return [_without_none(item) for item in value]
+    return value
+
+def _normalize_id(doc: dict) -> dict:
+    """Remplace _id par id (chaîne), en place"""
+    _id = doc.pop("_id", None)
+    if _id is not None:
+        doc["id"] = _id if isinstance(_id, str) else str(_id)
+    return doc
+
+def _to_models(docs: List[dict]) -> List[CVData]:
+    """Documents Mongo -> CVData (validation Pydantic, coûteuse en CPU)"""
+    cvs = []
+    for doc in docs:
+        try:
+            cvs.append(CVData(**_normalize_id(doc)))
+        except Exception as e:
+            logger.warning("⚠️ Erreur conversion document: %s", e)
+    return cvs
+
+def _doc_to_json(doc: dict) -> bytes:
+    """Document Mongo -> JSON de l'API, sans instancier CVData"""
+    _normalize_id(doc)
+    return orjson.dumps(
+        {key: _without_none(value) for key, value in doc.items() if key in _CV_FIELDS and value is not None},
+        default=str
+    )
+
+@lru_cache(maxsize=256)
+def _normalized_skills_key(skills: Tuple[str, ...]) -> Tuple[str, ...]:
+    """Normalisation mémorisée par combinaison de compétences (recherches répétées)"""
+    return tuple(normalize_skills(skills))
+
+def _changed_fields(old: Any, new: Any, path: str, changes: Dict[str, Any],
+                    removed: Dict[str, str]) -> None:
+    """
+    Ajoute à changes les valeurs de new qui diffèrent de old, et à removed les clés
+    de old absentes de new, sous forme de chemins pointés ("informations_personnelles.email",
+    "experience_professionnelle.2.poste"): $set + $unset reproduisent un remplacement complet
+    """
+    if isinstance(old, dict) and isinstance(new, dict):
+        for key, value in new.items():
+            key_path = f"{path}.{key}" if path else key
+            if key in old:
+                _changed_fields(old[key], value, key_path, changes, removed)
+            else:
+                changes[key_path] = value
+        for key in old.keys() - new.keys():
+            removed[f"{path}.{key}" if path else key] = ""
+    elif isinstance(old, list) and isinstance(new, list) and len(old) == len(new) and path:
+        for index, (old_item, new_item) in enumerate(zip(old, new)):
+            _changed_fields(old_item, new_item, f"{path}.{index}", changes, removed)
+    elif old != new:
+        changes[path] = new
+
+def _skills_query(skills: List[str]) -> dict:
+    """Correspondance exacte sur la copie normalisée (minuscules) des compétences"""
+    return {"competences_techniques_normalized": {"$in": list(_normalized_skills_key(tuple(skills)))}}
+
 class CVRepository:
     """Repository pour la gestion complète des CV en base"""
     
     def __init__(self):
         self.collection_name = "cvs"
+        # Passe à False dès qu'il ne reste plus de hash historique (MD5) à migrer
+        self._legacy_hashes_remaining: Optional[bool] = None
+        # Collection résolue au premier accès (le repository vit aussi longtemps que la connexion)
+        self._collection = None
+        # CV récemment lus, invalidés à chaque écriture
+        self._cv_cache = _TTLCache(CV_CACHE_MAXSIZE, CV_CACHE_TTL)
+        # Insertions en attente de create_cv_grouped (document, future) et tâche qui les envoie
+        self._pending_inserts: List[Tuple[dict, asyncio.Future]] = []
+        self._insert_task: Optional[asyncio.Task] = None
     
     def _get_collection(self):
         """Récupère la collection MongoDB"""
+        if self._collection is not None:
+            return self._collection
         try:
             db = get_database()
             if db is None:
                 raise Exception("Base de données non connectée")
             
-            collection = db[self.collection_name]
-            return collection
+            self._collection = _cv_collection(db, self.collection_name)
+            return self._collection
         except Exception as e:
-            print(f"❌ Erreur accès collection: {e}")
+            logger.error("❌ Erreur accès collection: %s", e)
             raise
 
 
     
+    @staticmethod
+    def _to_document(cv_data: CVData) -> dict:
+        """Document Mongo d'un nouveau CV"""
+        # Convertir en dictionnaire pour MongoDB
+        cv_dict = cv_data.model_dump()
+        cv_dict["competences_techniques_normalized"] = normalize_skills(cv_dict.get("competences_techniques"))
+        
+        # _id et id portent la même valeur (id == str(_id)): toutes les requêtes se font sur id seul
+        _id = ObjectId(cv_data.id) if isinstance(cv_data.id, str) and _HEX24(cv_data.id) else ObjectId()
+        cv_dict["_id"] = _id
+        cv_dict["id"] = str(_id)
+        return cv_dict
+    
     async def create_cv(self, cv_data: CVData) -> Optional[CVData]:
         """Crée un nouveau CV en base"""
         try:
-            print(f"💾 Sauvegarde CV: {cv_data.id}")
+            logger.debug("💾 Sauvegarde CV: %s", cv_data.id)
             collection = self._get_collection()
             
-            # Convertir en dictionnaire pour MongoDB
-            cv_dict = cv_data.dict()
-            
-            # Utiliser l'ID généré comme id, mais laisser MongoDB créer son propre _id
-            # Ne pas définir _id manuellement, laisser MongoDB le générer
-            if "_id" in cv_dict:
-                cv_dict.pop("_id")
+            cv_dict = self._to_document(cv_data)
             
             # Sauvegarder
             result = await collection.insert_one(cv_dict)
             
             if result.inserted_id:
-                print(f"✅ CV sauvegardé avec l'ID MongoDB: {result.inserted_id}")
-                # Mettre à jour l'ID avec l'ObjectId généré par MongoDB
-                cv_dict["_id"] = result.inserted_id
+                logger.debug("✅ CV sauvegardé avec l'ID MongoDB: %s", result.inserted_id)
                 return CVData(**cv_dict)
             else:
-                print("❌ Échec de la sauvegarde")
+                logger.error("❌ Échec de la sauvegarde")
                 return None
                 
         except Exception as e:
-            print(f"❌ Erreur création CV: {e}")
-            print(f"Traceback: {traceback.format_exc()}")
+            logger.exception("❌ Erreur création CV: %s", e)
             raise
     
-    async def get_all_cvs(self) -> List[CVData]:
-        """Récupère tous les CV"""
+    async def create_cvs_bulk(self, cvs: List[CVData]) -> Tuple[List[CVData], List[str]]:
+        """
+        Insère plusieurs CV en un seul aller-retour (insert_many non ordonné).
+        Retourne (CV créés, ids rejetés, ex. doublon sur l'index unique file_hash)
+        """
+        if not cvs:
+            return [], []
+        
+        docs = [self._to_document(cv_data) for cv_data in cvs]
+        rejected_indexes = await self._insert_documents(docs)
+        
+        created = [CVData(**doc) for index, doc in enumerate(docs) if index not in rejected_indexes]
+        rejected = [docs[index]["id"] for index in sorted(rejected_indexes)]
+        logger.debug("✅ %s CV(s) sauvegardé(s) en une insertion groupée", len(created))
+        return created, rejected
+    
+    async def _insert_documents(self, docs: List[dict]) -> Dict[int, dict]:
+        """insert_many non ordonné; retourne les erreurs d'écriture par index de document"""
         try:
-            print("📋 Récupération de tous les CV depuis MongoDB...")
-            collection = self._get_collection()
-            
-            # Récupérer tous les documents
-            cursor = collection.find({})
-            cvs = []
-            
-            async for doc in cursor:
+            await self._get_collection().insert_many(docs, ordered=False)
+            return {}
+        except BulkWriteError as e:
+            # Non ordonné: les autres documents sont insérés malgré les erreurs
+            errors = {error["index"]: error for error in e.details.get("writeErrors", [])}
+            logger.warning("⚠️ %s CV(s) rejeté(s) lors de l'insertion groupée", len(errors))
+            return errors
+    
+    async def create_cv_grouped(self, cv_data: CVData) -> Optional[CVData]:
+        """
+        Comme create_cv, mais regroupe les CV créés simultanément: pendant qu'une
+        insertion est en cours, les suivants s'accumulent et partent ensemble
+        (insert_many, jusqu'à INSERT_BATCH_MAX). Un CV seul part immédiatement
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._pending_inserts.append((self._to_document(cv_data), future))
+        if self._insert_task is None or self._insert_task.done():
+            self._insert_task = asyncio.create_task(self._drain_inserts())
+        return await future
+    
+    async def _drain_inserts(self):
+        """Vide la file des insertions regroupées, un insert_many par lot"""
+        while self._pending_inserts:
+            batch = self._pending_inserts[:INSERT_BATCH_MAX]
+            del self._pending_inserts[:INSERT_BATCH_MAX]
+            docs = [doc for doc, _ in batch]
+            try:
+                errors = await self._insert_documents(docs)
+            except Exception as e:
+                logger.error("❌ Erreur insertion groupée: %s", e)
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            
+            logger.debug("💾 %s CV(s) sauvegardé(s) en une insertion", len(batch) - len(errors))
+            for index, (doc, future) in enumerate(batch):
+                if future.done():
+                    continue
+                if index in errors:
+                    future.set_exception(Exception(errors[index].get("errmsg", "Insertion refusée")))
+                    continue
                 try:
-                    # Convertir _id en string si c'est un ObjectId
-                    if isinstance(doc.get("_id"), ObjectId):
-                        doc["id"] = str(doc["_id"])
-                    elif "_id" in doc:
-                        doc["id"] = doc["_id"]
-                    
-                    # Supprimer _id pour éviter les conflits avec le modèle Pydantic
-                    doc.pop("_id", None)
-                    
-                    # Créer l'objet CVData
-                    cv_data = CVData(**doc)
-                    cvs.append(cv_data)
-                    
+                    future.set_result(CVData(**doc))
                 except Exception as e:
-                    print(f"⚠️ Erreur conversion document: {e}")
-                    continue
+                    future.set_exception(e)
+    
+    async def update_cvs_bulk(self, cvs: List[CVData]) -> int:
+        """Met à jour plusieurs CV complets en un seul bulk_write; retourne le nombre de CV trouvés"""
+        if not cvs:
+            return 0
+        
+        collection = self._get_collection()
+        operations = []
+        for cv_data in cvs:
+            cv_dict = cv_data.model_dump()
+            cv_dict.pop("id", None)
+            cv_dict["competences_techniques_normalized"] = normalize_skills(cv_dict.get("competences_techniques"))
+            operations.append(UpdateOne({"id": cv_data.id}, {"$set": cv_dict}))
+        
+        try:
+            result = await collection.bulk_write(operations, ordered=False)
+            logger.debug("✅ %s CV(s) mis à jour en un bulk_write", result.matched_count)
+            return result.matched_count
+        except BulkWriteError as e:
+            logger.error("❌ Erreur mise à jour groupée: %s", e.details.get("writeErrors"))
+            return e.details.get("nMatched", 0)
+        finally:
+            for cv_data in cvs:
+                self._cv_cache.pop(cv_data.id)
+    
+    async def get_all_cvs(self, projection: Optional[Dict[str, int]] = None,
+                          skip: int = 0, limit: int = 0) -> List[CVData]:
+        """
+        Récupère les CV (projection: champs à exclure, ex. LIST_VIEW_PROJECTION;
+        skip/limit: pagination, limit=0 pour tout récupérer)
+        """
+        try:
+            logger.debug("📋 Récupération de tous les CV depuis MongoDB...")
+            collection = self._get_collection()
+            
+            cursor = self._paginate(collection.find({}, projection), skip, limit)
+            cvs = await self._load_models(cursor)
             
-            print(f"✅ {len(cvs)} CV(s) récupéré(s)")
+            logger.debug("✅ %s CV(s) récupéré(s)", len(cvs))
             return cvs
             
         except Exception as e:
-            print(f"❌ Erreur récupération tous CV: {e}")
+            logger.error("❌ Erreur récupération tous CV: %s", e)
             return []
     
-    async def get_cv_by_id(self, cv_id: str) -> Optional[CVData]:
-        """Récupère un CV par son ID avec recherche flexible"""
+    async def get_cv_by_id(self, cv_id: str, use_cache: bool = True) -> Optional[CVData]:
+        """
+        Récupère un CV par son ID (champ id, index unique).
+        use_cache=False: lecture en base, pour les lectures qui précèdent une écriture
+        (le cache n'est pas partagé entre workers et peut être périmé)
+        """
+        cached = self._cv_cache.get(cv_id) if use_cache else None
+        if cached is not None:
+            # Copie: les appelants modifient volontiers le modèle retourné
+            return cached.model_copy(deep=True)
         try:
-            print(f"🔍 Repository: Recherche CV: {cv_id}")
+            logger.debug("🔍 Repository: Recherche CV: %s", cv_id)
             collection = self._get_collection()
             
-            # Recherche avec plusieurs critères possibles
-            query = {
-                "$or": [
-                    {"id": cv_id},
-                    {"_id": cv_id}
-                ]
-            }
-            
-            # Si l'ID ressemble à un ObjectId, l'essayer aussi
-            try:
-                if ObjectId.is_valid(cv_id):
-                    query["$or"].append({"_id": ObjectId(cv_id)})
-            except Exception as e:
-                print(f"⚠️ Erreur conversion ObjectId: {e}")
-            
-            cv_doc = await collection.find_one(query)
+            cv_doc = await collection.find_one({"id": cv_id})
             
             if cv_doc:
-                print(f"✅ CV trouvé en base: {cv_id}")
-                # Normaliser l'ID
-                if isinstance(cv_doc.get("_id"), ObjectId):
-                    cv_doc["id"] = str(cv_doc["_id"])
-                elif "_id" in cv_doc:
-                    cv_doc["id"] = cv_doc["_id"]
+                logger.debug("✅ CV trouvé en base: %s", cv_id)
+                _normalize_id(cv_doc)
                 
-                # Supprimer _id pour éviter les conflits avec Pydantic
-                cv_doc.pop("_id", None)
+                cv = CVData(**cv_doc)
+                self._cv_cache.set(cv_id, cv.model_copy(deep=True))
+                return cv
                 
-                return CVData(**cv_doc)
-                
-            print(f"❌ CV non trouvé en base: {cv_id}")
+            logger.debug("❌ CV non trouvé en base: %s", cv_id)
             return None
             
         except Exception as e:
-            print(f"❌ Erreur récupération CV {cv_id}: {e}")
-            print(f"Traceback: {traceback.format_exc()}")
+            logger.exception("❌ Erreur récupération CV %s: %s", cv_id, e)
             return None
 
+    async def get_cvs_by_ids(self, cv_ids: List[str]) -> List[CVData]:
+        """Récupère plusieurs CV en une seule requête (ordre non garanti, ids inconnus ignorés)"""
+        try:
+            collection = self._get_collection()
+            cursor = collection.find({"id": {"$in": cv_ids}}).batch_size(STREAM_BATCH_SIZE)
+            return await self._load_models(cursor)
+        except Exception as e:
+            logger.error("❌ Erreur récupération CV par ids: %s", e)
+            return []
+
+    async def get_cv_json(self, cv_id: str) -> Optional[bytes]:
+        """CV en JSON de l'API directement depuis le document (sans CVData)"""
+        try:
+            doc = await self._get_collection().find_one({"id": cv_id})
+            return _doc_to_json(doc) if doc else None
+        except Exception as e:
+            logger.error("❌ Erreur récupération CV %s: %s", cv_id, e)
+            return None
     
-    async def update_cv(self, cv_data: CVData) -> Optional[CVData]:
-        """Met à jour un CV en base - VERSION CORRIGÉE"""
+    async def update_cv(self, cv_data: CVData, previous: Optional[CVData] = None) -> Optional[CVData]:
+        """
+        Met à jour un CV en base en n'envoyant que les champs modifiés:
+        différence avec previous (version lue en base) si fourni, sinon
+        les champs renseignés sur cv_data (exclude_unset)
+        """
         try:
-            print(f"💾 Mise à jour CV en base: {cv_data.id}")
+            logger.debug("💾 Mise à jour CV en base: %s", cv_data.id)
             collection = self._get_collection()
             
-            # Convertir en dictionnaire pour MongoDB
-            cv_dict = cv_data.dict()
-            
-            # Gérer correctement l'ID - chercher par l'ID string
-            # et conserver l'ObjectId original si existe
-            query = {"id": cv_data.id}
-            
-            # Si on a un ObjectId valide, chercher aussi par _id
-            try:
-                if ObjectId.is_valid(cv_data.id):
-                    query = {"_id": ObjectId(cv_data.id)}
-            except:
-                pass
-            
-            # Préparer les données pour la mise à jour
-            update_data = {"$set": cv_dict}
+            removed: Dict[str, str] = {}
+            if previous is not None:
+                changes: Dict[str, Any] = {}
+                _changed_fields(previous.model_dump(), cv_data.model_dump(), "", changes, removed)
+            else:
+                changes = cv_data.model_dump(exclude_unset=True)
+            changes.pop("id", None)
             
-            # Mise à jour avec update_one
-            result = await collection.update_one(
-                query,
-                update_data,
-                upsert=False  # Ne pas créer si n'existe pas
+            if not changes and not removed:
+                logger.debug("✅ CV inchangé: %s", cv_data.id)
+                return cv_data
+            if any(key.split(".", 1)[0] == "competences_techniques" for key in changes):
+                changes["competences_techniques_normalized"] = normalize_skills(cv_data.competences_techniques)
+            
+            update: Dict[str, Any] = {}
+            if changes:
+                update["$set"] = changes
+            if removed:
+                update["$unset"] = removed
+            
+            # Mise à jour et relecture atomiques (un aller-retour, pas de relecture séparée)
+            cv_doc = await collection.find_one_and_update(
+                {"id": cv_data.id},
+                update,
+                projection={"_id": 0},
+                upsert=False,  # Ne pas créer si n'existe pas
+                return_document=ReturnDocument.AFTER
             )
+            self._cv_cache.pop(cv_data.id)
             
-            if result.modified_count > 0:
-                print(f"✅ CV mis à jour en base: {cv_data.id}")
-                return cv_data
-            elif result.matched_count > 0:
-                print(f"✅ CV trouvé mais inchangé: {cv_data.id}")
-                return cv_data
-            else:
-                print(f"❌ CV non trouvé pour mise à jour: {cv_data.id}")
-                # Essayer une recherche alternative
-                alt_cv = await self.get_cv_by_id(cv_data.id)
-                if alt_cv:
-                    print(f"⚠️  CV trouvé avec recherche alternative, mais échec mise à jour")
+            if cv_doc is None:
+                logger.debug("❌ CV non trouvé pour mise à jour: %s", cv_data.id)
                 return None
+            
+            logger.debug("✅ CV mis à jour en base: %s", cv_data.id)
+            return CVData(**cv_doc)
                 
         except Exception as e:
-            print(f"❌ Erreur mise à jour CV en base {cv_data.id}: {e}")
-            print(f"Traceback: {traceback.format_exc()}")
+            logger.exception("❌ Erreur mise à jour CV en base %s: %s", cv_data.id, e)
             return None
 
-    async def update_cv_partial(self, cv_id: str, updates: dict) -> Optional[CVData]:
-        """Met à jour partiellement un CV en base"""
+    async def update_cv_partial(self, cv_id: str, updates: dict,
+                                now: Optional[datetime] = None) -> Optional[CVData]:
+        """
+        Met à jour partiellement un CV en base (now: horodatage déjà pris par l'appelant,
+        utilisé pour updated_at si updates n'en contient pas)
+        """
         try:
-            print(f"💾 Mise à jour partielle CV: {cv_id}")
+            logger.debug("💾 Mise à jour partielle CV: %s", cv_id)
             collection = self._get_collection()
             
-            # Ajouter updated_at aux mises à jour
-            updates["updated_at"] = datetime.now()
+            # Ajouter updated_at s'il n'est pas fourni (copie: le dict de l'appelant n'est pas modifié)
+            fields = {"updated_at": now or datetime.now(), **updates}
+            if "competences_techniques" in fields:
+                fields["competences_techniques_normalized"] = normalize_skills(fields["competences_techniques"])
             
-            # Mise à jour partielle avec $set
-            result = await collection.update_one(
+            # Mise à jour partielle avec $set, document mis à jour renvoyé dans le même aller-retour
+            cv_doc = await collection.find_one_and_update(
+                {"id": cv_id},
                 {
-                    "$or": [
-                        {"_id": cv_id},
-                        {"id": cv_id}
-                    ]
+                    "$set": fields
                 },
-                {
-                    "$set": updates
-                }
+                projection={"_id": 0},
+                return_document=ReturnDocument.AFTER
             )
+            self._cv_cache.pop(cv_id)
             
-            if result.modified_count > 0:
-                print(f"✅ CV partiellement mis à jour: {cv_id}")
-                # Récupérer le CV mis à jour
-                return await self.get_cv_by_id(cv_id)
-            elif result.matched_count > 0:
-                print(f"✅ CV trouvé mais inchangé: {cv_id}")
-                return await self.get_cv_by_id(cv_id)
-            else:
-                print(f"❌ CV non trouvé pour mise à jour: {cv_id}")
+            if cv_doc is None:
+                logger.debug("❌ CV non trouvé pour mise à jour: %s", cv_id)
                 return None
+            
+            logger.debug("✅ CV partiellement mis à jour: %s", cv_id)
+            return CVData(**cv_doc)
                 
         except Exception as e:
-            print(f"❌ Erreur mise à jour partielle CV {cv_id}: {e}")
+            logger.error("❌ Erreur mise à jour partielle CV %s: %s", cv_id, e)
             return None
     
     async def delete_cv(self, cv_id: str) -> bool:
         """Supprime un CV"""
         try:
-            print(f"🗑️ Suppression CV: {cv_id}")
+            logger.debug("🗑️ Suppression CV: %s", cv_id)
             collection = self._get_collection()
             
-            result = await collection.delete_one({
-                "$or": [
-                    {"_id": cv_id},
-                    {"id": cv_id}
-                ]
-            })
+            result = await collection.delete_one({"id": cv_id})
+            self._cv_cache.pop(cv_id)
             
             if result.deleted_count > 0:
-                print(f"✅ CV supprimé: {cv_id}")
+                logger.debug("✅ CV supprimé: %s", cv_id)
                 return True
             else:
-                print(f"❌ CV non trouvé pour suppression: {cv_id}")
+                logger.debug("❌ CV non trouvé pour suppression: %s", cv_id)
                 return False
                 
         except Exception as e:
-            print(f"❌ Erreur suppression CV {cv_id}: {e}")
+            logger.error("❌ Erreur suppression CV %s: %s", cv_id, e)
             return False
     
-    async def update_cv_status(self, cv_id: str, status: str) -> bool:
-        """Met à jour le statut d'un CV"""
+    async def update_cv_status(self, cv_id: str, status: str, now: Optional[datetime] = None) -> bool:
+        """Met à jour le statut d'un CV (now: horodatage déjà pris par l'appelant)"""
         try:
-            print(f"🔄 Mise à jour statut CV {cv_id}: {status}")
+            logger.debug("🔄 Mise à jour statut CV %s: %s", cv_id, status)
             collection = self._get_collection()
             
             result = await collection.update_one(
-                {
-                    "$or": [
-                        {"_id": cv_id},
-                        {"id": cv_id}
-                    ]
-                },
+                {"id": cv_id},
                 {
                     "$set": {
                         "status": status,
-                        "updated_at": datetime.now()
+                        "updated_at": now or datetime.now()
                     }
                 }
             )
+            self._cv_cache.pop(cv_id)
             
             if result.modified_count > 0:
-                print(f"✅ Statut mis à jour: {cv_id}")
+                logger.debug("✅ Statut mis à jour: %s", cv_id)
                 return True
             else:
-                print(f"❌ Aucune modification pour: {cv_id}")
+                logger.debug("❌ Aucune modification pour: %s", cv_id)
                 return False
                 
         except Exception as e:
-            print(f"❌ Erreur mise à jour statut CV {cv_id}: {e}")
+            logger.error("❌ Erreur mise à jour statut CV %s: %s", cv_id, e)
             return False
     
     async def search_by_skills(self, skills: List[str]) -> List[CVData]:
         """Recherche des CV par compétences"""
         try:
-            print(f"🔍 Recherche par compétences: {skills}")
+            logger.debug("🔍 Recherche par compétences: %s", skills)
             collection = self._get_collection()
             
-            # Recherche avec regex insensible à la casse
-            query = {
-                "competences_techniques": {
-                    "$elemMatch": {
-                        "$in": [
-                            {"$regex": skill, "$options": "i"} for skill in skills
-                        ]
-                    }
-                }
-            }
+            cursor = collection.find(_skills_query(skills)).hint([("competences_techniques_normalized", 1)]).batch_size(STREAM_BATCH_SIZE)
+            cvs = await self._load_models(cursor)
             
-            cursor = collection.find(query)
-            cvs = []
-            
-            async for doc in cursor:
-                try:
-                    if isinstance(doc.get("_id"), ObjectId):
-                        doc["id"] = str(doc["_id"])
-                    elif "_id" in doc:
-                        doc["id"] = doc["_id"]
-                    
-                    doc.pop("_id", None)
-                    cv_data = CVData(**doc)
-                    cvs.append(cv_data)
-                    
-                except Exception as e:
-                    print(f"⚠️ Erreur conversion document: {e}")
-                    continue
-            
-            print(f"✅ {len(cvs)} CV(s) trouvé(s) avec ces compétences")
+            logger.debug("✅ %s CV(s) trouvé(s) avec ces compétences", len(cvs))
             return cvs
             
         except Exception as e:
-            print(f"❌ Erreur recherche par compétences: {e}")
+            logger.error("❌ Erreur recherche par compétences: %s", e)
             return []
     
+    def stream_cvs_json(self, query: Optional[dict] = None, projection: Optional[Dict[str, int]] = None,
+                        hint: Optional[list] = None, skip: int = 0, limit: int = 0) -> AsyncIterator[bytes]:
+        """
+        CV sérialisés directement en JSON (un bloc d'octets par document) sans
+        passer par CVData: réservé aux listes renvoyées telles quelles au client.
+        La collection est résolue ici, avant le premier document, pour qu'une base
+        non connectée lève une exception tant que la réponse peut encore changer.
+        """
+        collection = self._get_collection()
+        cursor = collection.find(query or {}, projection)
+        if hint:
+            cursor = cursor.hint(hint)
+        return self._iter_json(self._paginate(cursor, skip, limit))
+    
+    @staticmethod
+    def _paginate(cursor, skip: int = 0, limit: int = 0):
+        """
+        Applique skip/limit (limit=0: pas de limite). Une page est triée par date
+        de création décroissante (index created_at) pour rester stable d'un appel à l'autre
+        """
+        if skip or limit:
+            cursor = cursor.sort("created_at", -1).skip(skip).limit(limit)
+        return cursor.batch_size(min(limit, STREAM_BATCH_SIZE) if limit else STREAM_BATCH_SIZE)
+    
+    def stream_by_skills_json(self, skills: List[str]) -> AsyncIterator[bytes]:
+        """Recherche par compétences, sérialisée comme stream_cvs_json"""
+        return self.stream_cvs_json(_skills_query(skills), hint=[("competences_techniques_normalized", 1)])
+    
+    @staticmethod
+    async def _load_models(cursor) -> List[CVData]:
+        """
+        Charge le curseur par lots de STREAM_BATCH_SIZE; la validation d'un lot
+        se fait dans un thread pendant que le lot suivant est rapatrié, pour ne
+        pas bloquer la boucle d'événements
+        """
+        cvs: List[CVData] = []
+        docs = await cursor.to_list(length=STREAM_BATCH_SIZE)
+        while docs:
+            batch, docs = await asyncio.gather(
+                asyncio.to_thread(_to_models, docs),
+                cursor.to_list(length=STREAM_BATCH_SIZE)
+            )
+            cvs.extend(batch)
+        return cvs
+    
+    @staticmethod
+    async def _iter_json(cursor) -> AsyncIterator[bytes]:
+        async for doc in cursor:
+            try:
+                yield _doc_to_json(doc)
+            except Exception as e:
+                logger.warning("⚠️ Erreur conversion document: %s", e)
+                continue
+    
+    async def get_duplicate_cv_id(self, file_hash: str) -> Optional[str]:
+        """
+        Retourne l'id du CV ayant ce hash, sans charger le document
+        (requête couverte par l'index {file_hash, id})
+        """
+        try:
+            doc = await self._get_collection().find_one(
+                {"file_hash": file_hash}, projection={"_id": 0, "id": 1}
+            )
+            return doc.get("id") if doc else None
+        except Exception as e:
+            logger.error("❌ Erreur vérification doublon: %s", e)
+            return None
+    
     async def check_duplicate_hash(self, file_hash: str) -> Optional[CVData]:
-        """Vérifie si un CV avec ce hash existe déjà"""
+        """Vérifie si un CV avec ce hash existe déjà et retourne le CV complet"""
         try:
-            print(f"🔍 Vérification doublon hash: {file_hash[:8]}...")
+            logger.debug("🔍 Vérification doublon hash: %s...", file_hash[:8])
             collection = self._get_collection()
             
             doc = await collection.find_one({"file_hash": file_hash})
@@ -339,85 +616,115 @@ class CVRepository:
             if doc is None:
                 return None
             
-            if isinstance(doc.get("_id"), ObjectId):
-                doc["id"] = str(doc["_id"])
-            elif "_id" in doc:
-                doc["id"] = doc["_id"]
-            
-            doc.pop("_id", None)
+            _normalize_id(doc)
             return CVData(**doc)
             
         except Exception as e:
-            print(f"❌ Erreur vérification doublon: {e}")
+            logger.error("❌ Erreur vérification doublon: %s", e)
             return None
     
+    async def normalize_legacy_ids(self) -> List[Tuple[Optional[str], str, Optional[str]]]:
+        """
+        Aligne id sur str(_id) pour les CV enregistrés avec un UUID.
+        Retourne (ancien id, nouvel id, nom du fichier original) pour chaque CV migré
+        """
+        migrated = []
+        try:
+            collection = self._get_collection()
+            cursor = collection.find(
+                {"_id": {"$type": "objectId"}, "$expr": {"$ne": ["$id", {"$toString": "$_id"}]}},
+                {"id": 1, "filename_original": 1}
+            )
+            async for doc in cursor:
+                new_id = str(doc["_id"])
+                result = await collection.update_one(
+                    {"_id": doc["_id"], "id": doc.get("id")},
+                    {"$set": {"id": new_id}}
+                )
+                if result.modified_count > 0:
+                    self._cv_cache.pop(doc.get("id"))
+                    migrated.append((doc.get("id"), new_id, doc.get("filename_original")))
+            
+            if migrated:
+                logger.info("✅ Identifiants normalisés pour %s CV(s)", len(migrated))
+        except Exception as e:
+            logger.warning("⚠️ Erreur normalisation des identifiants: %s", e)
+        return migrated
+    
+    async def has_legacy_hashes(self) -> bool:
+        """Indique s'il reste des CV dont le hash n'a pas d'algorithme enregistré (MD5 historique)"""
+        if self._legacy_hashes_remaining is False:
+            return False
+        try:
+            collection = self._get_collection()
+            count = await collection.count_documents(
+                {"file_hash": {"$ne": None}, "hash_algo": {"$exists": False}},
+                limit=1
+            )
+            self._legacy_hashes_remaining = count > 0
+            return self._legacy_hashes_remaining
+        except Exception as e:
+            logger.error("❌ Erreur recherche hash historiques: %s", e)
+            return True
+    
+    async def migrate_file_hash(self, old_hash: str, new_hash: str, hash_algo: str) -> bool:
+        """Remplace un hash historique par le hash calculé avec le nouvel algorithme"""
+        try:
+            collection = self._get_collection()
+            result = await collection.update_one(
+                {"file_hash": old_hash, "hash_algo": {"$exists": False}},
+                {"$set": {"file_hash": new_hash, "hash_algo": hash_algo}}
+            )
+            if result.modified_count > 0:
+                # Document identifié par son hash: on ne sait pas quel CV invalider
+                self._cv_cache.clear()
+                logger.info("🔒 Hash migré vers %s: %s... -> %s...", hash_algo, old_hash[:8], new_hash[:8])
+                return True
+            return False
+        except Exception as e:
+            logger.error("❌ Erreur migration hash: %s", e)
+            return False
+    
     async def get_cvs_by_status(self, status: str) -> List[CVData]:
-        """Récupère les CV par statut"""
+        """Récupère les CV par statut (plus récents d'abord, index status/created_at)"""
         try:
-            print(f"🔍 Recherche CV par statut: {status}")
+            logger.debug("🔍 Recherche CV par statut: %s", status)
             collection = self._get_collection()
             
-            cursor = collection.find({"status": status})
-            cvs = []
+            cursor = collection.find({"status": status}).sort("created_at", -1).batch_size(STREAM_BATCH_SIZE)
+            cvs = await self._load_models(cursor)
             
-            async for doc in cursor:
-                try:
-                    if isinstance(doc.get("_id"), ObjectId):
-                        doc["id"] = str(doc["_id"])
-                    elif "_id" in doc:
-                        doc["id"] = doc["_id"]
-                    
-                    doc.pop("_id", None)
-                    cv_data = CVData(**doc)
-                    cvs.append(cv_data)
-                    
-                except Exception as e:
-                    print(f"⚠️ Erreur conversion document: {e}")
-                    continue
-            
-            print(f"✅ {len(cvs)} CV(s) trouvé(s) avec le statut: {status}")
+            logger.debug("✅ %s CV(s) trouvé(s) avec le statut: %s", len(cvs), status)
             return cvs
             
         except Exception as e:
-            print(f"❌ Erreur recherche par statut: {e}")
+            logger.error("❌ Erreur recherche par statut: %s", e)
             return []
     
-    async def get_cvs_by_date_range(self, start_date: datetime, end_date: datetime) -> List[CVData]:
-        """Récupère les CV dans une plage de dates"""
+    async def get_cvs_by_date_range(self, start_date: datetime, end_date: datetime,
+                                    status: Optional[str] = None) -> List[CVData]:
+        """Récupère les CV dans une plage de dates (optionnellement pour un statut)"""
         try:
-            print(f"🔍 Recherche CV entre {start_date} et {end_date}")
+            logger.debug("🔍 Recherche CV entre %s et %s", start_date, end_date)
             collection = self._get_collection()
             
-            query = {
-                "created_at": {
-                    "$gte": start_date,
-                    "$lte": end_date
-                }
+            # Égalité sur le statut avant la plage de dates: l'index status/created_at s'applique
+            query = {}
+            if status is not None:
+                query["status"] = status
+            query["created_at"] = {
+                "$gte": start_date,
+                "$lte": end_date
             }
             
-            cursor = collection.find(query)
-            cvs = []
+            cursor = collection.find(query).sort("created_at", -1).batch_size(STREAM_BATCH_SIZE)
+            cvs = await self._load_models(cursor)
             
-            async for doc in cursor:
-                try:
-                    if isinstance(doc.get("_id"), ObjectId):
-                        doc["id"] = str(doc["_id"])
-                    elif "_id" in doc:
-                        doc["id"] = doc["_id"]
-                    
-                    doc.pop("_id", None)
-                    cv_data = CVData(**doc)
-                    cvs.append(cv_data)
-                    
-                except Exception as e:
-                    print(f"⚠️ Erreur conversion document: {e}")
-                    continue
-            
-            print(f"✅ {len(cvs)} CV(s) trouvé(s) dans la plage de dates")
+            logger.debug("✅ %s CV(s) trouvé(s) dans la plage de dates", len(cvs))
             return cvs
             
         except Exception as e:
-            print(f"❌ Erreur recherche par date: {e}")
+            logger.error("❌ Erreur recherche par date: %s", e)
             return []
     
     async def count_cvs(self) -> int:
@@ -425,35 +732,54 @@ class CVRepository:
         try:
             collection = self._get_collection()
             count = await collection.count_documents({})
-            print(f"📊 Nombre total de CV: {count}")
+            logger.debug("📊 Nombre total de CV: %s", count)
             return count
         except Exception as e:
-            print(f"❌ Erreur comptage CV: {e}")
+            logger.error("❌ Erreur comptage CV: %s", e)
             return 0
     
-    async def get_cv_stats(self) -> dict:
-        """Récupère les statistiques des CV"""
+    async def estimated_count(self) -> int:
+        """Nombre approximatif de CV, lu dans les métadonnées de la collection (O(1))"""
         try:
-            print("📊 Calcul des statistiques CV...")
+            collection = self._get_collection()
+            return await collection.estimated_document_count()
+        except Exception as e:
+            logger.error("❌ Erreur comptage CV: %s", e)
+            return 0
+    
+    async def get_cv_stats(self, top_skills: int = 0) -> dict:
+        """
+        Récupère les statistiques des CV (top_skills: nombre de compétences les plus
+        fréquentes à ajouter, calculées dans le même pipeline)
+        """
+        try:
+            logger.debug("📊 Calcul des statistiques CV...")
             collection = self._get_collection()
             
-            # Compter par statut
-            pipeline = [
-                {
-                    "$group": {
-                        "_id": "$status",
-                        "count": {"$sum": 1}
-                    }
-                }
-            ]
-            
-            cursor = collection.aggregate(pipeline)
-            status_counts = {}
-            
-            async for doc in cursor:
-                status_counts[doc["_id"]] = doc["count"]
+            # Comptage par statut; le total en est la somme (pas de second comptage)
+            by_status_stage = {"$group": {"_id": "$status", "count": {"$sum": 1}}}
+            if top_skills > 0:
+                # Compétences dans une facette du même pipeline: seules ~N+statuts lignes remontent
+                pipeline = [{"$facet": {
+                    "by_status": [by_status_stage],
+                    "top_skills": [
+                        {"$unwind": "$competences_techniques"},
+                        {"$group": {"_id": "$competences_techniques", "count": {"$sum": 1}}},
+                        {"$sort": {"count": -1, "_id": 1}},
+                        {"$limit": top_skills}
+                    ]
+                }}]
+                result = await collection.aggregate(pipeline).to_list(length=1)
+                facets = result[0] if result else {}
+                by_status = facets.get("by_status", [])
+                skills = facets.get("top_skills", [])
+            else:
+                by_status = await collection.aggregate([by_status_stage]).to_list(length=None)
+                skills = []
             
-            total_count = await self.count_cvs()
+            status_counts = {doc["_id"]: doc["count"] for doc in by_status}
+            total_count = sum(status_counts.values())
+            logger.debug("📊 Nombre total de CV: %s", total_count)
             
             stats = {
                 "total": total_count,
@@ -464,62 +790,28 @@ class CVRepository:
                 ),
                 "last_updated": datetime.now().isoformat()
             }
+            if top_skills > 0:
+                stats["top_skills"] = [(doc["_id"], doc["count"]) for doc in skills]
             
-            print(f"✅ Statistiques calculées: {stats}")
+            logger.debug("✅ Statistiques calculées: %s", stats)
             return stats
             
         except Exception as e:
-            print(f"❌ Erreur calcul statistiques: {e}")
+            logger.error("❌ Erreur calcul statistiques: %s", e)
             return {
                 "total": 0,
                 "by_status": {},
                 "success_rate": 0,
+                "top_skills": [],
                 "last_updated": datetime.now().isoformat()
             }
 
     async def get_cv_by_any_id(self, cv_id: str) -> Optional[CVData]:
-        """Récupère un CV par son ID avec recherche flexible"""
-        try:
-            print(f"🔍 Repository: Recherche flexible CV: {cv_id}")
-            collection = self._get_collection()
-            
-            # Recherche avec plusieurs critères possibles
-            query = {
-                "$or": [
-                    {"id": cv_id},
-                    {"_id": cv_id}
-                ]
-            }
-            
-            # Si l'ID ressemble à un ObjectId, l'essayer aussi
-            try:
-                from bson import ObjectId
-                if ObjectId.is_valid(cv_id):
-                    query["$or"].append({"_id": ObjectId(cv_id)})
-            except:
-                pass
-            
-            cv_doc = await collection.find_one(query)
-            
-            if cv_doc:
-                print(f"✅ Repository: CV trouvé avec recherche flexible: {cv_id}")
-                # Normaliser l'ID
-                if isinstance(cv_doc.get("_id"), ObjectId):
-                    cv_doc["id"] = str(cv_doc["_id"])
-                elif "_id" in cv_doc:
-                    cv_doc["id"] = cv_doc["_id"]
-                # Supprimer _id pour éviter les conflits avec le modèle Pydantic
-                cv_doc.pop("_id", None)
-                return CVData(**cv_doc)
-            else:
-                print(f"❌ Repository: CV non trouvé avec recherche flexible: {cv_id}")
-                return None
-                
-        except Exception as e:
-            print(f"❌ Erreur repository recherche flexible CV {cv_id}: {e}")
-            return None
+        """Conservé pour compatibilité: id et _id sont désormais identiques, voir get_cv_by_id"""
+        return await self.get_cv_by_id(cv_id)
+
 # 👉 Fonction utilitaire globale, hors classe
 def get_cv_collection():
     db = get_database()
-    return db["cvs"]
+    return _cv_collection(db)
     
\ No newline at end of file
@@ -0,0 +1,44 @@
+# app/services/cpu_pool.py
+import asyncio
+import logging
+import threading
+from concurrent.futures import Executor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+class CPUPool:
+    """
+    Pool de processus pour les traitements CPU (parsing, conversion, exports).
+    Si un worker meurt (plantage d'un parseur sur un fichier malformé, OOM),
+    le pool devient inutilisable: il est alors remplacé par un neuf et le
+    traitement est relancé une fois
+    """
+
+    def __init__(self, factory: Callable[[], Executor]):
+        self._factory = factory
+        self._lock = threading.Lock()
+        self.executor = factory()
+
+    async def run(self, func, *args):
+        """Exécute func(*args) dans le pool (nouvelle tentative sur un pool neuf s'il est cassé)"""
+        loop = asyncio.get_running_loop()
+        executor = self.executor
+        try:
+            return await loop.run_in_executor(executor, func, *args)
+        except BrokenProcessPool:
+            self._replace(executor)
+            return await loop.run_in_executor(self.executor, func, *args)
+
+    def _replace(self, broken: Executor):
+        """Remplace le pool cassé (une seule fois, même si plusieurs traitements échouent ensemble)"""
+        with self._lock:
+            if self.executor is not broken:
+                return
+            logger.error("❌ Pool CPU inutilisable (worker arrêté brutalement), création d'un nouveau pool")
+            self.executor = self._factory()
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    def shutdown(self, wait: bool = True, cancel_futures: bool = False):
+        self.executor.shutdown(wait=wait, cancel_futures=cancel_futures)
@@ -5,15 +5,22 @@ Service CV - Version complète avec toutes les fonctionnalités
 
 import tempfile
 import os
+import asyncio
+import logging
 import hashlib
 import uuid
 from datetime import datetime
-from typing import List, Optional, Dict, Any , Tuple
-import traceback
+from typing import AsyncIterator, List, Mapping, Optional, Dict, Any , Tuple, Type, get_args
+from types import MappingProxyType
+from functools import lru_cache
+from collections import OrderedDict
 from io import BytesIO
+from xml.sax.saxutils import escape
 from docx import Document
-from fastapi.responses import StreamingResponse
+from fastapi.responses import Response
+from pydantic import BaseModel, TypeAdapter
 from app.services.file_storage import FileStorageService
+from app.services.cpu_pool import CPUPool
 
 try:
     from docx2pdf import convert
@@ -21,6 +28,12 @@ try:
 except ImportError:
     DOCX2PDF_AVAILABLE = False
 
+try:
+    import blake3
+    BLAKE3_AVAILABLE = True
+except ImportError:
+    BLAKE3_AVAILABLE = False
+
 try:
     import mammoth
     MAMMOTH_AVAILABLE = True
@@ -33,126 +46,374 @@ try:
 except ImportError:
     WEASYPRINT_AVAILABLE = False
 
+try:
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.platypus import SimpleDocTemplate, Paragraph
+    REPORTLAB_AVAILABLE = True
+except ImportError:
+    REPORTLAB_AVAILABLE = False
+
 from app.parsers.text_extractors import TextExtractor
-from app.parsers.info_extractors import InfoExtractor
-from app.repositories.cv_repository import CVRepository
+from app.parsers.info_extractors import InfoExtractor, count_words
+from app.repositories.cv_repository import CVRepository, LIST_VIEW_PROJECTION
 from app.models.cv_model import CVData, PersonalInfo, CVMetadata, Experience, Formation, LanguageSkill
 from bson import ObjectId
 from app.repositories.cv_repository import get_cv_collection
 
+logger = logging.getLogger(__name__)
+
+# Algorithme de hash pour la détection des doublons (MD5 si blake3 absent)
+HASH_ALGO = "blake3" if BLAKE3_AVAILABLE else "md5"
+
+# Content-types des documents servis et exportés
+PDF_CONTENT_TYPE = "application/pdf"
+DOCX_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+
+# Formats convertis en PDF pour l'aperçu, et content-type des originaux envoyés tels quels
+PREVIEW_CONVERTIBLE = frozenset({'.docx', '.doc'})
+PREVIEW_CONTENT_TYPES: Mapping[str, str] = MappingProxyType({
+    '.pdf': PDF_CONTENT_TYPE,
+    '.docx': DOCX_CONTENT_TYPE,
+    '.doc': DOCX_CONTENT_TYPE,
+})
+
+# Textes extraits gardés en mémoire pour /extract-text (aperçus répétés d'un même fichier)
+TEXT_CACHE_MAXSIZE = 256
+
+# Extracteurs propres au processus courant (un jeu par worker du pool CPU)
+_worker_extractors: Optional[Tuple[TextExtractor, InfoExtractor]] = None
+
+def _get_worker_extractors() -> Tuple[TextExtractor, InfoExtractor]:
+    global _worker_extractors
+    if _worker_extractors is None:
+        _worker_extractors = (TextExtractor(), InfoExtractor())
+    return _worker_extractors
+
+def _warm_worker_job() -> bool:
+    """Charge les extracteurs et les bibliothèques de lecture dans un worker du pool (préchauffage au démarrage)"""
+    _get_worker_extractors()
+    TextExtractor.preload_parsers()
+    _docx_template_bytes()
+    return True
+
+def _extract_text_job(file_content: bytes, file_ext: str) -> str:
+    """Extraction du texte d'un fichier en mémoire (exécutée hors de la boucle d'événements)"""
+    return _get_worker_extractors()[0].extract_from_bytes(file_content, file_ext)
+
+def _extract_info_job(text: str) -> Dict[str, Any]:
+    """Extraction des informations structurées (exécutée hors de la boucle d'événements)"""
+    return _get_worker_extractors()[1].extract_all_data(text)
+
+def _convert_docx2pdf_job(docx_content: bytes) -> bytes:
+    """Conversion DOCX -> PDF avec docx2pdf (exécutée dans le pool de processus)"""
+    docx_temp = None
+    pdf_temp = None
+    
+    try:
+        # Créer fichier DOCX temporaire
+        with tempfile.NamedTemporaryFile(delete=False, suffix='.docx') as f:
+            f.write(docx_content)
+            docx_temp = f.name
+        
+        # Créer fichier PDF temporaire
+        pdf_temp = docx_temp.replace('.docx', '.pdf')
+        
+        # Conversion
+        convert(docx_temp, pdf_temp)
+        
+        # Lire le PDF généré
+        with open(pdf_temp, 'rb') as f:
+            return f.read()
+        
+    finally:
+        # Nettoyer les fichiers temporaires
+        for temp_file in [docx_temp, pdf_temp]:
+            if temp_file and os.path.exists(temp_file):
+                try:
+                    os.unlink(temp_file)
+                except:
+                    pass
+
+def _convert_mammoth_job(docx_content: bytes, filename: str) -> bytes:
+    """Conversion DOCX -> HTML -> PDF avec mammoth + weasyprint (exécutée dans le pool de processus)"""
+    # Convertir DOCX en HTML
+    with BytesIO(docx_content) as docx_stream:
+        result = mammoth.convert_to_html(docx_stream)
+        html_content = result.value
+    
+    # Créer le HTML complet avec styles
+    full_html = f"""
+    <!DOCTYPE html>
+    <html>
+    <head>
+        <meta charset="utf-8">
+        <title>{filename}</title>
+        <style>
+            body {{ 
+                font-family: Arial, sans-serif; 
+                margin: 20px;
+                line-height: 1.6;
+            }}
+            h1, h2, h3 {{ color: #333; }}
+            p {{ margin-bottom: 10px; }}
+        </style>
+    </head>
+    <body>
+        {html_content}
+    </body>
+    </html>
+    """
+    
+    # Convertir HTML en PDF
+    html_doc = HTML(string=full_html)
+    return html_doc.write_pdf()
+
+@lru_cache(maxsize=None)
+def _field_adapter(model: Type[BaseModel], field_name: str) -> TypeAdapter:
+    """Validateur du type d'un champ de modèle (construit une fois par champ)"""
+    return TypeAdapter(model.model_fields[field_name].annotation)
+
+def _submodel(annotation: Any) -> Optional[Type[BaseModel]]:
+    """Sous-modèle Pydantic d'un champ (X ou Optional[X]), sinon None"""
+    for candidate in (annotation, *get_args(annotation)):
+        if isinstance(candidate, type) and issubclass(candidate, BaseModel):
+            return candidate
+    return None
+
+def _flatten_updates(model: Type[BaseModel], updates: Dict[str, Any]):
+    """
+    Mises à jour partielles -> (chemin pointé MongoDB, valeur validée).
+    Les dictionnaires destinés à un sous-modèle sont fusionnés champ par champ;
+    les champs inconnus et l'id sont ignorés, comme avec CVData(extra="ignore").
+    Parcours itératif avec une pile explicite (pas de récursion par niveau)
+    """
+    stack = [(model, updates, "")]
+    while stack:
+        current, values, prefix = stack.pop()
+        for key, value in values.items():
+            field = current.model_fields.get(key)
+            if field is None or (current is CVData and key == "id"):
+                continue
+            submodel = _submodel(field.annotation)
+            if submodel is not None and isinstance(value, dict):
+                stack.append((submodel, value, f"{prefix}{key}."))
+            else:
+                adapter = _field_adapter(current, key)
+                yield f"{prefix}{key}", adapter.dump_python(adapter.validate_python(value))
+
+# Libellés des informations personnelles de l'export texte (dans l'ordre d'affichage)
+_TEXT_PERSONAL_FIELDS = (("Nom", "nom"), ("Email", "email"), ("Téléphone", "telephone"), ("Adresse", "adresse"))
+
+def _build_cv_text(cv_data: CVData) -> str:
+    """Export texte d'un CV: une ligne (ou un bloc) par élément, un seul join final"""
+    info = cv_data.informations_personnelles
+    text_parts = ["=== INFORMATIONS PERSONNELLES ==="]
+    text_parts += [f"{label}: {value}" for label, attr in _TEXT_PERSONAL_FIELDS if (value := getattr(info, attr))]
+    
+    if cv_data.competences_techniques:
+        text_parts.append("\n=== COMPÉTENCES TECHNIQUES ===")
+        text_parts += cv_data.competences_techniques
+    
+    if cv_data.experience_professionnelle:
+        text_parts.append("\n=== EXPÉRIENCE PROFESSIONNELLE ===")
+        text_parts += [
+            f"\n{exp.periode} - {exp.poste}\nEntreprise: {exp.entreprise}"
+            + (f"\nDescription: {exp.description}" if exp.description else "")
+            for exp in cv_data.experience_professionnelle
+        ]
+    
+    if cv_data.formations_academiques:
+        text_parts.append("\n=== FORMATIONS ACADÉMIQUES ===")
+        text_parts += [
+            f"\n{form.annee} - {form.diplome}\nÉtablissement: {form.etablissement}"
+            + (f"\nMention: {form.mention}" if form.mention else "")
+            for form in cv_data.formations_academiques
+        ]
+    
+    if cv_data.competences_linguistiques:
+        text_parts.append("\n=== COMPÉTENCES LINGUISTIQUES ===")
+        text_parts += [f"{lang.langue}: {lang.niveau}" for lang in cv_data.competences_linguistiques]
+    
+    if cv_data.certifications:
+        text_parts.append("\n=== CERTIFICATIONS ===")
+        text_parts += cv_data.certifications
+    
+    return "\n".join(text_parts)
+
+@lru_cache(maxsize=1)
+def _docx_template_bytes() -> bytes:
+    """
+    Squelette du document OneTech (modèle par défaut de python-docx, titre et
+    première section, identiques pour tous les CV), sérialisé une fois par processus
+    """
+    doc = Document()
+    doc.add_heading("Curriculum Vitae - OneTech", level=0)
+    doc.add_heading("Informations personnelles", level=1)
+    buffer = BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+def _build_onetech_docx(cv_data: CVData) -> bytes:
+    """Document Word OneTech d'un CV (exécuté dans le pool CPU)"""
+    # Création du document Word depuis le squelette déjà en mémoire
+    doc = Document(BytesIO(_docx_template_bytes()))
+    # Styles résolus une fois par document, pas à chaque paragraphe
+    bullet_style = doc.styles["List Bullet"]
+    quote_style = doc.styles["Intense Quote"]
+
+    # Infos personnelles (titre déjà dans le squelette)
+    doc.add_paragraph(f"Nom : {cv_data.informations_personnelles.nom if cv_data.informations_personnelles else 'Non spécifié'}")
+    doc.add_paragraph(f"Email : {cv_data.informations_personnelles.email if cv_data.informations_personnelles else 'Non spécifié'}")
+    doc.add_paragraph(f"Téléphone : {cv_data.informations_personnelles.telephone if cv_data.informations_personnelles else 'Non spécifié'}")
+    doc.add_paragraph(f"Adresse : {cv_data.informations_personnelles.adresse if cv_data.informations_personnelles else 'Non spécifié'}")
+
+    # Compétences techniques
+    doc.add_heading("Compétences techniques", level=1)
+    for skill in (cv_data.competences_techniques or []):
+        doc.add_paragraph(f"- {skill}", style=bullet_style)
+
+    # Expérience professionnelle
+    doc.add_heading("Expérience professionnelle", level=1)
+    for exp in (cv_data.experience_professionnelle or []):
+        doc.add_paragraph(f"{exp.periode} - {exp.poste} @ {exp.entreprise}")
+        doc.add_paragraph(exp.description, style=quote_style)
+
+    # Formations académiques
+    doc.add_heading("Formations académiques", level=1)
+    for form in (cv_data.formations_academiques or []):
+        doc.add_paragraph(f"{form.annee} - {form.diplome} ({form.etablissement}) - Mention: {form.mention}")
+
+    # Langues
+    doc.add_heading("Langues", level=1)
+    for lang in (cv_data.competences_linguistiques or []):
+        doc.add_paragraph(f"{lang.langue} : {lang.niveau}")
+
+    # Métadonnées
+    doc.add_heading("Métadonnées", level=1)
+    doc.add_paragraph(f"Nombre de mots: {cv_data.metadonnees.nombre_mots if cv_data.metadonnees else 0}")
+    doc.add_paragraph(f"Date extraction: {cv_data.metadonnees.date_extraction if cv_data.metadonnees else 'N/A'}")
+    doc.add_paragraph(f"Taille fichier (KB): {cv_data.metadonnees.taille_fichier_kb if cv_data.metadonnees else 0}")
+
+    # Sauvegarde en mémoire
+    buffer = BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+@lru_cache(maxsize=1)
+def _onetech_pdf_styles() -> Dict[str, Any]:
+    """Styles du gabarit PDF OneTech, construits une fois par processus"""
+    sheet = getSampleStyleSheet()
+    return {
+        "titre": sheet["Title"],
+        "section": sheet["Heading1"],
+        "texte": sheet["Normal"],
+        "puce": sheet["Bullet"],
+        "citation": sheet["Italic"],
+    }
+
+def _build_onetech_pdf(cv_data: CVData) -> bytes:
+    """
+    PDF OneTech d'un CV rendu directement par reportlab (exécuté dans le pool CPU):
+    même contenu que l'export Word, sans passer par un DOCX à convertir
+    """
+    styles = _onetech_pdf_styles()
+    info = cv_data.informations_personnelles
+    meta = cv_data.metadonnees
+    
+    def ligne(texte: Any, style: str = "texte") -> Paragraph:
+        return Paragraph(escape(str(texte)), styles[style])
+    
+    story = [ligne("Curriculum Vitae - OneTech", "titre")]
+    
+    # Infos personnelles
+    story.append(ligne("Informations personnelles", "section"))
+    story.append(ligne(f"Nom : {info.nom if info else 'Non spécifié'}"))
+    story.append(ligne(f"Email : {info.email if info else 'Non spécifié'}"))
+    story.append(ligne(f"Téléphone : {info.telephone if info else 'Non spécifié'}"))
+    story.append(ligne(f"Adresse : {info.adresse if info else 'Non spécifié'}"))
+    
+    # Compétences techniques
+    story.append(ligne("Compétences techniques", "section"))
+    story.extend(ligne(f"- {skill}", "puce") for skill in (cv_data.competences_techniques or []))
+    
+    # Expérience professionnelle
+    story.append(ligne("Expérience professionnelle", "section"))
+    for exp in (cv_data.experience_professionnelle or []):
+        story.append(ligne(f"{exp.periode} - {exp.poste} @ {exp.entreprise}"))
+        story.append(ligne(exp.description or "", "citation"))
+    
+    # Formations académiques
+    story.append(ligne("Formations académiques", "section"))
+    for form in (cv_data.formations_academiques or []):
+        story.append(ligne(f"{form.annee} - {form.diplome} ({form.etablissement}) - Mention: {form.mention}"))
+    
+    # Langues
+    story.append(ligne("Langues", "section"))
+    story.extend(ligne(f"{lang.langue} : {lang.niveau}") for lang in (cv_data.competences_linguistiques or []))
+    
+    # Métadonnées
+    story.append(ligne("Métadonnées", "section"))
+    story.append(ligne(f"Nombre de mots: {meta.nombre_mots if meta else 0}"))
+    story.append(ligne(f"Date extraction: {meta.date_extraction if meta else 'N/A'}"))
+    story.append(ligne(f"Taille fichier (KB): {meta.taille_fichier_kb if meta else 0}"))
+    
+    buffer = BytesIO()
+    SimpleDocTemplate(buffer, pagesize=A4, title="Curriculum Vitae - OneTech").build(story)
+    return buffer.getvalue()
+
 class DocumentConverter:
     """Service de conversion de documents"""
     
-    def __init__(self):
+    def __init__(self, executor: Optional[CPUPool] = None):
         self.conversion_methods = []
+        # Pool de processus partagé avec le parsing (conversions CPU: mise en page, rendu),
+        # sinon le pool de threads par défaut de la boucle
+        self.executor = executor
         
         if DOCX2PDF_AVAILABLE:
             self.conversion_methods.append("docx2pdf")
         if MAMMOTH_AVAILABLE and WEASYPRINT_AVAILABLE:
             self.conversion_methods.append("mammoth_weasyprint")
-            
-        print(f"📄 Méthodes de conversion disponibles: {self.conversion_methods}")
+        
+        # Méthodes liées une fois pour toutes, par ordre de préférence:
+        # docx2pdf (recommandée sur Windows) puis mammoth + weasyprint (cross-platform)
+        methods = {
+            "docx2pdf": self._convert_with_docx2pdf,
+            "mammoth_weasyprint": self._convert_with_mammoth,
+        }
+        self._converters = tuple((name, methods[name]) for name in self.conversion_methods)
+        logger.debug("📄 Méthodes de conversion disponibles: %s", self.conversion_methods)
     
     async def convert_docx_to_pdf(self, docx_content: bytes, filename: str) -> Optional[bytes]:
-        """Convertit un fichier DOCX en PDF"""
-        try:
-            print(f"🔄 Conversion DOCX vers PDF: {filename}")
-            
-            # Méthode 1: docx2pdf (recommandée sur Windows)
-            if "docx2pdf" in self.conversion_methods:
-                try:
-                    return await self._convert_with_docx2pdf(docx_content, filename)
-                except Exception as e:
-                    print(f"⚠️ Échec docx2pdf: {e}")
-            
-            # Méthode 2: mammoth + weasyprint (cross-platform)
-            if "mammoth_weasyprint" in self.conversion_methods:
-                try:
-                    return await self._convert_with_mammoth(docx_content, filename)
-                except Exception as e:
-                    print(f"⚠️ Échec mammoth: {e}")
-            
-            print("❌ Aucune méthode de conversion disponible")
-            return None
-            
-        except Exception as e:
-            print(f"❌ Erreur conversion {filename}: {e}")
-            return None
+        """Convertit un fichier DOCX en PDF (None si aucune méthode n'aboutit)"""
+        for name, method in self._converters:
+            try:
+                return await method(docx_content, filename)
+            except Exception as e:
+                logger.warning("⚠️ Échec %s pour %s: %s", name, filename, e)
+        
+        if not self._converters:
+            logger.warning("❌ Aucune méthode de conversion disponible")
+        return None
+    
+    async def _run(self, func, *args):
+        """Exécute une conversion bloquante hors de la boucle d'événements"""
+        if self.executor is not None:
+            return await self.executor.run(func, *args)
+        return await asyncio.get_running_loop().run_in_executor(None, func, *args)
     
     async def _convert_with_docx2pdf(self, docx_content: bytes, filename: str) -> bytes:
         """Conversion avec docx2pdf"""
-        docx_temp = None
-        pdf_temp = None
-        
-        try:
-            # Créer fichier DOCX temporaire
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.docx') as f:
-                f.write(docx_content)
-                docx_temp = f.name
-            
-            # Créer fichier PDF temporaire
-            pdf_temp = docx_temp.replace('.docx', '.pdf')
-            
-            # Conversion
-            convert(docx_temp, pdf_temp)
-            
-            # Lire le PDF généré
-            with open(pdf_temp, 'rb') as f:
-                pdf_content = f.read()
-            
-            print(f"✅ Conversion docx2pdf réussie: {len(pdf_content)} bytes")
-            return pdf_content
-            
-        finally:
-            # Nettoyer les fichiers temporaires
-            for temp_file in [docx_temp, pdf_temp]:
-                if temp_file and os.path.exists(temp_file):
-                    try:
-                        os.unlink(temp_file)
-                    except:
-                        pass
+        pdf_content = await self._run(_convert_docx2pdf_job, docx_content)
+        logger.debug("✅ Conversion docx2pdf réussie: %s bytes", len(pdf_content))
+        return pdf_content
     
     async def _convert_with_mammoth(self, docx_content: bytes, filename: str) -> bytes:
         """Conversion avec mammoth + weasyprint"""
-        try:
-            # Convertir DOCX en HTML
-            with BytesIO(docx_content) as docx_stream:
-                result = mammoth.convert_to_html(docx_stream)
-                html_content = result.value
-            
-            # Créer le HTML complet avec styles
-            full_html = f"""
-            <!DOCTYPE html>
-            <html>
-            <head>
-                <meta charset="utf-8">
-                <title>{filename}</title>
-                <style>
-                    body {{ 
-                        font-family: Arial, sans-serif; 
-                        margin: 20px;
-                        line-height: 1.6;
-                    }}
-                    h1, h2, h3 {{ color: #333; }}
-                    p {{ margin-bottom: 10px; }}
-                </style>
-            </head>
-            <body>
-                {html_content}
-            </body>
-            </html>
-            """
-            
-            # Convertir HTML en PDF
-            html_doc = HTML(string=full_html)
-            pdf_bytes = html_doc.write_pdf()
-            
-            print(f"✅ Conversion mammoth réussie: {len(pdf_bytes)} bytes")
-            return pdf_bytes
-            
-        except Exception as e:
-            print(f"❌ Erreur mammoth: {e}")
-            raise
+        pdf_bytes = await self._run(_convert_mammoth_job, docx_content, filename)
+        logger.debug("✅ Conversion mammoth réussie: %s bytes", len(pdf_bytes))
+        return pdf_bytes
     
     def is_conversion_available(self) -> bool:
         """Vérifie si la conversion est disponible"""
@@ -161,7 +422,7 @@ class DocumentConverter:
     def get_supported_formats(self) -> list:
         """Retourne les formats supportés pour conversion"""
         if self.is_conversion_available():
-            return ['.docx', '.doc']
+            return sorted(PREVIEW_CONVERTIBLE, reverse=True)
         return []
 
 
@@ -169,80 +430,113 @@ class DocumentConverter:
 class CVService:
     """Service pour la gestion complète des CV"""
     
-    def __init__(self):
+    def __init__(self, cpu_pool: Optional[CPUPool] = None):
         self.text_extractor = TextExtractor()
         self.info_extractor = InfoExtractor()
         self.cv_repository = CVRepository()
-        self.document_converter = DocumentConverter()
+        self.document_converter = DocumentConverter(executor=cpu_pool)
         self.file_storage = FileStorageService()
+        # Pool pour le parsing CPU (CPUPool créé au démarrage, recréé si un worker meurt),
+        # sinon le pool de threads par défaut de la boucle
+        self.cpu_pool = cpu_pool
+        # (hash du contenu, extension) -> texte extrait, du plus ancien au plus récent
+        self._text_cache: "OrderedDict[Tuple[str, str], str]" = OrderedDict()
     
-    async def process_cv_file(self, file_content: bytes, filename: str, file_ext: str) -> CVData:
-        """Traite un fichier CV complet"""
-        print(f"🔄 Début du traitement du fichier: {filename}")
-        print(f"📊 Taille du fichier: {len(file_content)} bytes")
-        print(f"📄 Extension: {file_ext}")
-        
-        tmp_file_path = None
+    async def warm_up(self):
+        """Démarre un worker du pool CPU et y charge les extracteurs"""
+        try:
+            await self._run_cpu(_warm_worker_job)
+        except Exception as e:
+            logger.warning("⚠️ Erreur préchauffage du pool CPU: %s", e)
+    
+    async def migrate_legacy_ids(self):
+        """Aligne les anciens identifiants UUID sur le _id Mongo et renomme les fichiers stockés"""
+        for old_id, new_id, filename_original in await self.cv_repository.normalize_legacy_ids():
+            if old_id and filename_original:
+                await self.file_storage.rename_file(old_id, new_id, filename_original)
+    
+    async def _run_cpu(self, func, *args):
+        """Exécute un traitement bloquant sans occuper la boucle d'événements"""
+        if self.cpu_pool is not None:
+            return await self.cpu_pool.run(func, *args)
+        return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+    
+    async def process_cv_file(self, file_content: bytes, filename: str, file_ext: str,
+                              file_hash: Optional[str] = None, staged_path: Optional[str] = None,
+                              text: Optional[str] = None) -> CVData:
+        """
+        Traite un fichier CV complet (file_hash: hash déjà calculé pendant l'upload,
+        staged_path: fichier déjà écrit pendant l'upload, text: texte déjà extrait,
+        voir check_and_process_cv)
+        """
+        logger.debug("🔄 Début du traitement du fichier: %s", filename)
+        logger.debug("📊 Taille du fichier: %s bytes", len(file_content))
+        logger.debug("📄 Extension: %s", file_ext)
         
         try:
-            # 1. Créer un fichier temporaire
-            with tempfile.NamedTemporaryFile(delete=False, suffix=file_ext) as tmp_file:
-                tmp_file.write(file_content)
-                tmp_file_path = tmp_file.name
-                print(f"📁 Fichier temporaire créé: {tmp_file_path}")
-            
-            # 2. Extraction du texte
-            print("🔍 Extraction du texte...")
+            # 1. Extraction du texte, directement depuis le contenu en mémoire
+            logger.debug("🔍 Extraction du texte...")
             try:
-                text = self.text_extractor.extract_text(tmp_file_path)
+                if text is None:
+                    text = await self._run_cpu(_extract_text_job, file_content, file_ext)
                 if not text or len(text.strip()) == 0:
                     raise Exception("Aucun texte extrait du fichier")
-                print(f"📝 Texte extrait: {len(text)} caractères")
+                logger.debug("📝 Texte extrait: %s caractères", len(text))
             except Exception as e:
-                print(f"❌ Erreur extraction texte: {e}")
+                logger.error("❌ Erreur extraction texte: %s", e)
                 raise Exception(f"Impossible d'extraire le texte du fichier: {str(e)}")
             
-            # 3. Extraction des informations structurées
-            print("🧠 Extraction des informations structurées...")
+            # 2. Extraction des informations structurées
+            logger.debug("🧠 Extraction des informations structurées...")
             try:
-                extracted_data = self.info_extractor.extract_all_data(text)
-                print("✅ Informations extraites avec succès")
+                extracted_data = await self._run_cpu(_extract_info_job, text)
+                logger.debug("✅ Informations extraites avec succès")
             except Exception as e:
-                print(f"❌ Erreur extraction informations: {e}")
-                print(f"Traceback: {traceback.format_exc()}")
+                logger.exception("❌ Erreur extraction informations: %s", e)
                 raise Exception(f"Erreur lors de l'extraction des informations: {str(e)}")
             
-            # 4. Convertir en modèles Pydantic
-            print("🔄 Conversion en modèles Pydantic...")
+            # 3. Convertir en modèles Pydantic
+            # Sortie de notre propre InfoExtractor (chaînes et entiers déjà typés):
+            # model_construct évite de revalider chaque sous-modèle à chaque upload
+            logger.debug("🔄 Conversion en modèles Pydantic...")
             
             # PersonalInfo avec validation
             try:
                 personal_info_data = extracted_data.get('informations_personnelles', {})
-                personal_info = PersonalInfo(
+                personal_info = PersonalInfo.model_construct(
                     nom=personal_info_data.get('nom') if personal_info_data.get('nom') != "Non trouvé" else None,
                     email=personal_info_data.get('email') if personal_info_data.get('email') != "Non trouvé" else None,
                     telephone=personal_info_data.get('telephone') if personal_info_data.get('telephone') != "Non trouvé" else None,
                     adresse=personal_info_data.get('adresse') if personal_info_data.get('adresse') != "Non trouvé" else None
                 )
-                print(f"✅ PersonalInfo créé: {personal_info.nom}")
+                logger.debug("✅ PersonalInfo créé: %s", personal_info.nom)
             except Exception as e:
-                print(f"⚠️ Erreur création PersonalInfo: {e}")
+                logger.warning("⚠️ Erreur création PersonalInfo: %s", e)
                 personal_info = PersonalInfo()
             
             # CVMetadata avec validation
             try:
                 metadata_raw = extracted_data.get('metadonnees', {})
-                metadata = CVMetadata(
-                    nombre_mots=metadata_raw.get('nombre_mots', len(text.split()) if text else 0),
+                # Compté par l'extracteur: ne recompter que s'il manque
+                nombre_mots = metadata_raw.get('nombre_mots')
+                if nombre_mots is None:
+                    nombre_mots = count_words(text)
+                metadata = CVMetadata.model_construct(
+                    nombre_mots=nombre_mots,
                     date_extraction=metadata_raw.get('date_extraction', datetime.now().strftime("%Y-%m-%d %H:%M:%S")),
                     apercu_texte=metadata_raw.get('apercu_texte', text[:200] if text else ""),
-                    taille_fichier_kb=round(len(file_content) / 1024, 2)
+                    taille_fichier_kb=round(len(file_content) / 1024, 2),
+                    scores_confiance=metadata_raw.get('scores_confiance')
                 )
-                print(f"✅ CVMetadata créé: {metadata.nombre_mots} mots")
+                logger.debug("✅ CVMetadata créé: %s mots", metadata.nombre_mots)
+                if metadata.scores_confiance:
+                    a_verifier = InfoExtractor.low_confidence_fields(metadata.scores_confiance)
+                    if a_verifier:
+                        logger.warning("⚠️ Champs à faible confiance: %s", a_verifier)
             except Exception as e:
-                print(f"⚠️ Erreur création CVMetadata: {e}")
+                logger.warning("⚠️ Erreur création CVMetadata: %s", e)
                 metadata = CVMetadata(
-                    nombre_mots=len(text.split()) if text else 0,
+                    nombre_mots=count_words(text),
                     date_extraction=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
                     apercu_texte=text[:200] if text else "",
                     taille_fichier_kb=round(len(file_content) / 1024, 2)
@@ -251,65 +545,66 @@ class CVService:
             # Convertir les expériences
             experiences = []
             experiences_data = extracted_data.get('experience_professionnelle', [])
-            print(f"🔄 Traitement de {len(experiences_data)} expériences...")
+            logger.debug("🔄 Traitement de %s expériences...", len(experiences_data))
             
             for i, exp_data in enumerate(experiences_data):
                 try:
                     if isinstance(exp_data, dict):
-                        experience = Experience(
+                        experience = Experience.model_construct(
                             periode=exp_data.get('periode', ''),
                             poste=exp_data.get('poste', ''),
                             entreprise=exp_data.get('entreprise', ''),
                             description=exp_data.get('description', '')
                         )
                         experiences.append(experience)
-                        print(f"✅ Expérience {i+1} créée: {experience.poste}")
+                        logger.debug("✅ Expérience %s créée: %s", i+1, experience.poste)
                 except Exception as e:
-                    print(f"⚠️ Erreur création Experience {i}: {e}")
+                    logger.warning("⚠️ Erreur création Experience %s: %s", i, e)
                     continue
             
             # Convertir les formations
             formations = []
             formations_data = extracted_data.get('formations_academiques', [])
-            print(f"🔄 Traitement de {len(formations_data)} formations...")
+            logger.debug("🔄 Traitement de %s formations...", len(formations_data))
             
             for i, form_data in enumerate(formations_data):
                 try:
                     if isinstance(form_data, dict):
-                        formation = Formation(
+                        formation = Formation.model_construct(
                             annee=form_data.get('annee', ''),
                             diplome=form_data.get('diplome', ''),
                             etablissement=form_data.get('etablissement', ''),
                             mention=form_data.get('mention', '')
                         )
                         formations.append(formation)
-                        print(f"✅ Formation {i+1} créée: {formation.diplome}")
+                        logger.debug("✅ Formation %s créée: %s", i+1, formation.diplome)
                 except Exception as e:
-                    print(f"⚠️ Erreur création Formation {i}: {e}")
+                    logger.warning("⚠️ Erreur création Formation %s: %s", i, e)
                     continue
             
             # Convertir les langues
             langues = []
             langues_data = extracted_data.get('competences_linguistiques', [])
-            print(f"🔄 Traitement de {len(langues_data)} langues...")
+            logger.debug("🔄 Traitement de %s langues...", len(langues_data))
             
             for i, lang_data in enumerate(langues_data):
                 try:
                     if isinstance(lang_data, dict) and lang_data.get('langue'):
-                        langue = LanguageSkill(
+                        langue = LanguageSkill.model_construct(
                             langue=lang_data.get('langue', ''),
                             niveau=lang_data.get('niveau', 'Non spécifié')
                         )
                         langues.append(langue)
-                        print(f"✅ Langue {i+1} créée: {langue.langue} - {langue.niveau}")
+                        logger.debug("✅ Langue %s créée: %s - %s", i+1, langue.langue, langue.niveau)
                 except Exception as e:
-                    print(f"⚠️ Erreur création LanguageSkill {i}: {e}")
+                    logger.warning("⚠️ Erreur création LanguageSkill %s: %s", i, e)
                     continue
             
-            # 5. Créer l'objet CVData
-            print("📦 Création de l'objet CVData...")
+            # 4. Créer l'objet CVData
+            logger.debug("📦 Création de l'objet CVData...")
             try:
-                cv_id = str(uuid.uuid4())
+                # Même valeur que le _id Mongo: fichier stocké et document partagent l'identifiant
+                cv_id = str(ObjectId())
                 
                 competences_techniques = extracted_data.get('competences_techniques', [])
                 if not isinstance(competences_techniques, list):
@@ -319,7 +614,11 @@ class CVService:
                 if not isinstance(certifications, list):
                     certifications = []
                 
-                cv_data = CVData(
+                file_hash = file_hash or await asyncio.to_thread(self._calculate_file_hash, file_content)
+                now = datetime.now()
+                
+                # Sous-modèles construits ci-dessus: pas de validation de tout l'arbre
+                cv_data = CVData.model_construct(
                     id=cv_id,
                     informations_personnelles=personal_info,
                     competences_techniques=competences_techniques,
@@ -331,209 +630,199 @@ class CVService:
                     metadonnees=metadata,
                     nlp_enrichment=extracted_data.get('nlp_enrichment'),
                     filename_original=filename,
-                    file_hash=self._calculate_file_hash(file_content),
+                    file_hash=file_hash,
+                    hash_algo=HASH_ALGO,
                     status="completed",
-                    created_at=datetime.now(),
-                    updated_at=datetime.now()
+                    created_at=now,
+                    updated_at=now
                 )
                 
-                print(f"✅ CVData créé avec l'ID: {cv_id}")
+                logger.debug("✅ CVData créé avec l'ID: %s", cv_id)
                 
             except Exception as e:
-                print(f"❌ Erreur création CVData: {e}")
-                print(f"Traceback: {traceback.format_exc()}")
+                logger.exception("❌ Erreur création CVData: %s", e)
                 raise Exception(f"Erreur lors de la création de l'objet CV: {str(e)}")
             
-            # 6. Stocker le fichier original - NOUVEAU
-            print("💾 Stockage du fichier original...")
-            try:
-                file_stored = await self.file_storage.store_file(
-                    file_content, cv_id, filename
-                )
-                if file_stored:
-                    print(f"✅ Fichier original stocké: {cv_id}")
-                else:
-                    print("⚠️ Échec du stockage du fichier original")
-            except Exception as e:
-                print(f"❌ Erreur stockage fichier: {e}")
+            # 5. Stocker le fichier original et sauvegarder en base: opérations
+            # indépendantes, menées en parallèle
+            logger.debug("💾 Stockage du fichier original et sauvegarde en base...")
+            if staged_path:
+                store = self.file_storage.commit_staged(staged_path, cv_id, filename)
+            else:
+                store = self.file_storage.store_file(file_content, cv_id, filename)
+            file_stored, saved_cv = await asyncio.gather(
+                store,
+                # Regroupée avec les autres uploads simultanés (un insert_many)
+                self.cv_repository.create_cv_grouped(cv_data),
+                return_exceptions=True
+            )
             
-            # 6. Sauvegarder en base
-            print("💾 Tentative de sauvegarde en base de données...")
-            try:
-                saved_cv = await self.cv_repository.create_cv(cv_data)
-                if saved_cv:
-                    print(f"✅ CV sauvegardé en base avec succès: {cv_id}")
-                    return saved_cv
-                else:
-                    print("⚠️ La sauvegarde a retourné None")
-                    return cv_data
-            except Exception as e:
-                print(f"❌ Impossible de sauvegarder en base: {e}")
-                print("📝 Le CV sera retourné sans sauvegarde")
+            if isinstance(file_stored, Exception):
+                logger.error("❌ Erreur stockage fichier: %s", file_stored)
+            elif file_stored:
+                logger.debug("✅ Fichier original stocké: %s", cv_id)
+            else:
+                logger.warning("⚠️ Échec du stockage du fichier original")
+            
+            if isinstance(saved_cv, Exception):
+                logger.error("❌ Impossible de sauvegarder en base: %s", saved_cv)
+                logger.debug("📝 Le CV sera retourné sans sauvegarde")
                 cv_data.status = "not_saved"
                 return cv_data
+            if saved_cv:
+                logger.debug("✅ CV sauvegardé en base avec succès: %s", cv_id)
+                return saved_cv
+            logger.warning("⚠️ La sauvegarde a retourné None")
+            return cv_data
             
         except Exception as e:
-            print(f"❌ Erreur lors du traitement: {e}")
-            print(f"Traceback complet: {traceback.format_exc()}")
+            logger.exception("❌ Erreur lors du traitement: %s", e)
             raise Exception(f"Erreur lors du traitement du CV: {str(e)}")
-            
-        finally:
-            # Nettoyer le fichier temporaire
-            if tmp_file_path and os.path.exists(tmp_file_path):
-                try:
-                    os.unlink(tmp_file_path)
-                    print("🗑️ Fichier temporaire supprimé")
-                except Exception as e:
-                    print(f"⚠️ Erreur suppression fichier temporaire: {e}")
     
-    async def update_cv(self, cv_data: CVData) -> Optional[CVData]:
-        """Met à jour un CV existant - VERSION CORRIGÉE"""
+    async def update_cv(self, cv_data: CVData, now: Optional[datetime] = None) -> Optional[CVData]:
+        """Met à jour un CV existant (now: horodatage de la requête, pris ici sinon)"""
         try:
-            print(f"🔄 Mise à jour du CV: {cv_data.id}")
+            logger.debug("🔄 Mise à jour du CV: %s", cv_data.id)
             
-            # Vérifier que le CV existe
-            existing_cv = await self.cv_repository.get_cv_by_id(cv_data.id)
+            # Vérifier que le CV existe (lecture en base: sert de référence à la différence envoyée)
+            existing_cv = await self.cv_repository.get_cv_by_id(cv_data.id, use_cache=False)
             if not existing_cv:
-                print(f"❌ CV non trouvé pour mise à jour: {cv_data.id}")
+                logger.debug("❌ CV non trouvé pour mise à jour: %s", cv_data.id)
                 return None
             
             # S'assurer que les dates sont conservées
             if not cv_data.created_at and existing_cv.created_at:
                 cv_data.created_at = existing_cv.created_at
             
-            cv_data.updated_at = datetime.now()
+            cv_data.updated_at = now or datetime.now()
             
-            # Utiliser le repository pour la mise à jour
-            updated_cv = await self.cv_repository.update_cv(cv_data)
+            # Utiliser le repository pour la mise à jour (seuls les champs modifiés sont envoyés)
+            updated_cv = await self.cv_repository.update_cv(cv_data, previous=existing_cv)
             
             if updated_cv:
                 updated_cv.status = "completed"
-                print(f"✅ CV mis à jour: {cv_data.id}")
+                logger.debug("✅ CV mis à jour: %s", cv_data.id)
             else:
-                print(f"❌ Échec mise à jour CV: {cv_data.id}")
+                logger.error("❌ Échec mise à jour CV: %s", cv_data.id)
                 
             return updated_cv
             
         except Exception as e:
-            print(f"❌ Erreur mise à jour CV {cv_data.id}: {e}")
-            print(f"Traceback: {traceback.format_exc()}")
+            logger.exception("❌ Erreur mise à jour CV %s: %s", cv_data.id, e)
             return None
 
-    async def update_cv_fields(self, cv_id: str, updates: Dict[str, Any]) -> Optional[CVData]:
-        """Met à jour des champs spécifiques d'un CV - VERSION CORRIGÉE"""
+    async def update_cv_fields(self, cv_id: str, updates: Dict[str, Any],
+                               now: Optional[datetime] = None) -> Optional[CVData]:
+        """Met à jour des champs spécifiques d'un CV (now: horodatage de la requête, pris ici sinon)"""
         try:
-            print(f"🔄 Mise à jour partielle CV: {cv_id}")
-            print(f"📝 Champs: {list(updates.keys())}")
-            
-            # Récupérer le CV existant
-            existing_cv = await self.cv_repository.get_cv_by_id(cv_id)
-            if not existing_cv:
-                print(f"❌ CV non trouvé: {cv_id}")
-                return None
+            logger.debug("🔄 Mise à jour partielle CV: %s", cv_id)
+            logger.debug("📝 Champs: %s", list(updates.keys()))
             
-            # Convertir en dictionnaire
-            cv_dict = existing_cv.dict()
+            # Chemins pointés validés champ par champ ({"informations_personnelles.email": ...}):
+            # un seul $set, sans relire ni revalider le CV complet
+            fields = dict(_flatten_updates(CVData, updates))
+            if not fields:
+                return await self.cv_repository.get_cv_by_id(cv_id)
             
-            # Appliquer les mises à jour récursivement pour les sous-structures
-            def update_dict_recursive(original, updates):
-                for key, value in updates.items():
-                    if isinstance(value, dict) and key in original and isinstance(original[key], dict):
-                        update_dict_recursive(original[key], value)
-                    else:
-                        original[key] = value
-            
-            update_dict_recursive(cv_dict, updates)
-            cv_dict["updated_at"] = datetime.now()
-            
-            # Recréer l'objet CVData
-            updated_cv_data = CVData(**cv_dict)
-            
-            # Sauvegarder
-            result = await self.cv_repository.update_cv(updated_cv_data)
+            result = await self.cv_repository.update_cv_partial(cv_id, fields, now=now or datetime.now())
             
             if result:
-                print(f"✅ Champs mis à jour: {cv_id}")
+                logger.debug("✅ Champs mis à jour: %s", cv_id)
             else:
-                print(f"❌ Échec mise à jour champs: {cv_id}")
+                logger.error("❌ Échec mise à jour champs: %s", cv_id)
                 
             return result
             
         except Exception as e:
-            print(f"❌ Erreur mise à jour champs CV {cv_id}: {e}")
-            print(f"Traceback: {traceback.format_exc()}")
+            logger.exception("❌ Erreur mise à jour champs CV %s: %s", cv_id, e)
             return None
     
-    async def extract_text_only(self, file_content: bytes, file_ext: str) -> str:
-        """Extrait seulement le texte d'un fichier"""
-        print(f"📄 Extraction de texte pour fichier {file_ext}")
+    async def extract_text_only(self, file_content: bytes, file_ext: str,
+                                file_hash: Optional[str] = None) -> str:
+        """
+        Extrait seulement le texte d'un fichier (file_hash: hash déjà calculé pendant l'upload).
+        Le texte est gardé par hash du contenu: un même fichier n'est parsé qu'une fois
+        """
+        logger.debug("📄 Extraction de texte pour fichier %s", file_ext)
         
-        tmp_file_path = None
         try:
-            with tempfile.NamedTemporaryFile(delete=False, suffix=file_ext) as tmp_file:
-                tmp_file.write(file_content)
-                tmp_file_path = tmp_file.name
-            
-            text = self.text_extractor.extract_text(tmp_file_path)
-            print(f"📝 Texte extrait: {len(text) if text else 0} caractères")
-            return text or ""
+            file_hash = file_hash or await asyncio.to_thread(self._calculate_file_hash, file_content)
+            key = (file_hash, file_ext)
+            text = self._text_cache.get(key)
+            if text is not None:
+                self._text_cache.move_to_end(key)
+                logger.debug("📝 Texte déjà extrait: %s caractères", len(text))
+                return text
+            
+            text = await self._run_cpu(_extract_text_job, file_content, file_ext) or ""
+            logger.debug("📝 Texte extrait: %s caractères", len(text))
+            if text:
+                self._text_cache[key] = text
+                if len(self._text_cache) > TEXT_CACHE_MAXSIZE:
+                    self._text_cache.popitem(last=False)
+            return text
             
         except Exception as e:
-            print(f"❌ Erreur extraction texte: {e}")
+            logger.error("❌ Erreur extraction texte: %s", e)
             return ""
-            
-        finally:
-            if tmp_file_path and os.path.exists(tmp_file_path):
-                try:
-                    os.unlink(tmp_file_path)
-                except Exception as e:
-                    print(f"⚠️ Erreur suppression fichier temporaire: {e}")
     
-    async def get_all_cvs(self) -> List[CVData]:
-        """Récupère tous les CV"""
-        print("📋 Récupération de tous les CV...")
+    async def get_all_cvs(self, list_view: bool = False) -> List[CVData]:
+        """Récupère tous les CV (list_view: sans les champs volumineux)"""
+        logger.debug("📋 Récupération de tous les CV...")
         try:
-            cvs = await self.cv_repository.get_all_cvs()
-            print(f"✅ {len(cvs)} CV(s) récupéré(s)")
+            cvs = await self.cv_repository.get_all_cvs(LIST_VIEW_PROJECTION if list_view else None)
+            logger.debug("✅ %s CV(s) récupéré(s)", len(cvs))
             return cvs
         except Exception as e:
-            print(f"❌ Erreur récupération CV: {e}")
+            logger.error("❌ Erreur récupération CV: %s", e)
             return []
     
-    async def get_cv_by_id(self, cv_id: str) -> Optional[CVData]:
-        """Récupère un CV par ID (stricte puis flexible)"""
+    def stream_all_cvs_json(self, list_view: bool = False, skip: int = 0, limit: int = 0) -> AsyncIterator[bytes]:
+        """CV en JSON, document par document (sans modèles Pydantic); limit=0: tous"""
+        return self.cv_repository.stream_cvs_json(
+            projection=LIST_VIEW_PROJECTION if list_view else None, skip=skip, limit=limit
+        )
+    
+    async def count_cvs_estimated(self) -> int:
+        """Nombre approximatif de CV (pagination)"""
+        return await self.cv_repository.estimated_count()
+    
+    def stream_cvs_by_skills_json(self, skills: List[str]) -> AsyncIterator[bytes]:
+        """Recherche par compétences en JSON, document par document"""
+        return self.cv_repository.stream_by_skills_json(skills)
+    
+    async def get_cv_json(self, cv_id: str) -> Optional[bytes]:
+        """CV en JSON (lecture seule, sans modèle Pydantic)"""
+        if not cv_id:
+            return None
+        return await self.cv_repository.get_cv_json(cv_id)
+    
+    async def get_cv_by_id(self, cv_id: str, use_cache: bool = True) -> Optional[CVData]:
+        """Récupère un CV par ID (use_cache=False: sans le cache du repository, avant une écriture)"""
         try:
-            print(f"🔍 Service: Recherche CV: {cv_id}")
+            logger.debug("🔍 Service: Recherche CV: %s", cv_id)
             if not cv_id:
-                print("❌ ID manquant")
+                logger.error("❌ ID manquant")
                 return None
 
-            # Recherche stricte par id
-            cv = await self.cv_repository.get_cv_by_id(cv_id)
-            if cv:
-                print(f"✅ Service: CV trouvé (stricte): {cv_id}")
-                return cv
-
-            # Si non trouvé, recherche flexible (id ou _id)
-            cv = await self.cv_repository.get_cv_by_any_id(cv_id)
+            cv = await self.cv_repository.get_cv_by_id(cv_id, use_cache=use_cache)
             if cv:
-                print(f"✅ Service: CV trouvé (flexible): {cv_id}")
+                logger.debug("✅ Service: CV trouvé: %s", cv_id)
                 return cv
 
-            print(f"❌ Service: CV non trouvé: {cv_id}")
+            logger.debug("❌ Service: CV non trouvé: %s", cv_id)
             return None
 
         except Exception as e:
-            print(f"❌ Erreur service récupération CV {cv_id}: {e}")
-            print(f"Traceback: {traceback.format_exc()}")
+            logger.exception("❌ Erreur service récupération CV %s: %s", cv_id, e)
             return None
     
     async def delete_cv(self, cv_id: str) -> bool:
         """Supprime un CV et son fichier associé - VERSION MISE À JOUR"""
-        print(f"🗑️ Suppression du CV: {cv_id}")
+        logger.debug("🗑️ Suppression du CV: %s", cv_id)
         try:
-            # Récupérer les infos du CV avant suppression
-            cv_data = await self.cv_repository.get_cv_by_id(cv_id)
+            # Récupérer les infos du CV avant suppression (lecture en base: nom du fichier à jour)
+            cv_data = await self.cv_repository.get_cv_by_id(cv_id, use_cache=False)
             
             # Supprimer de la base de données
             result = await self.cv_repository.delete_cv(cv_id)
@@ -542,111 +831,137 @@ class CVService:
             if result and cv_data and cv_data.filename_original:
                 try:
                     await self.file_storage.delete_file(cv_id, cv_data.filename_original)
-                    print(f"✅ Fichier supprimé: {cv_id}")
+                    logger.debug("✅ Fichier supprimé: %s", cv_id)
                 except Exception as e:
-                    print(f"⚠️ Erreur suppression fichier: {e}")
+                    logger.warning("⚠️ Erreur suppression fichier: %s", e)
                     # Ne pas faire échouer la suppression DB si fichier pas supprimé
             
             if result:
-                print(f"✅ CV supprimé: {cv_id}")
+                logger.debug("✅ CV supprimé: %s", cv_id)
             else:
-                print(f"❌ Échec suppression CV: {cv_id}")
+                logger.error("❌ Échec suppression CV: %s", cv_id)
             return result
         except Exception as e:
-            print(f"❌ Erreur suppression CV {cv_id}: {e}")
+            logger.error("❌ Erreur suppression CV %s: %s", cv_id, e)
             return False
     
     async def search_cvs_by_skills(self, skills: List[str]) -> List[CVData]:
         """Recherche des CV par compétences"""
-        print(f"🔍 Recherche CV par compétences: {skills}")
+        logger.debug("🔍 Recherche CV par compétences: %s", skills)
         try:
             cvs = await self.cv_repository.search_by_skills(skills)
-            print(f"✅ {len(cvs)} CV(s) trouvé(s) avec ces compétences")
+            logger.debug("✅ %s CV(s) trouvé(s) avec ces compétences", len(cvs))
             return cvs
         except Exception as e:
-            print(f"❌ Erreur recherche CV par compétences: {e}")
+            logger.error("❌ Erreur recherche CV par compétences: %s", e)
             return []
     
-    async def update_cv_status(self, cv_id: str, status: str) -> bool:
+    async def update_cv_status(self, cv_id: str, status: str, now: Optional[datetime] = None) -> bool:
         """Met à jour le statut d'un CV"""
-        print(f"🔄 Mise à jour statut CV {cv_id}: {status}")
+        logger.debug("🔄 Mise à jour statut CV %s: %s", cv_id, status)
         try:
-            result = await self.cv_repository.update_cv_status(cv_id, status)
+            result = await self.cv_repository.update_cv_status(cv_id, status, now=now)
             if result:
-                print(f"✅ Statut mis à jour: {cv_id}")
+                logger.debug("✅ Statut mis à jour: %s", cv_id)
             return result
         except Exception as e:
-            print(f"❌ Erreur mise à jour statut CV {cv_id}: {e}")
+            logger.error("❌ Erreur mise à jour statut CV %s: %s", cv_id, e)
             return False
     
+    def new_file_hasher(self):
+        """Retourne un hasher incrémental compatible avec _calculate_file_hash"""
+        if BLAKE3_AVAILABLE:
+            return blake3.blake3(max_threads=blake3.blake3.AUTO)
+        return hashlib.md5()
+    
     def _calculate_file_hash(self, file_content: bytes) -> str:
-        """Calcule le hash MD5 du fichier"""
+        """Calcule le hash du fichier (BLAKE3, ou MD5 si blake3 n'est pas installé)"""
         try:
-            hash_md5 = hashlib.md5(file_content).hexdigest()
-            print(f"🔒 Hash calculé: {hash_md5[:8]}...")
-            return hash_md5
+            hasher = self.new_file_hasher()
+            hasher.update(file_content)
+            file_hash = hasher.hexdigest()
+            logger.debug("🔒 Hash calculé: %s...", file_hash[:8])
+            return file_hash
         except Exception as e:
-            print(f"❌ Erreur calcul hash: {e}")
+            logger.error("❌ Erreur calcul hash: %s", e)
             return str(uuid.uuid4())  # Fallback
     
+    @staticmethod
+    def _discard_task(task: asyncio.Future):
+        """Annule une tâche dont le résultat n'est plus utile (et ignore son éventuelle erreur)"""
+        if task.done():
+            if not task.cancelled():
+                task.exception()
+        else:
+            task.cancel()
+    
+    async def _find_duplicate(self, file_hash: str, file_content: bytes) -> Optional[CVData]:
+        """
+        Cherche un doublon par hash; tant qu'il reste des CV hashés en MD5,
+        retente avec le MD5 et migre le CV trouvé vers le nouvel algorithme
+        """
+        existing_cv = await self.cv_repository.check_duplicate_hash(file_hash)
+        if existing_cv or HASH_ALGO == "md5":
+            return existing_cv
+        
+        if not await self.cv_repository.has_legacy_hashes():
+            return None
+        
+        legacy_hash = (await asyncio.to_thread(hashlib.md5, file_content)).hexdigest()
+        existing_id = await self.cv_repository.get_duplicate_cv_id(legacy_hash)
+        if not existing_id:
+            return None
+        
+        await self.cv_repository.migrate_file_hash(legacy_hash, file_hash, HASH_ALGO)
+        return await self.cv_repository.get_cv_by_id(existing_id, use_cache=False)
+    
     async def validate_cv_data(self, cv_data: CVData) -> bool:
         """Valide la cohérence des données d'un CV"""
-        print(f"✅ Validation des données CV: {cv_data.id}")
+        logger.debug("✅ Validation des données CV: %s", cv_data.id)
         try:
             if not cv_data.id:
-                print("❌ ID manquant")
+                logger.error("❌ ID manquant")
                 return False
             
             if not cv_data.filename_original:
-                print("❌ Nom de fichier manquant")
+                logger.error("❌ Nom de fichier manquant")
                 return False
             
             if not cv_data.file_hash:
-                print("❌ Hash de fichier manquant")
+                logger.error("❌ Hash de fichier manquant")
                 return False
             
-            print("✅ Données CV valides")
+            logger.debug("✅ Données CV valides")
             return True
             
         except Exception as e:
-            print(f"❌ Erreur validation CV: {e}")
+            logger.error("❌ Erreur validation CV: %s", e)
             return False
     
     async def get_cv_statistics(self) -> Dict[str, Any]:
         """Récupère les statistiques des CV"""
         try:
-            print("📊 Calcul des statistiques CV...")
-            cvs = await self.get_all_cvs()
-            
-            total_cvs = len(cvs)
-            completed_cvs = len([cv for cv in cvs if cv.status == "completed"])
-            processing_cvs = len([cv for cv in cvs if cv.status == "processing"])
-            error_cvs = len([cv for cv in cvs if cv.status == "error"])
-            
-            # Compétences les plus communes
-            all_skills = []
-            for cv in cvs:
-                if cv.competences_techniques:
-                    all_skills.extend(cv.competences_techniques)
-            
-            from collections import Counter
-            top_skills = Counter(all_skills).most_common(10)
+            logger.debug("📊 Calcul des statistiques CV...")
+            # Agrégation côté MongoDB: aucun CV n'est chargé ni validé en Python
+            repo_stats = await self.cv_repository.get_cv_stats(top_skills=10)
+            by_status = repo_stats["by_status"]
+            total_cvs = repo_stats["total"]
             
             stats = {
                 "total_cvs": total_cvs,
-                "completed_cvs": completed_cvs,
-                "processing_cvs": processing_cvs,
-                "error_cvs": error_cvs,
-                "success_rate": round((completed_cvs / total_cvs * 100) if total_cvs > 0 else 0, 2),
-                "top_skills": [{"skill": skill, "count": count} for skill, count in top_skills],
-                "last_updated": datetime.now().isoformat()
+                "completed_cvs": by_status.get("completed", 0),
+                "processing_cvs": by_status.get("processing", 0),
+                "error_cvs": by_status.get("error", 0),
+                "success_rate": repo_stats["success_rate"],
+                "top_skills": [{"skill": skill, "count": count} for skill, count in repo_stats["top_skills"]],
+                "last_updated": repo_stats["last_updated"]
             }
             
-            print(f"✅ Statistiques calculées: {total_cvs} CV(s)")
+            logger.debug("✅ Statistiques calculées: %s CV(s)", total_cvs)
             return stats
             
         except Exception as e:
-            print(f"❌ Erreur calcul statistiques: {e}")
+            logger.error("❌ Erreur calcul statistiques: %s", e)
             return {
                 "total_cvs": 0,
                 "completed_cvs": 0,
@@ -657,80 +972,60 @@ class CVService:
                 "last_updated": datetime.now().isoformat()
             }
     
-    async def export_cv_onetech(self, cv_id: str):
-        """Exporte un CV au format OneTech (.docx)"""
+    async def export_cv_onetech(self, cv_id: str, cv_data: Optional[CVData] = None):
+        """Exporte un CV au format OneTech (.docx) (cv_data: CV déjà chargé par l'appelant)"""
         try:
-            print(f"📤 Service: Export OneTech (Word) pour CV: {cv_id}")
+            logger.debug("📤 Service: Export OneTech (Word) pour CV: %s", cv_id)
             
             # Récupération du CV
-            cv_data = await self.get_cv_by_id(cv_id)
+            if cv_data is None:
+                cv_data = await self.get_cv_by_id(cv_id)
             if not cv_data:
-                print(f"❌ CV non trouvé pour export OneTech: {cv_id}")
+                logger.debug("❌ CV non trouvé pour export OneTech: %s", cv_id)
                 return None
 
-            # Création du document Word
-            doc = Document()
-            doc.add_heading("Curriculum Vitae - OneTech", level=0)
-
-            # Infos personnelles
-            doc.add_heading("Informations personnelles", level=1)
-            doc.add_paragraph(f"Nom : {cv_data.informations_personnelles.nom if cv_data.informations_personnelles else 'Non spécifié'}")
-            doc.add_paragraph(f"Email : {cv_data.informations_personnelles.email if cv_data.informations_personnelles else 'Non spécifié'}")
-            doc.add_paragraph(f"Téléphone : {cv_data.informations_personnelles.telephone if cv_data.informations_personnelles else 'Non spécifié'}")
-            doc.add_paragraph(f"Adresse : {cv_data.informations_personnelles.adresse if cv_data.informations_personnelles else 'Non spécifié'}")
-
-            # Compétences techniques
-            doc.add_heading("Compétences techniques", level=1)
-            for skill in (cv_data.competences_techniques or []):
-                doc.add_paragraph(f"- {skill}", style="List Bullet")
-
-            # Expérience professionnelle
-            doc.add_heading("Expérience professionnelle", level=1)
-            for exp in (cv_data.experience_professionnelle or []):
-                doc.add_paragraph(f"{exp.periode} - {exp.poste} @ {exp.entreprise}")
-                doc.add_paragraph(exp.description, style="Intense Quote")
-
-            # Formations académiques
-            doc.add_heading("Formations académiques", level=1)
-            for form in (cv_data.formations_academiques or []):
-                doc.add_paragraph(f"{form.annee} - {form.diplome} ({form.etablissement}) - Mention: {form.mention}")
-
-            # Langues
-            doc.add_heading("Langues", level=1)
-            for lang in (cv_data.competences_linguistiques or []):
-                doc.add_paragraph(f"{lang.langue} : {lang.niveau}")
-
-            # Métadonnées
-            doc.add_heading("Métadonnées", level=1)
-            doc.add_paragraph(f"Nombre de mots: {cv_data.metadonnees.nombre_mots if cv_data.metadonnees else 0}")
-            doc.add_paragraph(f"Date extraction: {cv_data.metadonnees.date_extraction if cv_data.metadonnees else 'N/A'}")
-            doc.add_paragraph(f"Taille fichier (KB): {cv_data.metadonnees.taille_fichier_kb if cv_data.metadonnees else 0}")
-
-            # Sauvegarde en mémoire
-            buffer = BytesIO()
-            doc.save(buffer)
-            buffer.seek(0)
-
-            print(f"✅ Export OneTech Word réussi pour CV: {cv_id}")
-            return StreamingResponse(
-                buffer,
-                media_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+            # Construction du document hors de la boucle d'événements
+            content = await self._run_cpu(_build_onetech_docx, cv_data)
+
+            logger.debug("✅ Export OneTech Word réussi pour CV: %s", cv_id)
+            return Response(
+                content=content,
+                media_type=DOCX_CONTENT_TYPE,
                 headers={"Content-Disposition": f"attachment; filename=CV_{cv_id}_OneTech.docx"}
             )
 
         except Exception as e:
-            print(f"❌ Erreur export OneTech CV {cv_id}: {e}")
-            print(f"Traceback: {traceback.format_exc()}")
+            logger.exception("❌ Erreur export OneTech CV %s: %s", cv_id, e)
             raise Exception(f"Erreur lors de l'export OneTech: {str(e)}")
+
+    async def export_cv_onetech_pdf(self, cv_id: str, cv_data: Optional[CVData] = None) -> Optional[Response]:
+        """Exporte un CV au format OneTech (.pdf) avec le rendu direct reportlab (cv_data: CV déjà chargé)"""
+        if not REPORTLAB_AVAILABLE:
+            raise RuntimeError("reportlab n'est pas installé")
+        
+        if cv_data is None:
+            cv_data = await self.get_cv_by_id(cv_id)
+        if not cv_data:
+            return None
+        
+        try:
+            content = await self._run_cpu(_build_onetech_pdf, cv_data)
+        except Exception as e:
+            logger.exception("❌ Erreur export OneTech PDF CV %s: %s", cv_id, e)
+            raise Exception(f"Erreur lors de l'export OneTech PDF: {str(e)}")
+        
+        logger.debug("✅ Export OneTech PDF réussi pour CV: %s (%s bytes)", cv_id, len(content))
+        return Response(
+            content=content,
+            media_type=PDF_CONTENT_TYPE,
+            headers={"Content-Disposition": f"attachment; filename=CV_{cv_id}_OneTech.pdf"}
+        )
+
     async def export_cv_json(self, cv_id: str) -> Optional[dict]:
         """Retourne le CV brut en JSON tel qu'il est stocké en base"""
         collection = get_cv_collection()  # <-- au lieu de self._get_collection()
 
-        query = {"$or": [{"id": cv_id}]}
-        if ObjectId.is_valid(cv_id):
-            query["$or"].append({"_id": ObjectId(cv_id)})
-
-        cv_doc = await collection.find_one(query)
+        cv_doc = await collection.find_one({"id": cv_id})
         if not cv_doc:
             return None
 
@@ -743,246 +1038,256 @@ class CVService:
         cv_doc.pop("_id", None)
         return cv_doc
     
-    async def check_and_process_cv(self, file_content: bytes, filename: str, file_ext: str) -> tuple[Optional[CVData], bool]:
-        """Vérifie si le CV existe déjà et le traite si nécessaire - VERSION CORRIGÉE"""
+    async def check_and_process_cv(self, file_content: bytes, filename: str, file_ext: str,
+                                   file_hash: Optional[str] = None,
+                                   staged_path: Optional[str] = None) -> tuple[Optional[CVData], bool]:
+        """
+        Vérifie si le CV existe déjà et le traite si nécessaire.
+        staged_path: copie du fichier déjà écrite sur disque pendant l'upload, mise en
+        place par renommage au lieu d'être réécrite (l'appelant supprime ce qui reste)
+        """
         try:
-            # Calculer le hash du fichier
-            file_hash = self._calculate_file_hash(file_content)
+            # Calculer le hash du fichier (sauf s'il a déjà été calculé pendant l'upload)
+            if not file_hash:
+                file_hash = await asyncio.to_thread(self._calculate_file_hash, file_content)
             
-            # Vérifier si un CV avec ce hash existe déjà
-            existing_cv = await self.cv_repository.check_duplicate_hash(file_hash)
+            # Extraction du texte lancée pendant la recherche de doublon (cas le plus
+            # fréquent: un nouveau CV), abandonnée si le CV existe déjà
+            text_task = asyncio.ensure_future(self._run_cpu(_extract_text_job, file_content, file_ext))
+            try:
+                existing_cv = await self._find_duplicate(file_hash, file_content)
+            except BaseException:
+                self._discard_task(text_task)
+                raise
             
             if existing_cv:
-                print(f"⚠️ CV déjà existant: {file_hash[:8]}...")
+                self._discard_task(text_task)
+                logger.warning("⚠️ CV déjà existant: %s...", file_hash[:8])
                 
                 # NOUVEAU: Vérifier si le fichier associé existe
                 file_exists = self.file_storage.file_exists(existing_cv.id, existing_cv.filename_original or filename)
                 
                 if not file_exists:
-                    print(f"⚠️ Fichier manquant pour CV existant, stockage du nouveau fichier...")
+                    logger.warning("⚠️ Fichier manquant pour CV existant, stockage du nouveau fichier...")
                     try:
                         # Stocker le fichier pour le CV existant
-                        file_stored = await self.file_storage.store_file(
-                            file_content, existing_cv.id, existing_cv.filename_original or filename, replace_existing=True
-                        )
+                        if staged_path:
+                            file_stored = await self.file_storage.commit_staged(
+                                staged_path, existing_cv.id, existing_cv.filename_original or filename
+                            )
+                        else:
+                            file_stored = await self.file_storage.store_file(
+                                file_content, existing_cv.id, existing_cv.filename_original or filename, replace_existing=True
+                            )
                         if file_stored:
-                            print(f"✅ Fichier stocké pour CV existant: {existing_cv.id}")
+                            logger.debug("✅ Fichier stocké pour CV existant: %s", existing_cv.id)
                             
                             # Mettre à jour le nom du fichier si nécessaire
                             if not existing_cv.filename_original or existing_cv.filename_original != filename:
                                 await self.update_cv_fields(existing_cv.id, {
                                     "filename_original": filename,
                                     "file_hash": file_hash,
-                                    "updated_at": datetime.now()
+                                    "hash_algo": HASH_ALGO
                                 })
                         else:
-                            print(f"❌ Échec stockage fichier pour CV existant: {existing_cv.id}")
+                            logger.error("❌ Échec stockage fichier pour CV existant: %s", existing_cv.id)
                     except Exception as e:
-                        print(f"❌ Erreur stockage fichier CV existant: {e}")
+                        logger.error("❌ Erreur stockage fichier CV existant: %s", e)
                 
                 return existing_cv, True  # CV existant, doublon = True
             
             # Si pas de doublon, traiter normalement
-            cv_data = await self.process_cv_file(file_content, filename, file_ext)
+            try:
+                text = await text_task
+            except Exception as e:
+                logger.error("❌ Erreur extraction texte: %s", e)
+                raise Exception(f"Impossible d'extraire le texte du fichier: {str(e)}")
+            cv_data = await self.process_cv_file(file_content, filename, file_ext, file_hash=file_hash,
+                                                 staged_path=staged_path, text=text)
             return cv_data, False
             
         except Exception as e:
-            print(f"❌ Erreur vérification doublon: {e}")
+            logger.error("❌ Erreur vérification doublon: %s", e)
             raise
 
     # NOUVELLE MÉTHODE pour remplacer un CV avec gestion du fichier
-    async def replace_cv_with_file(self, cv_id: str, file_content: bytes, filename: str, file_ext: str) -> Optional[CVData]:
+    async def replace_cv_with_file(self, cv_id: str, file_content: bytes, filename: str, file_ext: str,
+                                   file_hash: Optional[str] = None) -> Optional[CVData]:
         """Remplace un CV existant avec un nouveau fichier - VERSION CORRIGÉE"""
         try:
-            print(f"🔄 Remplacement du CV avec fichier: {cv_id}")
+            logger.debug("🔄 Remplacement du CV avec fichier: %s", cv_id)
             
-            # Vérifier que le CV existe
-            existing_cv = await self.get_cv_by_id(cv_id)
+            # Vérifier que le CV existe (lecture en base, le CV va être réécrit)
+            existing_cv = await self.get_cv_by_id(cv_id, use_cache=False)
             if not existing_cv:
-                print(f"❌ CV à remplacer non trouvé: {cv_id}")
+                logger.debug("❌ CV à remplacer non trouvé: %s", cv_id)
                 return None
             
             # Traiter le nouveau fichier
-            new_cv_data = await self.process_cv_file(file_content, filename, file_ext)
+            new_cv_data = await self.process_cv_file(file_content, filename, file_ext, file_hash=file_hash)
             
             # Conserver l'ID original et certaines métadonnées
             new_cv_data.id = cv_id
-            new_cv_data.created_at = existing_cv.created_at  # Conserver la date de création
-            new_cv_data.updated_at = datetime.now()
+            new_cv_data.created_at = existing_cv.created_at  # Conserver la date de création (updated_at posé par process_cv_file)
             
             # Stocker le nouveau fichier (remplacer l'ancien)
-            print("💾 Remplacement du fichier original...")
+            logger.debug("💾 Remplacement du fichier original...")
             try:
                 file_stored = await self.file_storage.store_file(
                     file_content, cv_id, filename, replace_existing=True
                 )
                 if file_stored:
-                    print(f"✅ Nouveau fichier stocké: {cv_id}")
+                    logger.debug("✅ Nouveau fichier stocké: %s", cv_id)
                 else:
-                    print("⚠️ Échec du remplacement du fichier")
+                    logger.warning("⚠️ Échec du remplacement du fichier")
             except Exception as e:
-                print(f"❌ Erreur remplacement fichier: {e}")
+                logger.error("❌ Erreur remplacement fichier: %s", e)
             
             # Sauvegarder les nouvelles données
             updated_cv = await self.update_cv(new_cv_data)
             
             if updated_cv:
-                print(f"✅ CV et fichier remplacés: {cv_id}")
+                logger.debug("✅ CV et fichier remplacés: %s", cv_id)
             else:
-                print(f"❌ Échec remplacement CV: {cv_id}")
+                logger.error("❌ Échec remplacement CV: %s", cv_id)
                 
             return updated_cv
             
         except Exception as e:
-            print(f"❌ Erreur remplacement CV avec fichier {cv_id}: {e}")
-            print(f"Traceback: {traceback.format_exc()}")
+            logger.exception("❌ Erreur remplacement CV avec fichier %s: %s", cv_id, e)
             return None
 
 
-    async def export_cv_text(self, cv_id: str) -> Optional[str]:
-        """Exporte un CV au format texte"""
+    async def export_cv_text(self, cv_id: str, cv_data: Optional[CVData] = None) -> Optional[str]:
+        """Exporte un CV au format texte (cv_data: CV déjà chargé par l'appelant)"""
         try:
-            print(f"📤 Export texte pour CV: {cv_id}")
+            logger.debug("📤 Export texte pour CV: %s", cv_id)
             
-            cv_data = await self.get_cv_by_id(cv_id)
+            if cv_data is None:
+                cv_data = await self.get_cv_by_id(cv_id)
             if not cv_data:
                 return None
             
-            # Construire le texte formaté
-            text_parts = []
-            
-            # Informations personnelles
-            text_parts.append("=== INFORMATIONS PERSONNELLES ===")
-            if cv_data.informations_personnelles.nom:
-                text_parts.append(f"Nom: {cv_data.informations_personnelles.nom}")
-            if cv_data.informations_personnelles.email:
-                text_parts.append(f"Email: {cv_data.informations_personnelles.email}")
-            if cv_data.informations_personnelles.telephone:
-                text_parts.append(f"Téléphone: {cv_data.informations_personnelles.telephone}")
-            if cv_data.informations_personnelles.adresse:
-                text_parts.append(f"Adresse: {cv_data.informations_personnelles.adresse}")
-            
-            # Compétences techniques
-            if cv_data.competences_techniques:
-                text_parts.append("\n=== COMPÉTENCES TECHNIQUES ===")
-                text_parts.extend(cv_data.competences_techniques)
-            
-            # Expérience professionnelle
-            if cv_data.experience_professionnelle:
-                text_parts.append("\n=== EXPÉRIENCE PROFESSIONNELLE ===")
-                for exp in cv_data.experience_professionnelle:
-                    text_parts.append(f"\n{exp.periode} - {exp.poste}")
-                    text_parts.append(f"Entreprise: {exp.entreprise}")
-                    if exp.description:
-                        text_parts.append(f"Description: {exp.description}")
-        
-            # Formations
-            if cv_data.formations_academiques:
-                text_parts.append("\n=== FORMATIONS ACADÉMIQUES ===")
-                for form in cv_data.formations_academiques:
-                    text_parts.append(f"\n{form.annee} - {form.diplome}")
-                    text_parts.append(f"Établissement: {form.etablissement}")
-                    if form.mention:
-                        text_parts.append(f"Mention: {form.mention}")
-            
-            # Langues
-            if cv_data.competences_linguistiques:
-                text_parts.append("\n=== COMPÉTENCES LINGUISTIQUES ===")
-                for lang in cv_data.competences_linguistiques:
-                    text_parts.append(f"{lang.langue}: {lang.niveau}")
-            
-            # Certifications
-            if cv_data.certifications:
-                text_parts.append("\n=== CERTIFICATIONS ===")
-                text_parts.extend(cv_data.certifications)
-            
-            result_text = "\n".join(text_parts)
-            print(f"✅ Export texte réussi pour CV: {cv_id}")
+            result_text = _build_cv_text(cv_data)
+            logger.debug("✅ Export texte réussi pour CV: %s", cv_id)
             return result_text
             
         except Exception as e:
-            print(f"❌ Erreur export texte CV {cv_id}: {e}")
+            logger.error("❌ Erreur export texte CV %s: %s", cv_id, e)
             return None
 
-            
+    async def export_cvs_text_bulk(self, cv_ids: List[str]) -> Dict[str, str]:
+        """Exporte plusieurs CV au format texte avec une seule requête en base ({id: texte})"""
+        try:
+            cvs = await self.cv_repository.get_cvs_by_ids(cv_ids)
+            logger.debug("📤 Export texte groupé: %s CV(s) sur %s demandé(s)", len(cvs), len(cv_ids))
+            return {cv.id: _build_cv_text(cv) for cv in cvs}
         except Exception as e:
-            print(f"❌ Erreur export texte CV {cv_id}: {e}")
-            return None
+            logger.error("❌ Erreur export texte groupé: %s", e)
+            return {}
 
-    async def get_document_for_preview(self, cv_id: str) -> Tuple[Optional[bytes], str, str]:
+    async def get_document_for_preview(self, cv_id: str,
+                                       cv_data: Optional[CVData] = None) -> Tuple[Optional[bytes], str, str]:
         """
         Récupère le document pour aperçu, avec conversion si nécessaire - VERSION CORRIGÉE
+        cv_data: CV déjà chargé par l'appelant (évite une relecture en base)
         Returns: (content, content_type, original_filename)
         """
         try:
-            print(f"📄 Récupération document pour aperçu: {cv_id}")
+            logger.debug("📄 Récupération document pour aperçu: %s", cv_id)
             
             # Récupérer le CV
-            cv_data = await self.get_cv_by_id(cv_id)
+            if cv_data is None:
+                cv_data = await self.get_cv_by_id(cv_id)
             if not cv_data or not cv_data.filename_original:
-                print(f"❌ CV ou nom de fichier non trouvé: {cv_id}")
+                logger.debug("❌ CV ou nom de fichier non trouvé: %s", cv_id)
                 return None, "", ""
             
-            # Récupérer le contenu du fichier original
-            original_content = await self._get_original_file_content(cv_id)
+            # Récupérer le contenu du fichier original (nom déjà connu: pas de seconde lecture du CV)
+            original_content = await self._get_original_file_content(cv_id, cv_data.filename_original)
             if not original_content:
-                print(f"❌ Contenu fichier non disponible: {cv_id}")
+                logger.error("❌ Contenu fichier non disponible: %s", cv_id)
                 return None, "", ""
             
             original_filename = cv_data.filename_original
             file_ext = os.path.splitext(original_filename)[1].lower()
             
-            print(f"📄 Type de fichier détecté: {file_ext}")
+            logger.debug("📄 Type de fichier détecté: %s", file_ext)
             
             # Si c'est un PDF, retourner directement
             if file_ext == '.pdf':
-                print(f"📄 Retour PDF direct: {original_filename}")
-                return original_content, "application/pdf", original_filename
+                logger.debug("📄 Retour PDF direct: %s", original_filename)
+                return original_content, PDF_CONTENT_TYPE, original_filename
             
             # Si c'est un DOCX et conversion disponible
-            if file_ext in ['.docx', '.doc'] and self.document_converter.is_conversion_available():
-                print(f"🔄 Tentative de conversion: {original_filename}")
+            if file_ext in PREVIEW_CONVERTIBLE and self.document_converter.is_conversion_available():
+                logger.debug("🔄 Tentative de conversion: %s", original_filename)
                 pdf_content = await self.document_converter.convert_docx_to_pdf(
                     original_content, original_filename
                 )
                 
                 if pdf_content:
-                    print(f"✅ Conversion réussie: {original_filename} -> PDF")
-                    return pdf_content, "application/pdf", f"{original_filename}_converted.pdf"
+                    logger.debug("✅ Conversion réussie: %s -> PDF", original_filename)
+                    # Aperçus suivants servis depuis le disque, sans reconversion
+                    await self.file_storage.store_preview(cv_id, pdf_content)
+                    return pdf_content, PDF_CONTENT_TYPE, f"{original_filename}_converted.pdf"
                 else:
-                    print(f"❌ Conversion échouée, retour fichier original: {original_filename}")
+                    logger.error("❌ Conversion échouée, retour fichier original: %s", original_filename)
                     # Retourner le fichier original même si conversion échoue
-                    content_type = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
-                    return original_content, content_type, original_filename
+                    return original_content, PREVIEW_CONTENT_TYPES[file_ext], original_filename
             
             # Pour autres formats, retourner tel quel
-            print(f"📄 Retour fichier original sans conversion: {original_filename}")
+            logger.debug("📄 Retour fichier original sans conversion: %s", original_filename)
             return original_content, "application/octet-stream", original_filename
             
         except Exception as e:
-            print(f"❌ Erreur récupération document {cv_id}: {e}")
-            print(f"Traceback: {traceback.format_exc()}")
+            logger.exception("❌ Erreur récupération document %s: %s", cv_id, e)
             return None, "", ""
     
-    async def _get_original_file_content(self, cv_id: str) -> Optional[bytes]:
-        """Récupère le contenu du fichier original - VERSION CORRIGÉE"""
+    async def get_original_file_path(self, cv_id: str, filename_original: Optional[str] = None) -> Optional[str]:
+        """
+        Chemin du fichier original sur disque (pour un envoi direct sans le charger en mémoire)
+        filename_original: évite une relecture du CV si l'appelant l'a déjà
+        """
+        try:
+            if not filename_original:
+                cv_data = await self.get_cv_by_id(cv_id)
+                if not cv_data or not cv_data.filename_original:
+                    logger.debug("❌ CV ou nom de fichier non trouvé: %s", cv_id)
+                    return None
+                filename_original = cv_data.filename_original
+            
+            return self.file_storage.get_file_path(cv_id, filename_original)
+            
+        except Exception as e:
+            logger.error("❌ Erreur chemin fichier %s: %s", cv_id, e)
+            return None
+    
+    async def _get_original_file_content(self, cv_id: str,
+                                         filename_original: Optional[str] = None) -> Optional[bytes]:
+        """
+        Récupère le contenu du fichier original
+        filename_original: évite une relecture du CV si l'appelant l'a déjà
+        """
         try:
             # Récupérer les métadonnées du CV pour avoir le nom de fichier original
-            cv_data = await self.get_cv_by_id(cv_id)
-            if not cv_data or not cv_data.filename_original:
-                print(f"❌ CV ou nom de fichier non trouvé: {cv_id}")
-                return None
+            if not filename_original:
+                cv_data = await self.get_cv_by_id(cv_id)
+                if not cv_data or not cv_data.filename_original:
+                    logger.debug("❌ CV ou nom de fichier non trouvé: %s", cv_id)
+                    return None
+                filename_original = cv_data.filename_original
             
             # Utiliser le service de stockage pour récupérer le fichier
-            content = await self.file_storage.get_file_content(cv_id, cv_data.filename_original)
+            content = await self.file_storage.get_file_content(cv_id, filename_original)
             if content:
-                print(f"✅ Contenu fichier récupéré: {cv_id} ({len(content)} bytes)")
+                logger.debug("✅ Contenu fichier récupéré: %s (%s bytes)", cv_id, len(content))
                 return content
             else:
-                print(f"❌ Contenu fichier non trouvé: {cv_id}")
+                logger.debug("❌ Contenu fichier non trouvé: %s", cv_id)
                 return None
                 
         except Exception as e:
-            print(f"❌ Erreur récupération fichier {cv_id}: {e}")
+            logger.error("❌ Erreur récupération fichier %s: %s", cv_id, e)
             return None
 
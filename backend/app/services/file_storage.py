@@ -1,113 +1,259 @@
 # app/services/file_storage.py
+import logging
 import os
 import tempfile
+import uuid
 from typing import Optional
 import hashlib
 from datetime import datetime
 import aiofiles
+import aiofiles.os
+
+logger = logging.getLogger(__name__)
 
 class FileStorageService:
     """Service de gestion du stockage des fichiers"""
     
     def __init__(self, storage_path: str = "uploads"):
         self.storage_path = storage_path
-        # Créer le dossier s'il n'existe pas
-        os.makedirs(storage_path, exist_ok=True)
-        print(f"📁 Service de stockage initialisé: {storage_path}")
+        # Fichiers en cours de réception, sur le même disque que les fichiers
+        # définitifs pour que leur mise en place soit un simple renommage
+        self.staging_path = os.path.join(storage_path, ".staging")
+        # Aperçus PDF des documents Word déjà convertis, un par CV
+        self.preview_path = os.path.join(storage_path, "pdf_cache")
+        # Créer les dossiers s'ils n'existent pas
+        os.makedirs(self.staging_path, exist_ok=True)
+        os.makedirs(self.preview_path, exist_ok=True)
+        logger.debug("📁 Service de stockage initialisé: %s", storage_path)
+    
+    @staticmethod
+    def _shard_dir(base_path: str, cv_id: str) -> str:
+        """
+        Sous-dossier à deux niveaux d'un CV (uploads/ab/cd/): le nombre d'entrées par
+        dossier reste borné. Pris sur la fin de l'identifiant, dont le début (horodatage
+        de l'ObjectId) est le même pour tous les CV d'une même journée
+        """
+        return os.path.join(base_path, cv_id[-2:], cv_id[-4:-2])
+    
+    def _path_for(self, cv_id: str, file_ext: str, create: bool = False) -> str:
+        """Chemin du fichier stocké d'un CV (create: crée son sous-dossier au besoin)"""
+        directory = self._shard_dir(self.storage_path, cv_id)
+        if create:
+            os.makedirs(directory, exist_ok=True)
+        return os.path.join(directory, f"{cv_id}{file_ext}")
+    
+    def _preview_file(self, cv_id: str, create: bool = False) -> str:
+        """Chemin de l'aperçu PDF converti d'un CV, rangé comme les fichiers originaux"""
+        directory = self._shard_dir(self.preview_path, cv_id)
+        if create:
+            os.makedirs(directory, exist_ok=True)
+        return os.path.join(directory, f"{cv_id}.pdf")
+    
+    def migrate_to_shards(self) -> int:
+        """
+        Déplace les fichiers encore rangés à plat dans le dossier de stockage
+        vers leur sous-dossier (migration unique, sans effet ensuite)
+        """
+        moved = 0
+        with os.scandir(self.storage_path) as entries:
+            for entry in entries:
+                if not entry.is_file() or entry.name.startswith('.'):
+                    continue
+                cv_id, file_ext = os.path.splitext(entry.name)
+                try:
+                    os.replace(entry.path, self._path_for(cv_id, file_ext, create=True))
+                    moved += 1
+                except FileNotFoundError:
+                    pass  # déjà déplacé par un autre worker
+                except Exception as e:
+                    logger.warning("⚠️ Erreur déplacement %s: %s", entry.name, e)
+        if moved:
+            logger.info("📁 %s fichier(s) rangé(s) en sous-dossiers", moved)
+        return moved
     
     async def store_file(self, file_content: bytes, cv_id: str, original_filename: str, replace_existing: bool = False) -> bool:
         """Stocke un fichier sur disque"""
         try:
             # Déterminer l'extension du fichier
             file_ext = os.path.splitext(original_filename)[1]
-            stored_filename = f"{cv_id}{file_ext}"
-            file_path = os.path.join(self.storage_path, stored_filename)
+            file_path = self._path_for(cv_id, file_ext, create=True)
+            
+            # Un seul stat: le fichier existe-t-il déjà ?
+            already_stored = self._stat_path(file_path) is not None
             
             # Si le fichier existe et qu'on ne veut pas remplacer, vérifier
-            if os.path.exists(file_path) and not replace_existing:
-                print(f"⚠️ Fichier existe déjà: {file_path}")
+            if already_stored and not replace_existing:
+                logger.warning("⚠️ Fichier existe déjà: %s", file_path)
                 return True  # Considérer comme succès si le fichier existe déjà
             
-            # Supprimer l'ancien fichier s'il existe (pour le remplacement)
-            if replace_existing and os.path.exists(file_path):
-                try:
-                    os.remove(file_path)
-                    print(f"🗑️ Ancien fichier supprimé pour remplacement: {file_path}")
-                except Exception as e:
-                    print(f"⚠️ Erreur suppression ancien fichier: {e}")
-            
-            # Écrire le fichier de manière asynchrone
-            async with aiofiles.open(file_path, 'wb') as f:
-                await f.write(file_content)
+            # Écrire à part puis renommer: l'ancien fichier est remplacé d'un coup
+            # (jamais de fichier à moitié écrit, ni de suppression bloquante)
+            staged_path = self.new_staging_path()
+            try:
+                async with aiofiles.open(staged_path, 'wb') as f:
+                    await f.write(file_content)
+                await aiofiles.os.replace(staged_path, file_path)
+            except BaseException:
+                self.discard_staged(staged_path)
+                raise
+            self._drop_preview(cv_id)
             
             action = "remplacé" if replace_existing else "stocké"
-            print(f"✅ Fichier {action}: {file_path}")
+            logger.debug("✅ Fichier %s: %s", action, file_path)
             return True
             
         except Exception as e:
-            print(f"❌ Erreur stockage fichier {cv_id}: {e}")
+            logger.error("❌ Erreur stockage fichier %s: %s", cv_id, e)
+            return False
+    
+    def new_staging_path(self) -> str:
+        """Chemin d'un fichier temporaire de réception (écrit pendant la lecture de l'upload)"""
+        return os.path.join(self.staging_path, f"{uuid.uuid4().hex}.part")
+    
+    async def commit_staged(self, staged_path: str, cv_id: str, original_filename: str) -> bool:
+        """Met en place un fichier reçu sous son nom définitif (renommage atomique, sans réécriture)"""
+        try:
+            file_ext = os.path.splitext(original_filename)[1]
+            file_path = self._path_for(cv_id, file_ext, create=True)
+            await aiofiles.os.replace(staged_path, file_path)
+            self._drop_preview(cv_id)
+            logger.debug("✅ Fichier stocké: %s", file_path)
+            return True
+        except Exception as e:
+            logger.error("❌ Erreur stockage fichier %s: %s", cv_id, e)
+            return False
+    
+    def discard_staged(self, staged_path: str):
+        """Supprime un fichier de réception non utilisé (sans effet s'il a été mis en place)"""
+        try:
+            os.remove(staged_path)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning("⚠️ Erreur suppression fichier temporaire %s: %s", staged_path, e)
+    
+    def get_preview_path(self, cv_id: str) -> Optional[str]:
+        """Chemin de l'aperçu PDF déjà converti d'un CV, ou None s'il n'existe pas"""
+        file_path = self._preview_file(cv_id)
+        return file_path if self._stat_path(file_path) is not None else None
+    
+    async def store_preview(self, cv_id: str, pdf_content: bytes) -> bool:
+        """Garde l'aperçu PDF converti d'un CV (écrit à part puis renommé: jamais lu à moitié écrit)"""
+        staged_path = self.new_staging_path()
+        try:
+            async with aiofiles.open(staged_path, 'wb') as f:
+                await f.write(pdf_content)
+            await aiofiles.os.replace(staged_path, self._preview_file(cv_id, create=True))
+            return True
+        except Exception as e:
+            logger.warning("⚠️ Erreur stockage aperçu %s: %s", cv_id, e)
+            self.discard_staged(staged_path)
             return False
     
+    def _drop_preview(self, cv_id: str):
+        """Supprime l'aperçu converti d'un CV dont le fichier original change ou disparaît"""
+        try:
+            os.remove(self._preview_file(cv_id))
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning("⚠️ Erreur suppression aperçu %s: %s", cv_id, e)
+    
+    @staticmethod
+    def _stat_path(file_path: str) -> Optional[os.stat_result]:
+        """stat du fichier, ou None s'il n'existe pas (un seul appel système)"""
+        try:
+            return os.stat(file_path)
+        except FileNotFoundError:
+            return None
+    
+    def _stat(self, cv_id: str, original_filename: str) -> Optional[os.stat_result]:
+        """stat du fichier stocké d'un CV, ou None s'il n'existe pas"""
+        return self._stat_path(self._path_for(cv_id, os.path.splitext(original_filename)[1]))
+    
+    def get_file_path(self, cv_id: str, original_filename: str) -> Optional[str]:
+        """Retourne le chemin du fichier stocké, ou None s'il n'existe pas"""
+        try:
+            file_ext = os.path.splitext(original_filename)[1]
+            file_path = self._path_for(cv_id, file_ext)
+            if self._stat_path(file_path) is None:
+                logger.debug("❌ Fichier non trouvé: %s", file_path)
+                return None
+            return file_path
+        except Exception as e:
+            logger.error("❌ Erreur accès fichier %s: %s", cv_id, e)
+            return None
+    
     async def get_file_content(self, cv_id: str, original_filename: str) -> Optional[bytes]:
         """Récupère le contenu d'un fichier"""
         try:
             # Déterminer l'extension du fichier
             file_ext = os.path.splitext(original_filename)[1]
-            stored_filename = f"{cv_id}{file_ext}"
-            file_path = os.path.join(self.storage_path, stored_filename)
+            file_path = self._path_for(cv_id, file_ext)
             
-            if not os.path.exists(file_path):
-                print(f"❌ Fichier non trouvé: {file_path}")
+            # Lire le fichier de manière asynchrone (l'ouverture suffit à savoir s'il existe)
+            try:
+                async with aiofiles.open(file_path, 'rb') as f:
+                    content = await f.read()
+            except FileNotFoundError:
+                logger.debug("❌ Fichier non trouvé: %s", file_path)
                 return None
             
-            # Lire le fichier de manière asynchrone
-            async with aiofiles.open(file_path, 'rb') as f:
-                content = await f.read()
-            
-            print(f"✅ Fichier récupéré: {file_path} ({len(content)} bytes)")
+            logger.debug("✅ Fichier récupéré: %s (%s bytes)", file_path, len(content))
             return content
             
         except Exception as e:
-            print(f"❌ Erreur lecture fichier {cv_id}: {e}")
+            logger.error("❌ Erreur lecture fichier %s: %s", cv_id, e)
             return None
     
+    async def rename_file(self, old_cv_id: str, new_cv_id: str, original_filename: str) -> bool:
+        """Renomme le fichier stocké d'un CV dont l'identifiant a changé"""
+        try:
+            file_ext = os.path.splitext(original_filename)[1]
+            old_path = self._path_for(old_cv_id, file_ext)
+            new_path = self._path_for(new_cv_id, file_ext, create=True)
+            
+            try:
+                os.replace(old_path, new_path)
+            except FileNotFoundError:
+                return False
+            self._drop_preview(old_cv_id)
+            logger.debug("✅ Fichier renommé: %s -> %s", old_path, new_path)
+            return True
+            
+        except Exception as e:
+            logger.error("❌ Erreur renommage fichier %s: %s", old_cv_id, e)
+            return False
+    
     async def delete_file(self, cv_id: str, original_filename: str) -> bool:
         """Supprime un fichier"""
         try:
             file_ext = os.path.splitext(original_filename)[1]
-            stored_filename = f"{cv_id}{file_ext}"
-            file_path = os.path.join(self.storage_path, stored_filename)
+            file_path = self._path_for(cv_id, file_ext)
             
-            if os.path.exists(file_path):
+            self._drop_preview(cv_id)
+            try:
                 os.remove(file_path)
-                print(f"🗑️ Fichier supprimé: {file_path}")
-                return True
-            else:
-                print(f"⚠️ Fichier déjà supprimé ou introuvable: {file_path}")
-                return True
+                logger.debug("🗑️ Fichier supprimé: %s", file_path)
+            except FileNotFoundError:
+                logger.warning("⚠️ Fichier déjà supprimé ou introuvable: %s", file_path)
+            return True
                 
         except Exception as e:
-            print(f"❌ Erreur suppression fichier {cv_id}: {e}")
+            logger.error("❌ Erreur suppression fichier %s: %s", cv_id, e)
             return False
     
     def file_exists(self, cv_id: str, original_filename: str) -> bool:
         """Vérifie si un fichier existe"""
         try:
-            file_ext = os.path.splitext(original_filename)[1]
-            stored_filename = f"{cv_id}{file_ext}"
-            file_path = os.path.join(self.storage_path, stored_filename)
-            return os.path.exists(file_path)
+            return self._stat(cv_id, original_filename) is not None
         except:
             return False
     
     def get_file_size(self, cv_id: str, original_filename: str) -> int:
         """Retourne la taille d'un fichier en bytes"""
         try:
-            file_ext = os.path.splitext(original_filename)[1]
-            stored_filename = f"{cv_id}{file_ext}"
-            file_path = os.path.join(self.storage_path, stored_filename)
-            if os.path.exists(file_path):
-                return os.path.getsize(file_path)
-            return 0
+            stat = self._stat(cv_id, original_filename)
+            return stat.st_size if stat else 0
         except:
             return 0
\ No newline at end of file
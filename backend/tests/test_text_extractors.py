@@ -0,0 +1,26 @@
+"""Lecture des fichiers texte non UTF-8 (extract_from_bytes, '.txt')"""
+
+import pytest
+
+from app.parsers.text_extractors import TextExtractor
+
+SAMPLES = [
+    "Expérience professionnelle\nDéveloppeur à Tunis, créé…",
+    "héllo wörld",
+    "Compétences: Python, Java — Ingénieur logiciel confirmé, maîtrise de l'anglais",
+]
+
+
+@pytest.mark.parametrize("text", SAMPLES)
+def test_txt_cp1252(text):
+    assert TextExtractor().extract_from_bytes(text.encode("cp1252"), ".txt") == text
+
+
+@pytest.mark.parametrize("text", SAMPLES)
+def test_txt_utf8(text):
+    assert TextExtractor().extract_from_bytes(text.encode("utf-8"), ".txt") == text
+
+
+def test_txt_utf16():
+    text = SAMPLES[0]
+    assert TextExtractor().extract_from_bytes(text.encode("utf-16"), ".txt") == text
@@ -29,6 +29,7 @@ export interface CVMetadata {
   date_extraction: string;
   apercu_texte?: string;
   taille_fichier_kb?: number;
+  scores_confiance?: { [champ: string]: number };
 }
 
 export interface CVData {